@@ -0,0 +1,24 @@
+"""
+pytest-benchmark layout of benchmark scenarios:
+    python -m pytest benchmarks/bench_logging.py --benchmark-json=out.json
+"""
+
+import pytest
+
+from benchmarks.scenarios import SCENARIO_LIST, BenchmarkScenario
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize(
+    'scenario', SCENARIO_LIST, ids=[s.name for s in SCENARIO_LIST])
+def test_logging(benchmark, scenario: BenchmarkScenario):
+    benchmark.group = scenario.group
+    benchmark_run = scenario.prepare()
+
+    try:
+        benchmark.extra_info['ops'] = benchmark_run.ops
+        benchmark.pedantic(
+            benchmark_run.run, rounds=5, warmup_rounds=1, iterations=1)
+    finally:
+        benchmark_run.close()
@@ -0,0 +1,295 @@
+"""
+Logging hot path benchmarks.
+
+Run all benchmarks, and save results to benchmark_results/latest.json:
+    python -m benchmarks.benchmark_suite
+
+Save results as baseline:
+    python -m benchmarks.benchmark_suite --save-baseline
+
+Compare results to baseline, and exit with code 1 on regression,
+or in case baseline is not found:
+    python -m benchmarks.benchmark_suite --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
+
+import nrt_logging
+from benchmarks.scenarios import \
+    DEFAULT_LINES_AMOUNT, SCENARIO_LIST, BenchmarkScenario
+
+
+PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(PATH, 'benchmark_results')
+LATEST_RESULTS_FILE_PATH = os.path.join(RESULTS_PATH, 'latest.json')
+BASELINE_RESULTS_FILE_PATH = os.path.join(RESULTS_PATH, 'baseline.json')
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    ops: int
+    min_time: float
+    median_time: float
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.ops / self.min_time if self.min_time > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'group': self.group,
+            'ops': self.ops,
+            'min_time': self.min_time,
+            'median_time': self.median_time,
+            'lines_per_sec': self.lines_per_sec
+        }
+
+
+@dataclass
+class BenchmarkRegression:
+    name: str
+    baseline_lines_per_sec: float
+    lines_per_sec: float
+
+    @property
+    def change(self) -> float:
+        """
+        Relative change of lines per second from baseline.
+        Negative change is slowdown.
+        """
+
+        return self.lines_per_sec / self.baseline_lines_per_sec - 1
+
+
+def run_scenario(
+        scenario: BenchmarkScenario,
+        lines_amount: int = DEFAULT_LINES_AMOUNT,
+        repeat: int = DEFAULT_REPEAT) -> BenchmarkResult:
+    """
+    Run scenario once for warmup, and then repeat times.
+
+    @param scenario: Benchmark scenario.
+    @param lines_amount: Log lines amount in each run.
+    @param repeat: Timed runs amount.
+    @return: Benchmark result.
+    """
+
+    if repeat <= 0:
+        raise ValueError('Repeat must be bigger from 0')
+
+    benchmark_run = scenario.prepare(lines_amount)
+
+    try:
+        benchmark_run.run()
+        time_list = []
+
+        for _ in range(repeat):
+            start_time = perf_counter()
+            benchmark_run.run()
+            time_list.append(perf_counter() - start_time)
+    finally:
+        benchmark_run.close()
+
+    return \
+        BenchmarkResult(
+            scenario.name,
+            scenario.group,
+            benchmark_run.ops,
+            min(time_list),
+            statistics.median(time_list))
+
+
+def run_benchmarks(
+        name_filter: Optional[str] = None,
+        lines_amount: int = DEFAULT_LINES_AMOUNT,
+        repeat: int = DEFAULT_REPEAT) -> list[BenchmarkResult]:
+
+    return [
+        run_scenario(scenario, lines_amount, repeat)
+        for scenario in SCENARIO_LIST
+        if __is_scenario_selected(scenario, name_filter)
+    ]
+
+
+def create_results_dict(
+        result_list: list[BenchmarkResult],
+        lines_amount: int,
+        repeat: int) -> dict:
+
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'nrt_logging_version': nrt_logging.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'lines_amount': lines_amount,
+        'repeat': repeat,
+        'results': {result.name: result.to_dict() for result in result_list}
+    }
+
+
+def save_results(results_dict: dict, file_path: str):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(results_dict, f, indent=2)
+        f.write('\n')
+
+
+def load_results(file_path: str) -> dict:
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(
+        baseline_dict: dict,
+        results_dict: dict,
+        threshold: float = DEFAULT_THRESHOLD) -> list[BenchmarkRegression]:
+    """
+    Compare lines per second of results to baseline.
+    Benchmarks that are not in both results are ignored.
+
+    @param baseline_dict: Baseline results.
+    @param results_dict: Results.
+    @param threshold:
+        Max allowed slowdown ratio. 0.2 allows 20% less lines per second.
+    @return: Regressions.
+    """
+
+    if not 0 <= threshold < 1:
+        raise ValueError('Threshold must be between 0 and 1')
+
+    regression_list = []
+    baseline_results = baseline_dict['results']
+
+    for name, result in results_dict['results'].items():
+        if name not in baseline_results:
+            continue
+
+        regression = \
+            BenchmarkRegression(
+                name,
+                baseline_results[name]['lines_per_sec'],
+                result['lines_per_sec'])
+
+        if regression.change < -threshold:
+            regression_list.append(regression)
+
+    return regression_list
+
+
+def __is_scenario_selected(
+        scenario: BenchmarkScenario, name_filter: Optional[str]) -> bool:
+
+    if name_filter is None or name_filter == scenario.group:
+        return True
+
+    return name_filter in scenario.name
+
+
+def __print_results(results_dict: dict, baseline_dict: Optional[dict]):
+    baseline_results = \
+        {} if baseline_dict is None else baseline_dict['results']
+
+    for name, result in results_dict['results'].items():
+        line = f'{name:<16} {result["lines_per_sec"]:>14,.0f} lines/sec'
+
+        if name in baseline_results:
+            baseline_lines_per_sec = baseline_results[name]['lines_per_sec']
+            change = result['lines_per_sec'] / baseline_lines_per_sec - 1
+            line += f' ({change:+.1%})'
+
+        print(line)
+
+
+def __parse_args(args: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='NRT logging benchmarks.')
+    parser.add_argument(
+        '-k', '--filter', help='Run benchmarks by name part or group.')
+    parser.add_argument(
+        '--lines', type=int, default=DEFAULT_LINES_AMOUNT,
+        help='Log lines amount in each run.')
+    parser.add_argument(
+        '--repeat', type=int, default=DEFAULT_REPEAT,
+        help='Timed runs amount of each benchmark.')
+    parser.add_argument(
+        '--output', default=LATEST_RESULTS_FILE_PATH,
+        help='Results JSON file path.')
+    parser.add_argument(
+        '--baseline', default=BASELINE_RESULTS_FILE_PATH,
+        help='Baseline results JSON file path.')
+    # Baseline that is saved by run is not compared to the same run
+    baseline_group = parser.add_mutually_exclusive_group()
+    baseline_group.add_argument(
+        '--save-baseline', action='store_true',
+        help='Save results also as baseline.')
+    baseline_group.add_argument(
+        '--compare', action='store_true',
+        help='Exit with code 1 in case of regression from baseline,'
+             ' or in case baseline is not found.')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Max allowed slowdown ratio from baseline.')
+    return parser.parse_args(args)
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    parsed_args = __parse_args(args)
+    result_list = \
+        run_benchmarks(
+            parsed_args.filter, parsed_args.lines, parsed_args.repeat)
+    results_dict = \
+        create_results_dict(
+            result_list, parsed_args.lines, parsed_args.repeat)
+    save_results(results_dict, parsed_args.output)
+
+    baseline_dict = None
+
+    if os.path.exists(parsed_args.baseline):
+        baseline_dict = load_results(parsed_args.baseline)
+
+    __print_results(results_dict, baseline_dict)
+
+    if parsed_args.save_baseline:
+        save_results(results_dict, parsed_args.baseline)
+        return 0
+
+    if not parsed_args.compare:
+        return 0
+
+    if baseline_dict is None:
+        print(f'Baseline {parsed_args.baseline} not found')
+        return 1
+
+    if not results_dict['results'].keys() & baseline_dict['results'].keys():
+        print(f'Baseline {parsed_args.baseline} has no benchmarks to compare')
+        return 1
+
+    regression_list = \
+        compare_results(baseline_dict, results_dict, parsed_args.threshold)
+
+    for regression in regression_list:
+        print(
+            f'Regression in {regression.name}:'
+            f' {regression.baseline_lines_per_sec:,.0f}'
+            f' -> {regression.lines_per_sec:,.0f} lines/sec'
+            f' ({regression.change:+.1%})')
+
+    return 1 if regression_list else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
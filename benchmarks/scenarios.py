@@ -0,0 +1,263 @@
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from threading import Thread
+from typing import Callable, Optional
+
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, FileStreamHandler, LoggerStreamHandlerBase, \
+    LogStyleEnum
+
+
+DEFAULT_LINES_AMOUNT = 2000
+DEPTH_LIST = [5, 50, 200]
+THREADS_AMOUNT_LIST = [1, 8, 64]
+SNAPSHOT_METHODS_DEPTH = 5
+ROTATION_MAX_FILE_SIZE = 32 * 1024
+ROTATION_FILES_AMOUNT = 3
+DISABLED_LEVEL_CALLS_FACTOR = 50
+
+MSG = 'benchmark log message'
+ROTATION_MSG = '1234567890' * 10
+
+
+@dataclass
+class BenchmarkRun:
+    """
+    Prepared benchmark scenario.
+
+    run logs ops log lines (or log calls),
+    and close releases the logger and its resources.
+    """
+
+    run: Callable[[], None]
+    close: Callable[[], None]
+    ops: int
+
+
+@dataclass(frozen=True)
+class BenchmarkScenario:
+    name: str
+    group: str
+    setup: Callable[[int], BenchmarkRun]
+
+    def prepare(
+            self,
+            lines_amount: int = DEFAULT_LINES_AMOUNT) -> BenchmarkRun:
+        """
+        Create logger and workload of scenario.
+
+        @param lines_amount: Log lines amount in each run.
+        @return: Prepared benchmark run.
+        """
+
+        return self.setup(lines_amount)
+
+
+class _LoggerFixture:
+    """
+    Logger with stream handler that writes to temporary directory,
+    or to os.devnull in case of console stream handler.
+    """
+
+    __temp_path: Optional[str] = None
+    __devnull = None
+    __stdout = None
+    logger: NrtLogger
+    stream_handler: LoggerStreamHandlerBase
+
+    def __init__(
+            self,
+            is_file: bool,
+            style: LogStyleEnum = LogStyleEnum.LINE,
+            log_level: LogLevelEnum = LogLevelEnum.TRACE):
+        """
+        Constractor.
+
+        @param is_file: Use file stream handler instead of console.
+        @param style: Log style.
+        @param log_level: Logger and stream handler log level.
+        """
+
+        if is_file:
+            self.__temp_path = tempfile.mkdtemp(prefix='nrt_logging_bench_')
+            self.stream_handler = \
+                FileStreamHandler(os.path.join(self.__temp_path, 'log.txt'))
+        else:
+            self.__devnull = open(os.devnull, 'w', encoding='utf-8')
+            self.__stdout = sys.stdout
+            sys.stdout = self.__devnull
+            self.stream_handler = ConsoleStreamHandler()
+
+        self.stream_handler.style = style
+        self.stream_handler.log_level = log_level
+        self.logger = NrtLogger(log_level)
+        self.logger.add_stream_handler(self.stream_handler)
+
+    def close(self):
+        self.logger.close_stream_handlers()
+
+        if self.__devnull is not None:
+            sys.stdout = self.__stdout
+            self.__devnull.close()
+
+        if self.__temp_path is not None:
+            shutil.rmtree(self.__temp_path, ignore_errors=True)
+
+
+def log_lines(logger: NrtLogger, lines_amount: int):
+    for _ in range(lines_amount):
+        logger.info(MSG)
+
+
+def log_lines_in_depth(logger: NrtLogger, depth: int, lines_amount: int):
+    """
+    Call itself until depth, so stack walk of each log
+    passes depth frames.
+    """
+
+    if depth > 1:
+        log_lines_in_depth(logger, depth - 1, lines_amount)
+        return
+
+    log_lines(logger, lines_amount)
+
+
+def snapshot_in_depth(logger: NrtLogger, depth: int, snapshots_amount: int):
+    if depth > 1:
+        snapshot_in_depth(logger, depth - 1, snapshots_amount)
+        return
+
+    for _ in range(snapshots_amount):
+        logger.snapshot(methods_depth=SNAPSHOT_METHODS_DEPTH)
+
+
+def _style_setup(is_file: bool, style: LogStyleEnum):
+    def setup(lines_amount: int) -> BenchmarkRun:
+        fixture = _LoggerFixture(is_file, style)
+        return \
+            BenchmarkRun(
+                lambda: log_lines(fixture.logger, lines_amount),
+                fixture.close,
+                lines_amount)
+
+    return setup
+
+
+def _depth_setup(depth: int):
+    def setup(lines_amount: int) -> BenchmarkRun:
+        fixture = _LoggerFixture(is_file=False)
+        return \
+            BenchmarkRun(
+                lambda: log_lines_in_depth(
+                    fixture.logger, depth, lines_amount),
+                fixture.close,
+                lines_amount)
+
+    return setup
+
+
+def _threads_setup(threads_amount: int):
+    def setup(lines_amount: int) -> BenchmarkRun:
+        fixture = _LoggerFixture(is_file=True)
+        thread_lines_amount = max(lines_amount // threads_amount, 1)
+
+        def run():
+            thread_list = [
+                Thread(
+                    target=log_lines,
+                    args=(fixture.logger, thread_lines_amount))
+                for _ in range(threads_amount)
+            ]
+
+            for thread in thread_list:
+                thread.start()
+
+            for thread in thread_list:
+                thread.join()
+
+        return \
+            BenchmarkRun(
+                run, fixture.close, thread_lines_amount * threads_amount)
+
+    return setup
+
+
+def _snapshot_setup(lines_amount: int) -> BenchmarkRun:
+    fixture = _LoggerFixture(is_file=False)
+    snapshots_amount = max(lines_amount // 10, 1)
+    return \
+        BenchmarkRun(
+            lambda: snapshot_in_depth(
+                fixture.logger, SNAPSHOT_METHODS_DEPTH, snapshots_amount),
+            fixture.close,
+            snapshots_amount)
+
+
+def _rotation_zip_setup(lines_amount: int) -> BenchmarkRun:
+    fixture = _LoggerFixture(is_file=True)
+    sh = fixture.stream_handler
+    sh.is_limit_file_size = True
+    sh.max_file_size = ROTATION_MAX_FILE_SIZE
+    sh.files_amount = ROTATION_FILES_AMOUNT
+    sh.is_zip = True
+
+    def run():
+        for _ in range(lines_amount):
+            fixture.logger.info(ROTATION_MSG)
+
+        # Compression is part of rotation cost
+        sh.flush_archives()
+
+    return BenchmarkRun(run, fixture.close, lines_amount)
+
+
+def _disabled_level_setup(lines_amount: int) -> BenchmarkRun:
+    fixture = _LoggerFixture(is_file=False, log_level=LogLevelEnum.ERROR)
+    calls_amount = lines_amount * DISABLED_LEVEL_CALLS_FACTOR
+
+    def run():
+        logger = fixture.logger
+
+        for _ in range(calls_amount):
+            logger.debug(MSG)
+
+    return BenchmarkRun(run, fixture.close, calls_amount)
+
+
+def build_scenario_list() -> list[BenchmarkScenario]:
+    scenario_list = []
+
+    for handler_name, is_file in (('console', False), ('file', True)):
+        for style in LogStyleEnum:
+            scenario_list.append(
+                BenchmarkScenario(
+                    f'{handler_name}_{style.name.lower()}',
+                    'style',
+                    _style_setup(is_file, style)))
+
+    scenario_list.extend(
+        BenchmarkScenario(f'depth_{depth}', 'depth', _depth_setup(depth))
+        for depth in DEPTH_LIST)
+    scenario_list.extend(
+        BenchmarkScenario(
+            f'threads_{threads_amount}',
+            'threads',
+            _threads_setup(threads_amount))
+        for threads_amount in THREADS_AMOUNT_LIST)
+    scenario_list.append(
+        BenchmarkScenario('snapshot', 'snapshot', _snapshot_setup))
+    scenario_list.append(
+        BenchmarkScenario('rotation_zip', 'rotation', _rotation_zip_setup))
+    scenario_list.append(
+        BenchmarkScenario(
+            'disabled_level', 'disabled_level', _disabled_level_setup))
+
+    return scenario_list
+
+
+SCENARIO_LIST = build_scenario_list()
@@ -0,0 +1,235 @@
+import ntpath
+import os
+import traceback
+from concurrent.futures import \
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Condition
+from typing import Callable, Optional
+from zipfile import ZipFile
+
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING_ARCHIVES = 16
+
+
+def zip_archive(
+        archive_file_path: str, compression: int, compression_level: int):
+    """
+    Compress archive file into zip file and delete archive file.
+    Module level function, so it can run in process pool.
+
+    @param archive_file_path: Archive file path.
+    @param compression: zipfile compression.
+    @param compression_level: zipfile compression level.
+    """
+
+    # Archive can be removed by files amount limitation before compression
+    if not os.path.exists(archive_file_path):
+        return
+
+    with ZipFile(
+            f'{archive_file_path}.zip',
+            mode='w',
+            compression=compression,
+            compresslevel=compression_level) as z:
+        z.write(archive_file_path, arcname=ntpath.basename(archive_file_path))
+
+    os.remove(archive_file_path)
+
+
+class ArchiveExecutor:
+    """
+    Bounded executor of archive compression tasks,
+    shared by file stream handlers.
+
+    In case max pending archives are in queue,
+    submit is blocked until pending archive is completed.
+    """
+
+    __max_workers: int
+    __max_pending_archives: int
+    __is_process_pool: bool
+    __executor: Optional[Executor]
+    __condition: Condition
+
+    __pending_archives: int
+    __completed_archives: int
+    __failed_archives: int
+    __blocked_submits: int
+    __max_pending_archives_reached: int
+
+    def __init__(
+            self,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            max_pending_archives: int = DEFAULT_MAX_PENDING_ARCHIVES,
+            is_process_pool: bool = False):
+        """
+        Constractor.
+
+        @param max_workers: Max compression workers.
+        @param max_pending_archives:
+            Max archives that are submitted and not completed.
+        @param is_process_pool:
+            Compress archives in processes instead of threads.
+        """
+
+        if max_workers <= 0:
+            raise ValueError('Max workers must be bigger from 0')
+
+        if max_pending_archives <= 0:
+            raise ValueError('Max pending archives must be bigger from 0')
+
+        self.__max_workers = max_workers
+        self.__max_pending_archives = max_pending_archives
+        self.__is_process_pool = is_process_pool
+        self.__executor = None
+        self.__condition = Condition()
+        self.__pending_archives = 0
+        self.__completed_archives = 0
+        self.__failed_archives = 0
+        self.__blocked_submits = 0
+        self.__max_pending_archives_reached = 0
+
+    def submit(
+            self,
+            fn: Callable,
+            *args,
+            callback: Optional[Callable[[], None]] = None,
+            error_callback: Optional[Callable[[], None]] = None):
+        """
+        Submit archive task.
+
+        @param fn:
+            Archive task.
+            In process pool, fn and args must be picklable.
+        @param args: Archive task arguments.
+        @param callback: Called in case archive task is succeeded.
+        @param error_callback: Called in case archive task is failed.
+        """
+
+        with self.__condition:
+            if self.__pending_archives >= self.__max_pending_archives:
+                self.__blocked_submits += 1
+
+                self.__condition.wait_for(
+                    lambda:
+                    self.__pending_archives < self.__max_pending_archives)
+
+            self.__pending_archives += 1
+            self.__max_pending_archives_reached = \
+                max(self.__max_pending_archives_reached,
+                    self.__pending_archives)
+
+            if self.__executor is None:
+                self.__executor = self.__create_executor()
+
+            future = self.__executor.submit(fn, *args)
+
+        future.add_done_callback(
+            lambda f: self.__on_archive_done(f, callback, error_callback))
+
+    def flush_archives(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all submitted archives are completed.
+
+        @param timeout: Timeout in seconds. None for no timeout.
+        @return: True if all submitted archives are completed.
+        """
+
+        with self.__condition:
+            return \
+                self.__condition.wait_for(
+                    lambda: self.__pending_archives == 0, timeout)
+
+    def shutdown(self):
+        """
+        Wait for submitted archives and stop executor workers.
+        """
+
+        with self.__condition:
+            executor = self.__executor
+            self.__executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @property
+    def max_pending_archives(self) -> int:
+        return self.__max_pending_archives
+
+    @property
+    def is_process_pool(self) -> bool:
+        return self.__is_process_pool
+
+    @property
+    def pending_archives(self) -> int:
+        return self.__pending_archives
+
+    @property
+    def completed_archives(self) -> int:
+        return self.__completed_archives
+
+    @property
+    def failed_archives(self) -> int:
+        return self.__failed_archives
+
+    @property
+    def blocked_submits(self) -> int:
+        """
+        Amount of submits that waited for free place in queue.
+        """
+
+        return self.__blocked_submits
+
+    @property
+    def max_pending_archives_reached(self) -> int:
+        return self.__max_pending_archives_reached
+
+    def __create_executor(self) -> Executor:
+        if self.__is_process_pool:
+            return ProcessPoolExecutor(max_workers=self.__max_workers)
+
+        return \
+            ThreadPoolExecutor(
+                max_workers=self.__max_workers,
+                thread_name_prefix='nrt_logging_archive')
+
+    def __on_archive_done(
+            self,
+            future: Future,
+            callback: Optional[Callable[[], None]],
+            error_callback: Optional[Callable[[], None]]):
+
+        is_failed = False
+
+        try:
+            future.result()
+        except Exception:
+            is_failed = True
+            traceback.print_exc()
+
+        done_callback = error_callback if is_failed else callback
+
+        try:
+            if done_callback is not None:
+                done_callback()
+        except Exception:
+            is_failed = True
+            traceback.print_exc()
+        finally:
+            with self.__condition:
+                self.__pending_archives -= 1
+
+                if is_failed:
+                    self.__failed_archives += 1
+                else:
+                    self.__completed_archives += 1
+
+                self.__condition.notify_all()
+
+
+archive_executor = ArchiveExecutor()
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional
+
+
+class AsyncLogWriter:
+    """
+    Writer of logs that are logged from asyncio event loop.
+
+    Stream writes are executed by a single writer thread,
+    so the event loop is not blocked on disk I/O
+    and logs are written in the order they were submitted.
+    """
+
+    __executor: Optional[ThreadPoolExecutor]
+    __lock: Lock
+
+    def __init__(self):
+        self.__executor = None
+        self.__lock = Lock()
+
+    def submit(self, fn: Callable, *args) -> asyncio.Future:
+        """
+        Submit stream write to writer thread.
+        Must be called from running event loop.
+
+        @param fn: Stream write.
+        @param args: Stream write arguments.
+        @return: Future that is done when stream write is completed.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = \
+                    ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix='nrt_logging_writer')
+
+            return loop.run_in_executor(self.__executor, fn, *args)
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Wait until submitted stream writes are completed.
+
+        @param timeout: Timeout in seconds. None for no timeout.
+        """
+
+        with self.__lock:
+            if self.__executor is None:
+                return
+
+            future = self.__executor.submit(lambda: None)
+
+        future.result(timeout)
+
+    def shutdown(self):
+        """
+        Wait for submitted stream writes and stop writer thread.
+        """
+
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+async_log_writer = AsyncLogWriter()
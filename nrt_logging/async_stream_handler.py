@@ -0,0 +1,495 @@
+import atexit
+import traceback
+import weakref
+from enum import Enum
+from queue import Queue, Full, Empty
+from threading import Condition, Lock, Thread
+from typing import Optional, Union
+
+from nrt_logging.call_stack import CallSite
+from nrt_logging.log_format import \
+    LogDateFormat, LogElementEnum, LogYamlElements
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger_stream_handlers import \
+    DepthState, LoggerStreamHandlerBase, LogRecord, LogStyleEnum, \
+    ManualDepthEnum
+from nrt_logging.snapshot import SnapshotRenderer
+from nrt_logging.stream_handler_stats import StreamHandlerStats
+
+
+class OverflowPolicyEnum(Enum):
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    SAMPLE = 'sample'
+
+    @classmethod
+    def build(cls, name: str):
+        name_l = name.lower()
+
+        for overflow_policy_enum in cls:
+            if name_l == overflow_policy_enum.value:
+                return overflow_policy_enum
+
+        raise ValueError(f'[{name}] is not valid overflow policy name')
+
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_OVERFLOW_POLICY = OverflowPolicyEnum.BLOCK
+DEFAULT_SAMPLE_RATE = 10
+
+
+class AsyncStreamHandler(LoggerStreamHandlerBase):
+    """
+    Asynchronous stream handler.
+
+    Wraps stream handler (ConsoleStreamHandler, FileStreamHandler).
+    Call site and log depth are resolved on the caller thread,
+    and the log record is pushed into a bounded queue.
+    Dedicated writer thread formats the log records
+    and writes them in batches to the wrapped stream handler.
+
+    Queued log records are written before close returns.
+    Log records after close are not written.
+    """
+
+    # Async stream handlers that are not closed, closed at exit
+    __async_stream_handlers: weakref.WeakSet = weakref.WeakSet()
+
+    __stream_handler: LoggerStreamHandlerBase
+    __queue: Queue
+    __writer_thread: Thread
+    __overflow_policy: OverflowPolicyEnum
+    __batch_size: int
+    __sample_rate: int
+    __overflow_counter: int
+    __dropped_records_amount: int
+    __overflow_lock: Lock
+    # Guards is_closed and the amount of log records that are being put,
+    # so the writer thread stop signal is the last item in queue
+    __put_condition: Condition
+    __putting_amount: int
+    __is_closed: bool
+
+    def __init__(
+            self,
+            stream_handler: LoggerStreamHandlerBase,
+            queue_size: int = DEFAULT_QUEUE_SIZE,
+            overflow_policy: OverflowPolicyEnum = DEFAULT_OVERFLOW_POLICY,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            sample_rate: int = DEFAULT_SAMPLE_RATE):
+        """
+        Constractor.
+
+        @param stream_handler: Wrapped stream handler.
+        @param queue_size: Max log records in queue.
+        @param overflow_policy: Policy in case queue is full.
+        @param batch_size: Max log records in a single write.
+        @param sample_rate:
+            In case of SAMPLE overflow policy,
+            one of every sample_rate log records is kept
+            when queue is full.
+        """
+
+        super().__init__(stack_log_start_index=2)
+
+        if queue_size <= 0:
+            raise ValueError('Queue size must be bigger from 0')
+
+        if batch_size <= 0:
+            raise ValueError('Batch size must be bigger from 0')
+
+        if sample_rate <= 0:
+            raise ValueError('Sample rate must be bigger from 0')
+
+        self.__stream_handler = stream_handler
+        self.__queue = Queue(maxsize=queue_size)
+        self.__overflow_policy = overflow_policy
+        self.__batch_size = batch_size
+        self.__sample_rate = sample_rate
+        self.__overflow_counter = 0
+        self.__dropped_records_amount = 0
+        self.__overflow_lock = Lock()
+        self.__put_condition = Condition()
+        self.__putting_amount = 0
+        self.__is_closed = False
+
+        self.__writer_thread = Thread(target=self.__write_loop, daemon=True)
+        self.__writer_thread.start()
+
+        self.__async_stream_handlers.add(self)
+
+    def critical(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
+
+    def error(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
+
+    def warn(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
+
+    def info(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
+
+    def debug(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
+
+    def trace(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
+
+    def snapshot(
+            self,
+            methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self._log(
+            LogLevelEnum.TRACE,
+            self.__stream_handler._create_snapshot_msg(
+                methods_depth, call_site),
+            manual_depth,
+            call_site)
+
+    def log_async(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None) -> None:
+        """
+        Log record is pushed into the queue,
+        so there is no stream write to wait for.
+        """
+
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self._log(log_level, msg, manual_depth, call_site)
+
+    def increase_depth(self, call_site: Optional[CallSite] = None):
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self.__stream_handler.increase_depth(call_site)
+
+    def decrease_depth(
+            self, level: int = 1, call_site: Optional[CallSite] = None):
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self.__stream_handler.decrease_depth(level, call_site)
+
+    def close(self):
+        """
+        Write all queued log records, stop writer thread
+        and close wrapped stream handler.
+        """
+
+        with self.__put_condition:
+            if self.__is_closed:
+                return
+
+            self.__is_closed = True
+            self.__put_condition.wait_for(
+                lambda: self.__putting_amount == 0)
+
+        # None is the writer thread stop signal
+        self.__queue.put(None)
+        self.__writer_thread.join()
+        self.__stream_handler.close()
+        self.__async_stream_handlers.discard(self)
+
+    def flush(self):
+        """
+        Wait until queued log records are written,
+        and flush wrapped stream handler.
+        """
+
+        if not self.__is_closed:
+            self.__queue.join()
+
+        self.__stream_handler.flush()
+
+    @property
+    def stream_handler(self) -> LoggerStreamHandlerBase:
+        return self.__stream_handler
+
+    @property
+    def overflow_policy(self) -> OverflowPolicyEnum:
+        return self.__overflow_policy
+
+    @property
+    def dropped_records_amount(self) -> int:
+        return self.__dropped_records_amount
+
+    @property
+    def queue_size(self) -> int:
+        return self.__queue.qsize()
+
+    @property
+    def name(self) -> str:
+        return self.__stream_handler.name
+
+    @name.setter
+    def name(self, name: str):
+        self.__stream_handler.name = name
+
+    @property
+    def style(self) -> LogStyleEnum:
+        return self.__stream_handler.style
+
+    @style.setter
+    def style(self, style: LogStyleEnum):
+        self.__stream_handler.style = style
+
+    @property
+    def log_level(self) -> LogLevelEnum:
+        return self.__stream_handler.log_level
+
+    @log_level.setter
+    def log_level(self, log_level: LogLevelEnum):
+        self.__stream_handler.log_level = log_level
+
+    @property
+    def log_date_format(self) -> LogDateFormat:
+        return self.__stream_handler.log_date_format
+
+    @log_date_format.setter
+    def log_date_format(self, log_date_format: LogDateFormat):
+        self.__stream_handler.log_date_format = log_date_format
+
+    @property
+    def log_yaml_elements(self) -> LogYamlElements:
+        return self.__stream_handler.log_yaml_elements
+
+    @log_yaml_elements.setter
+    def log_yaml_elements(
+            self,
+            log_yaml_elements:
+            Union[LogYamlElements, list[LogElementEnum], set[LogElementEnum]]):
+
+        self.__stream_handler.log_yaml_elements = log_yaml_elements
+
+    @property
+    def log_line_template(self) -> str:
+        return self.__stream_handler.log_line_template
+
+    @log_line_template.setter
+    def log_line_template(self, log_line_template: str):
+        self.__stream_handler.log_line_template = log_line_template
+
+    @property
+    def is_debug(self) -> bool:
+        return self.__stream_handler.is_debug
+
+    @is_debug.setter
+    def is_debug(self, is_debug: bool):
+        self.__stream_handler.is_debug = is_debug
+
+    @property
+    def is_batch_write(self) -> bool:
+        return self.__stream_handler.is_batch_write
+
+    @is_batch_write.setter
+    def is_batch_write(self, is_batch_write: bool):
+        self.__stream_handler.is_batch_write = is_batch_write
+
+    @property
+    def batch_write_size(self) -> int:
+        return self.__stream_handler.batch_write_size
+
+    @batch_write_size.setter
+    def batch_write_size(self, batch_write_size: int):
+        self.__stream_handler.batch_write_size = batch_write_size
+
+    @property
+    def batch_write_interval(self) -> float:
+        return self.__stream_handler.batch_write_interval
+
+    @batch_write_interval.setter
+    def batch_write_interval(self, batch_write_interval: float):
+        self.__stream_handler.batch_write_interval = batch_write_interval
+
+    @property
+    def snapshot_renderer(self) -> SnapshotRenderer:
+        return self.__stream_handler.snapshot_renderer
+
+    @snapshot_renderer.setter
+    def snapshot_renderer(self, snapshot_renderer: SnapshotRenderer):
+        self.__stream_handler.snapshot_renderer = snapshot_renderer
+
+    @property
+    def is_stats(self) -> bool:
+        return self.__stream_handler.is_stats
+
+    @is_stats.setter
+    def is_stats(self, is_stats: bool):
+        self.__stream_handler.is_stats = is_stats
+
+    @property
+    def stats(self) -> Optional[StreamHandlerStats]:
+        return self.__stream_handler.stats
+
+    def _log(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if self.__is_closed or log_level < self.log_level:
+            return
+
+        if call_site is None:
+            call_site = \
+                CallSite.build(start_index=self._stack_log_start_index)
+
+        # skipcq: PYL-W0212
+        log_record = \
+            self.__stream_handler._create_log_record(
+                log_level, msg, manual_depth, call_site)
+
+        # Close can start after the check above
+        with self.__put_condition:
+            is_closed = self.__is_closed
+
+            if not is_closed:
+                self.__putting_amount += 1
+
+        if is_closed:
+            return
+
+        try:
+            self.__put(log_record)
+        finally:
+            with self.__put_condition:
+                self.__putting_amount -= 1
+
+                if self.__putting_amount == 0:
+                    self.__put_condition.notify_all()
+
+    def _get_depth_state(self) -> DepthState:
+        """
+        Log depth is resolved by wrapped stream handler,
+        so scopes are pushed to its depth state.
+        """
+
+        # skipcq: PYL-W0212
+        return self.__stream_handler._get_depth_state()
+
+    def __put(self, log_record: LogRecord):
+        if self.__overflow_policy == OverflowPolicyEnum.BLOCK:
+            self.__queue.put(log_record)
+            return
+
+        try:
+            self.__queue.put_nowait(log_record)
+        except Full:
+            self.__put_on_overflow(log_record)
+
+    def __put_on_overflow(self, log_record: LogRecord):
+        with self.__overflow_lock:
+            if self.__overflow_policy == OverflowPolicyEnum.DROP_NEWEST:
+                self.__dropped_records_amount += 1
+                return
+
+            if self.__overflow_policy == OverflowPolicyEnum.SAMPLE:
+                self.__overflow_counter += 1
+
+                if self.__overflow_counter % self.__sample_rate != 0:
+                    self.__dropped_records_amount += 1
+                    return
+
+            # DROP_OLDEST, or sampled log record in SAMPLE
+            while True:
+                try:
+                    self.__queue.put_nowait(log_record)
+                    return
+                except Full:
+                    self.__drop_oldest()
+
+    def __drop_oldest(self):
+        try:
+            oldest_log_record = self.__queue.get_nowait()
+        except Empty:
+            return
+
+        self.__queue.task_done()
+
+        # Writer thread stop signal is put after the log records,
+        # so the oldest item is always log record
+        if oldest_log_record is not None:
+            self.__dropped_records_amount += 1
+
+    def __write_loop(self):
+        is_running = True
+
+        while is_running:
+            log_record_list = [self.__queue.get()]
+
+            while len(log_record_list) < self.__batch_size:
+                try:
+                    log_record_list.append(self.__queue.get_nowait())
+                except Empty:
+                    break
+
+            queued_amount = len(log_record_list)
+
+            if None in log_record_list:
+                is_running = False
+                log_record_list = \
+                    [log_record for log_record in log_record_list
+                     if log_record is not None]
+
+            try:
+                if log_record_list:
+                    # skipcq: PYL-W0212
+                    self.__stream_handler._write_log_records(log_record_list)
+            except Exception:
+                # Writer thread keeps running, so producers and flush
+                # are not blocked by failed write
+                traceback.print_exc()
+            finally:
+                for _ in range(queued_amount):
+                    self.__queue.task_done()
+
+    @classmethod
+    def close_async_stream_handlers(cls):
+        """
+        Close all async stream handlers,
+        after their queued log records are written.
+        """
+
+        for async_stream_handler in list(cls.__async_stream_handlers):
+            async_stream_handler.close()
+
+
+atexit.register(AsyncStreamHandler.close_async_stream_handlers)
@@ -0,0 +1,321 @@
+import itertools
+import ntpath
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from inspect import CO_OPTIMIZED
+from types import CodeType, FrameType
+from typing import Callable, Optional
+
+
+FRAME_IDENTITY_CACHE_SIZE = 4096
+
+# Creates call stack of log call site from its frame and frame method name.
+# Set while CallTracker is running. None to walk frames.
+_call_stack_factory: \
+    Optional[Callable[[FrameType, str], Optional['CallStack']]] = None
+
+
+def set_call_stack_factory(
+        call_stack_factory:
+        Optional[Callable[[FrameType, str], Optional['CallStack']]]):
+    """
+    Set factory of log call site call stack.
+
+    @param call_stack_factory:
+        Callable that gets call site frame and frame method name,
+        and returns call stack, or None for call stack that walks frames.
+        None to always walk frames.
+    """
+
+    global _call_stack_factory
+    _call_stack_factory = call_stack_factory
+
+
+_thread_local = threading.local()
+_thread_key_counter = itertools.count(1)
+# Keys of threads that are not ended
+_alive_thread_key_set: set[int] = set()
+
+
+class _ThreadKeyToken:
+    """
+    Kept in thread local storage, that is released when thread ends,
+    so thread key is removed from alive thread keys.
+    """
+
+    def __init__(self, thread_key: int):
+        _alive_thread_key_set.add(thread_key)
+        weakref.finalize(self, _alive_thread_key_set.discard, thread_key)
+
+
+def get_thread_key() -> int:
+    """
+    Get key of current thread.
+
+    Thread ident is reused right after its thread ends,
+    while thread key is unique in process.
+
+    @return: Thread key.
+    """
+
+    try:
+        return _thread_local.thread_key
+    except AttributeError:
+        thread_key = next(_thread_key_counter)
+        _thread_local.thread_key_token = _ThreadKeyToken(thread_key)
+        _thread_local.thread_key = thread_key
+        return thread_key
+
+
+def is_thread_key_alive(thread_key: int) -> bool:
+    return thread_key in _alive_thread_key_set
+
+
+@lru_cache(maxsize=FRAME_IDENTITY_CACHE_SIZE)
+def _get_code_identity(
+        code: CodeType, receiver_class: Optional[type]) -> tuple:
+    """
+    Get path, method and frame method name of code object
+    that is called on receiver class.
+
+    Names are interned, so frame method names of the same code
+    and receiver class are the same string object.
+
+    @param code: Frame code object.
+    @param receiver_class: Class of frame 'self' local. None if no 'self'.
+    @return: (path, method, fm_name).
+    """
+
+    path = ntpath.basename(code.co_filename)
+
+    if receiver_class is not None:
+        path = f'{path}.{receiver_class.__name__}'
+
+    path = sys.intern(path)
+    method = sys.intern(code.co_name)
+
+    return path, method, sys.intern(f'{path}.{method}')
+
+
+@lru_cache(maxsize=FRAME_IDENTITY_CACHE_SIZE)
+def _is_code_with_self(code: CodeType) -> bool:
+    """
+    Check if 'self' can be in frame locals of code object.
+    Frame locals of not optimized code (module, class body) are dict,
+    so they are always checked.
+    """
+
+    return \
+        not code.co_flags & CO_OPTIMIZED \
+        or 'self' in code.co_varnames \
+        or 'self' in code.co_cellvars \
+        or 'self' in code.co_freevars
+
+
+class CallStack:
+    """
+    Lazy call stack.
+
+    Frames are walked with frame.f_back only when they are needed,
+    and frame method names (path.Class.method) are created lazily,
+    so log methods pay only for the frames that the depth algorithm reads.
+    """
+
+    __frame_list: list[FrameType]
+    __fm_name_list: list[str]
+    # Last index of each frame method name in __fm_name_list
+    __fm_name_index_dict: dict[str, int]
+    __next_frame: Optional[FrameType]
+
+    def __init__(self, frame: Optional[FrameType]):
+        """
+        Constractor.
+
+        @param frame: First frame in the call stack (index 0).
+        """
+
+        self.__frame_list = []
+        self.__fm_name_list = []
+        self.__fm_name_index_dict = {}
+        self.__next_frame = frame
+
+    def __len__(self) -> int:
+        self.__walk_all()
+        return len(self.__frame_list)
+
+    def __contains__(self, fm_name: str) -> bool:
+        return self.is_contains(fm_name)
+
+    def is_contains(self, fm_name: str, start_index: int = 0) -> bool:
+        """
+        Check if frame method name is in the call stack.
+        Frame method names that were created are looked up in index,
+        and frames are walked only from the last created frame method name,
+        until frame method name is found.
+
+        @param fm_name: Frame method name.
+        @param start_index: Index in the call stack to start search from.
+        @return: True if frame method name is in the call stack.
+        """
+
+        if self.__fm_name_index_dict.get(fm_name, -1) >= start_index:
+            return True
+
+        i = max(len(self.__fm_name_list), start_index)
+
+        while self.__walk_to(i):
+            if self.get_fm_name(i) == fm_name:
+                return True
+
+            i += 1
+
+        return False
+
+    def get_frame(self, index: int) -> FrameType:
+        if not self.__walk_to(index):
+            raise IndexError(f'Call stack index [{index}] out of range')
+
+        return self.__frame_list[index]
+
+    def get_fm_name(self, index: int) -> str:
+        if index >= len(self.__fm_name_list):
+            self.__create_fm_names_to(index)
+
+        return self.__fm_name_list[index]
+
+    def get_fm_name_list(self) -> list[str]:
+        self.__walk_all()
+        self.__create_fm_names_to(len(self.__frame_list) - 1)
+        return list(self.__fm_name_list)
+
+    def get_path_method_and_line_number(self, index: int) -> tuple:
+        frame = self.get_frame(index)
+        path, method = self.get_frame_path_and_method(frame)
+        return path, method, str(frame.f_lineno)
+
+    def __create_fm_names_to(self, index: int):
+        if not self.__walk_to(index):
+            raise IndexError(f'Call stack index [{index}] out of range')
+
+        for i in range(len(self.__fm_name_list), index + 1):
+            fm_name = self.get_frame_identity(self.__frame_list[i])[2]
+            self.__fm_name_list.append(fm_name)
+            self.__fm_name_index_dict[fm_name] = i
+
+    def __walk_to(self, index: int) -> bool:
+        while len(self.__frame_list) <= index:
+            if self.__next_frame is None:
+                return False
+
+            self.__frame_list.append(self.__next_frame)
+            self.__next_frame = self.__next_frame.f_back
+
+        return True
+
+    def __walk_all(self):
+        while self.__next_frame is not None:
+            self.__frame_list.append(self.__next_frame)
+            self.__next_frame = self.__next_frame.f_back
+
+    @classmethod
+    def build(cls, start_index: int) -> 'CallStack':
+        """
+        Build call stack from the frames of the caller of build method.
+
+        @param start_index:
+            Index of first frame, when index 0 is the caller of build.
+        @return: CallStack.
+        """
+
+        try:
+            # skipcq: PYL-W0212
+            frame = sys._getframe(start_index + 1)
+        except ValueError:
+            frame = None
+
+        return cls(frame)
+
+    @classmethod
+    def get_frame_path_and_method(cls, frame: FrameType) -> tuple:
+        path, method, _ = cls.get_frame_identity(frame)
+        return path, method
+
+    @classmethod
+    def get_frame_identity(cls, frame: FrameType) -> tuple:
+        """
+        Get frame path, method and frame method name.
+        Cached by frame code object and receiver class.
+
+        @param frame: Frame.
+        @return: (path, method, fm_name) interned strings.
+        """
+
+        code = frame.f_code
+        receiver_class = None
+
+        if _is_code_with_self(code):
+            slf = frame.f_locals.get('self')
+
+            if slf:
+                receiver_class = slf.__class__
+
+        return _get_code_identity(code, receiver_class)
+
+    @classmethod
+    def clear_frame_identity_cache(cls):
+        _get_code_identity.cache_clear()
+        _is_code_with_self.cache_clear()
+
+    @classmethod
+    def create_fm_name(cls, path: str, method: str) -> str:
+        return f'{path}.{method}'
+
+
+@dataclass(frozen=True)
+class CallSite:
+    """
+    Immutable record of the log call site.
+
+    Created once per logger call and shared by all stream handlers,
+    so the call stack is resolved only once per log message.
+    """
+
+    call_stack: CallStack
+    path: str
+    method: str
+    line_number: str
+    fm_name: str
+    date: datetime
+    thread_key: int
+
+    @classmethod
+    def build(cls, start_index: int) -> 'CallSite':
+        """
+        Build call site from the frames of the caller of build method.
+
+        @param start_index:
+            Index of the log caller frame,
+            when index 0 is the caller of build.
+        @return: CallSite.
+        """
+
+        call_stack = CallStack.build(start_index=start_index + 1)
+        frame = call_stack.get_frame(0)
+        path, method, fm_name = CallStack.get_frame_identity(frame)
+
+        if _call_stack_factory is not None:
+            call_stack = _call_stack_factory(frame, fm_name) or call_stack
+
+        return \
+            cls(
+                call_stack=call_stack,
+                path=path,
+                method=method,
+                line_number=str(frame.f_lineno),
+                fm_name=fm_name,
+                date=datetime.now(),
+                thread_key=get_thread_key())
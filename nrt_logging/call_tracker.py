@@ -0,0 +1,506 @@
+import sys
+import threading
+import timeit
+from dataclasses import dataclass
+from enum import Enum
+from types import CodeType, FrameType, FunctionType, ModuleType
+from typing import Callable, Optional, Union
+
+from nrt_logging.call_stack import CallStack, set_call_stack_factory
+
+
+DEFAULT_OVERHEAD_REPEAT = 3
+
+# Free sys.monitoring tool ids, before profiler tool id
+_MONITORING_TOOL_ID_LIST = (3, 4, 2)
+
+
+class CallTrackerBackendEnum(Enum):
+    MONITORING = 'monitoring'
+    PROFILE = 'profile'
+
+    @property
+    def is_available(self) -> bool:
+        if self == CallTrackerBackendEnum.MONITORING:
+            return hasattr(sys, 'monitoring')
+
+        return True
+
+    @classmethod
+    def build(cls, name: str):
+        name_l = name.lower()
+
+        for backend_enum in cls:
+            if name_l == backend_enum.value:
+                return backend_enum
+
+        raise ValueError(f'[{name}] is not valid call tracker backend name')
+
+    @classmethod
+    def get_default(cls) -> 'CallTrackerBackendEnum':
+        if cls.MONITORING.is_available:
+            return cls.MONITORING
+
+        return cls.PROFILE
+
+
+@dataclass
+class CallTrackerStats:
+    backend: Optional[CallTrackerBackendEnum]
+    # Calls of tracked code, including generator and coroutine resumes
+    tracked_calls: int
+    tracked_modules: int
+    tracked_codes: int
+
+
+@dataclass
+class CallTrackerOverheadReport:
+    backend: CallTrackerBackendEnum
+    # Min workload time in seconds, when log call stack walks frames
+    stack_walk_time: float
+    # Min workload time in seconds, when calls are tracked
+    tracking_time: float
+    tracked_calls: int
+
+    @property
+    def overhead_ratio(self) -> float:
+        """
+        Tracking time relative to stack walk time.
+        Smaller from 1 in case tracking is cheaper on the workload.
+        """
+
+        if self.stack_walk_time <= 0:
+            return 0.0
+
+        return self.tracking_time / self.stack_walk_time
+
+
+class CallPath:
+    """
+    Call path of tracked code in a single thread,
+    from the outer call to the inner call.
+    """
+
+    code_list: list[CodeType]
+    fm_name_list: list[str]
+    fm_name_count_dict: dict[str, int]
+
+    def __init__(self):
+        self.code_list = []
+        self.fm_name_list = []
+        self.fm_name_count_dict = {}
+
+    def push(self, code: CodeType, fm_name: str):
+        self.code_list.append(code)
+        self.fm_name_list.append(fm_name)
+        self.fm_name_count_dict[fm_name] = \
+            self.fm_name_count_dict.get(fm_name, 0) + 1
+
+    def pop(self, code: CodeType):
+        """
+        Pop inner call, in case it is of code.
+        Returns of calls that started before tracking are ignored.
+
+        @param code: Code of returned call.
+        """
+
+        if not self.code_list or self.code_list[-1] is not code:
+            return
+
+        self.code_list.pop()
+        fm_name = self.fm_name_list.pop()
+        count = self.fm_name_count_dict[fm_name] - 1
+
+        if count:
+            self.fm_name_count_dict[fm_name] = count
+        else:
+            del self.fm_name_count_dict[fm_name]
+
+
+class TrackedCallStack(CallStack):
+    """
+    Call stack of log call site, that is checked against the call path
+    of tracked code, instead of walking the frames.
+
+    Index 0 is the call site, and the next indexes are the tracked calls
+    from the inner call to the outer call.
+    Frames are still walked lazily by get_frame, for snapshot and debug.
+    Valid only during the log call, since the call path is changed
+    by the next calls of the thread.
+    """
+
+    __fm_name: str
+    __call_path: CallPath
+    # True in case call site is the inner call in call path
+    __is_call_site_in_path: bool
+
+    def __init__(self, frame: FrameType, fm_name: str, call_path: CallPath):
+        """
+        Constractor.
+
+        @param frame: Call site frame.
+        @param fm_name: Call site frame method name.
+        @param call_path: Call path of call site thread.
+        """
+
+        super().__init__(frame)
+        self.__fm_name = fm_name
+        self.__call_path = call_path
+        self.__is_call_site_in_path = \
+            bool(call_path.code_list) \
+            and call_path.code_list[-1] is frame.f_code
+
+    def is_contains(self, fm_name: str, start_index: int = 0) -> bool:
+        if start_index == 0 and fm_name == self.__fm_name:
+            return True
+
+        if start_index > 1:
+            return fm_name in self.__get_tracked_fm_name_list()[start_index:]
+
+        count = self.__call_path.fm_name_count_dict.get(fm_name, 0)
+
+        if self.__is_call_site_in_path and fm_name == self.__fm_name:
+            count -= 1
+
+        return count > 0
+
+    def __get_tracked_fm_name_list(self) -> list[str]:
+        fm_name_list = self.__call_path.fm_name_list
+
+        if self.__is_call_site_in_path:
+            fm_name_list = fm_name_list[:-1]
+
+        return [self.__fm_name] + fm_name_list[::-1]
+
+
+class CallTracker:
+    """
+    Opt-in tracker of the call path of each thread,
+    for calls of selected modules and code objects.
+
+    While it is running, log depth is resolved against the tracked
+    call path in O(1), instead of walking the frames of the call stack,
+    so the hierarchy is built only from tracked calls.
+
+    Calls are tracked by sys.monitoring (Python 3.12+),
+    that disables the events of not tracked code after their first call.
+    sys.setprofile is the fallback for older Python versions.
+    It receives events of all calls, and tracks threads that are started
+    after the tracker, and the thread that started the tracker.
+    """
+
+    __backend: Optional[CallTrackerBackendEnum]
+    __monitoring_tool_id: Optional[int]
+    __module_file_path_dict: dict[str, str]
+    __code_set: set[CodeType]
+    # Is tracked cache, by code
+    __is_tracked_dict: dict[CodeType, bool]
+    __thread_local: threading.local
+    __tracked_calls: int
+
+    def __init__(self):
+        self.__backend = None
+        self.__monitoring_tool_id = None
+        self.__module_file_path_dict = {}
+        self.__code_set = set()
+        self.__is_tracked_dict = {}
+        self.__thread_local = threading.local()
+        self.__tracked_calls = 0
+
+    def enable_module(self, module: Union[ModuleType, str]):
+        """
+        Track calls of code that is defined in module.
+
+        @param module: Module, or name of imported module.
+        """
+
+        if isinstance(module, str):
+            module = sys.modules[module]
+
+        file_path = getattr(module, '__file__', None)
+
+        if not file_path:
+            raise ValueError(
+                f'Module [{module.__name__}] has no source file')
+
+        self.__module_file_path_dict[module.__name__] = file_path
+        self.__on_tracked_code_change()
+
+    def disable_module(self, module: Union[ModuleType, str]):
+        module_name = module if isinstance(module, str) else module.__name__
+        self.__module_file_path_dict.pop(module_name, None)
+        self.__on_tracked_code_change()
+
+    def enable_code(self, code: Union[CodeType, Callable]):
+        """
+        Track calls of code object, or of function code.
+
+        @param code: Code object or function.
+        """
+
+        self.__code_set.add(self.__get_code(code))
+        self.__on_tracked_code_change()
+
+    def disable_code(self, code: Union[CodeType, Callable]):
+        self.__code_set.discard(self.__get_code(code))
+        self.__on_tracked_code_change()
+
+    def start(self, backend: Optional[CallTrackerBackendEnum] = None):
+        """
+        Start tracking.
+
+        @param backend: Tracking backend. None for the fastest available.
+        """
+
+        if self.__backend is not None:
+            raise RuntimeError('Call tracker is already started')
+
+        if backend is None:
+            backend = CallTrackerBackendEnum.get_default()
+
+        if not backend.is_available:
+            raise ValueError(
+                f'Call tracker backend [{backend.value}] is not available')
+
+        self.__thread_local = threading.local()
+        self.__seed_current_thread_call_path()
+
+        if backend == CallTrackerBackendEnum.MONITORING:
+            self.__start_monitoring()
+        else:
+            threading.setprofile(self.__on_profile_event)
+            sys.setprofile(self.__on_profile_event)
+
+        self.__backend = backend
+        set_call_stack_factory(self.__create_call_stack)
+
+    def stop(self):
+        if self.__backend is None:
+            return
+
+        set_call_stack_factory(None)
+
+        if self.__backend == CallTrackerBackendEnum.MONITORING:
+            self.__stop_monitoring()
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+
+        self.__backend = None
+
+    def get_call_path(self) -> list[str]:
+        """
+        Get tracked call path of current thread.
+
+        @return: Frame method names from the outer call to the inner call.
+        """
+
+        return list(self.__get_call_path().fm_name_list)
+
+    def measure_overhead(
+            self,
+            workload: Callable[[], object],
+            repeat: int = DEFAULT_OVERHEAD_REPEAT,
+            backend: Optional[CallTrackerBackendEnum] = None) \
+            -> CallTrackerOverheadReport:
+        """
+        Run workload with frames walk and with call tracking,
+        and report the min time of each.
+
+        @param workload: Callable that logs, for example request handler.
+        @param repeat: Workload runs of each mode.
+        @param backend: Tracking backend. None for the running backend,
+            or the fastest available in case tracker is not running.
+        @return: CallTrackerOverheadReport.
+        """
+
+        if repeat <= 0:
+            raise ValueError('Repeat must be bigger from 0')
+
+        if backend is None:
+            backend = self.__backend or CallTrackerBackendEnum.get_default()
+
+        running_backend = self.__backend
+        self.stop()
+
+        try:
+            stack_walk_time = \
+                min(timeit.repeat(workload, number=1, repeat=repeat))
+
+            tracked_calls = self.__tracked_calls
+            self.start(backend)
+
+            try:
+                tracking_time = \
+                    min(timeit.repeat(workload, number=1, repeat=repeat))
+            finally:
+                self.stop()
+
+            tracked_calls = self.__tracked_calls - tracked_calls
+        finally:
+            if running_backend is not None:
+                self.start(running_backend)
+
+        return \
+            CallTrackerOverheadReport(
+                backend=backend,
+                stack_walk_time=stack_walk_time,
+                tracking_time=tracking_time,
+                tracked_calls=tracked_calls)
+
+    @property
+    def is_running(self) -> bool:
+        return self.__backend is not None
+
+    @property
+    def backend(self) -> Optional[CallTrackerBackendEnum]:
+        return self.__backend
+
+    @property
+    def stats(self) -> CallTrackerStats:
+        return \
+            CallTrackerStats(
+                backend=self.__backend,
+                tracked_calls=self.__tracked_calls,
+                tracked_modules=len(self.__module_file_path_dict),
+                tracked_codes=len(self.__code_set))
+
+    def __create_call_stack(
+            self, frame: FrameType, fm_name: str) -> TrackedCallStack:
+        return TrackedCallStack(frame, fm_name, self.__get_call_path())
+
+    def __get_call_path(self) -> CallPath:
+        call_path = getattr(self.__thread_local, 'call_path', None)
+
+        if call_path is None:
+            call_path = CallPath()
+            self.__thread_local.call_path = call_path
+
+        return call_path
+
+    def __is_tracked(self, code: CodeType) -> bool:
+        is_tracked = self.__is_tracked_dict.get(code)
+
+        if is_tracked is None:
+            is_tracked = \
+                code in self.__code_set \
+                or code.co_filename in self.__module_file_path_dict.values()
+            self.__is_tracked_dict[code] = is_tracked
+
+        return is_tracked
+
+    def __push(self, frame: FrameType):
+        self.__tracked_calls += 1
+        self.__get_call_path().push(
+            frame.f_code, CallStack.get_frame_identity(frame)[2])
+
+    def __seed_current_thread_call_path(self):
+        """
+        Push tracked calls that started before tracking
+        in current thread.
+        """
+
+        frame_list = []
+        frame = sys._getframe(2)
+
+        while frame is not None:
+            if self.__is_tracked(frame.f_code):
+                frame_list.append(frame)
+
+            frame = frame.f_back
+
+        call_path = self.__get_call_path()
+
+        for frame in reversed(frame_list):
+            call_path.push(
+                frame.f_code, CallStack.get_frame_identity(frame)[2])
+
+    def __on_tracked_code_change(self):
+        self.__is_tracked_dict.clear()
+
+        # Events of code that was not tracked were disabled
+        if self.__backend == CallTrackerBackendEnum.MONITORING:
+            sys.monitoring.restart_events()
+
+    def __on_profile_event(self, frame: FrameType, event: str, _arg):
+        if event == 'call':
+            if self.__is_tracked(frame.f_code):
+                self.__push(frame)
+        elif event == 'return':
+            if self.__is_tracked(frame.f_code):
+                self.__get_call_path().pop(frame.f_code)
+
+    def __start_monitoring(self):
+        monitoring = sys.monitoring
+        events = monitoring.events
+
+        for tool_id in _MONITORING_TOOL_ID_LIST:
+            if monitoring.get_tool(tool_id) is None:
+                monitoring.use_tool_id(tool_id, 'nrt_logging')
+                self.__monitoring_tool_id = tool_id
+                break
+        else:
+            raise RuntimeError('No free sys.monitoring tool id')
+
+        for event, callback in (
+                (events.PY_START, self.__on_monitoring_start),
+                (events.PY_RESUME, self.__on_monitoring_start),
+                (events.PY_RETURN, self.__on_monitoring_return),
+                (events.PY_YIELD, self.__on_monitoring_return),
+                (events.PY_UNWIND, self.__on_monitoring_unwind)):
+            monitoring.register_callback(
+                self.__monitoring_tool_id, event, callback)
+
+        event_set = events.PY_START | events.PY_RESUME | events.PY_RETURN
+        event_set |= events.PY_YIELD | events.PY_UNWIND
+        monitoring.set_events(self.__monitoring_tool_id, event_set)
+
+    def __stop_monitoring(self):
+        monitoring = sys.monitoring
+        monitoring.set_events(
+            self.__monitoring_tool_id, monitoring.events.NO_EVENTS)
+        monitoring.free_tool_id(self.__monitoring_tool_id)
+        monitoring.restart_events()
+        self.__monitoring_tool_id = None
+
+    def __on_monitoring_start(self, code: CodeType, _instruction_offset):
+        if not self.__is_tracked(code):
+            return sys.monitoring.DISABLE
+
+        # Frame of the started code is the caller of the callback
+        self.__push(sys._getframe(1))
+        return None
+
+    def __on_monitoring_return(
+            self, code: CodeType, _instruction_offset, _retval):
+        if not self.__is_tracked(code):
+            return sys.monitoring.DISABLE
+
+        self.__get_call_path().pop(code)
+        return None
+
+    def __on_monitoring_unwind(
+            self, code: CodeType, _instruction_offset, _exception):
+        # Unwind events can not be disabled
+        if self.__is_tracked(code):
+            self.__get_call_path().pop(code)
+
+    @classmethod
+    def __get_code(cls, code: Union[CodeType, Callable]) -> CodeType:
+        if isinstance(code, CodeType):
+            return code
+
+        # Decorated function
+        if hasattr(code, '__wrapped__'):
+            return cls.__get_code(code.__wrapped__)
+
+        if isinstance(code, FunctionType):
+            return code.__code__
+
+        if hasattr(code, '__func__'):
+            return cls.__get_code(code.__func__)
+
+        raise ValueError(f'[{code}] has no code object')
+
+
+call_tracker = CallTracker()
@@ -10,7 +10,10 @@ from nrt_logging.logger_stream_handlers import \
     LogStyleEnum, StreamHandlerEnum, ConsoleStreamHandler, \
     FileStreamHandler, LoggerStreamHandlerBase,\
     DEFAULT_MAX_FILE_SIZE, DEFAULT_FILES_AMOUNT, \
-    FileSizeEnum
+    FileSizeEnum, FlushPolicyEnum, ZipCompressionEnum
+from nrt_logging.async_stream_handler import OverflowPolicyEnum
+from nrt_logging.ring_buffer_stream_handler import \
+    DEFAULT_RING_BUFFER_SIZE, RingBufferStreamHandler
 
 
 class ConfigBase:
@@ -24,6 +27,16 @@ class ConfigBase:
     MAX_FILE_SIZE = 'max_file_size'
     FILES_AMOUNT = 'files_amount'
     IS_ZIP = 'is_zip'
+    ZIP_COMPRESSION = 'zip_compression'
+    ZIP_COMPRESSION_LEVEL = 'zip_compression_level'
+    IS_PERSISTENT_STREAM = 'is_persistent_stream'
+    BUFFER_SIZE = 'buffer_size'
+    FLUSH_POLICY = 'flush_policy'
+    FLUSH_LINES_AMOUNT = 'flush_lines_amount'
+    FLUSH_INTERVAL = 'flush_interval'
+    IS_BATCH_WRITE = 'is_batch_write'
+    BATCH_WRITE_SIZE = 'batch_write_size'
+    BATCH_WRITE_INTERVAL = 'batch_write_interval'
 
     _log_level: Optional[LogLevelEnum] = None
     _style: Optional[LogStyleEnum] = None
@@ -35,6 +48,18 @@ class ConfigBase:
     _max_file_size: int = DEFAULT_MAX_FILE_SIZE
     _files_amount: int = DEFAULT_FILES_AMOUNT
     _is_zip: bool = False
+    _zip_compression: Optional[ZipCompressionEnum] = None
+    _zip_compression_level: Optional[int] = None
+
+    _is_persistent_stream: Optional[bool] = None
+    _buffer_size: Optional[int] = None
+    _flush_policy: Optional[FlushPolicyEnum] = None
+    _flush_lines_amount: Optional[int] = None
+    _flush_interval: Optional[float] = None
+
+    _is_batch_write: Optional[bool] = None
+    _batch_write_size: Optional[int] = None
+    _batch_write_interval: Optional[float] = None
 
     _config: Optional[dict] = None
 
@@ -51,6 +76,16 @@ class ConfigBase:
         self.__update_max_file_size()
         self.__update_files_amount()
         self.__update_is_zip()
+        self.__update_zip_compression()
+        self.__update_zip_compression_level()
+        self.__update_is_persistent_stream()
+        self.__update_buffer_size()
+        self.__update_flush_policy()
+        self.__update_flush_lines_amount()
+        self.__update_flush_interval()
+        self.__update_is_batch_write()
+        self.__update_batch_write_size()
+        self.__update_batch_write_interval()
 
     @property
     def log_level(self) -> LogLevelEnum:
@@ -88,6 +123,46 @@ class ConfigBase:
     def is_zip(self) -> bool:
         return self._is_zip
 
+    @property
+    def zip_compression(self) -> Optional[ZipCompressionEnum]:
+        return self._zip_compression
+
+    @property
+    def zip_compression_level(self) -> Optional[int]:
+        return self._zip_compression_level
+
+    @property
+    def is_persistent_stream(self) -> Optional[bool]:
+        return self._is_persistent_stream
+
+    @property
+    def buffer_size(self) -> Optional[int]:
+        return self._buffer_size
+
+    @property
+    def flush_policy(self) -> Optional[FlushPolicyEnum]:
+        return self._flush_policy
+
+    @property
+    def flush_lines_amount(self) -> Optional[int]:
+        return self._flush_lines_amount
+
+    @property
+    def flush_interval(self) -> Optional[float]:
+        return self._flush_interval
+
+    @property
+    def is_batch_write(self) -> Optional[bool]:
+        return self._is_batch_write
+
+    @property
+    def batch_write_size(self) -> Optional[int]:
+        return self._batch_write_size
+
+    @property
+    def batch_write_interval(self) -> Optional[float]:
+        return self._batch_write_interval
+
     @property
     def is_debug(self) -> bool:
         return self._is_debug
@@ -171,15 +246,124 @@ class ConfigBase:
         if is_zip is not None:
             self._is_zip = is_zip
 
+    def __update_zip_compression(self):
+        zip_compression_str = self._config.get(self.ZIP_COMPRESSION)
+
+        if zip_compression_str:
+            try:
+                self._zip_compression = \
+                    ZipCompressionEnum.build(zip_compression_str)
+            except ValueError:
+                raise ValueError(
+                    f'{self.ZIP_COMPRESSION} value [{zip_compression_str}]'
+                    f' in log config is invalid')
+
+    def __update_zip_compression_level(self):
+        zip_compression_level = self._config.get(self.ZIP_COMPRESSION_LEVEL)
+
+        if zip_compression_level is not None:
+            self._zip_compression_level = int(zip_compression_level)
+
+            if not 0 <= self._zip_compression_level <= 9:
+                raise ValueError(
+                    'Zip compression level in log config'
+                    ' must be between 0 and 9')
+
+    def __update_is_persistent_stream(self):
+        is_persistent_stream = self._config.get(self.IS_PERSISTENT_STREAM)
+
+        if is_persistent_stream is not None:
+            self._is_persistent_stream = is_persistent_stream
+
+    def __update_buffer_size(self):
+        buffer_size_str = self._config.get(self.BUFFER_SIZE)
+
+        if buffer_size_str:
+            self._buffer_size = FileSizeEnum.get_bytes(buffer_size_str)
+
+    def __update_flush_policy(self):
+        flush_policy_str = self._config.get(self.FLUSH_POLICY)
+
+        if flush_policy_str:
+            try:
+                self._flush_policy = FlushPolicyEnum.build(flush_policy_str)
+            except ValueError:
+                raise ValueError(
+                    f'{self.FLUSH_POLICY} value [{flush_policy_str}]'
+                    f' in log config is invalid')
+
+    def __update_flush_lines_amount(self):
+        flush_lines_amount = self._config.get(self.FLUSH_LINES_AMOUNT)
+
+        if flush_lines_amount is not None:
+            self._flush_lines_amount = int(flush_lines_amount)
+
+            if self._flush_lines_amount <= 0:
+                raise ValueError(
+                    'Flush lines amount in log config must be positive')
+
+    def __update_flush_interval(self):
+        flush_interval = self._config.get(self.FLUSH_INTERVAL)
+
+        if flush_interval is not None:
+            self._flush_interval = float(flush_interval)
+
+            if self._flush_interval <= 0:
+                raise ValueError(
+                    'Flush interval in log config must be positive')
+
+    def __update_is_batch_write(self):
+        is_batch_write = self._config.get(self.IS_BATCH_WRITE)
+
+        if is_batch_write is not None:
+            self._is_batch_write = is_batch_write
+
+    def __update_batch_write_size(self):
+        batch_write_size_str = self._config.get(self.BATCH_WRITE_SIZE)
+
+        if batch_write_size_str:
+            self._batch_write_size = \
+                FileSizeEnum.get_bytes(batch_write_size_str)
+
+            if self._batch_write_size <= 0:
+                raise ValueError(
+                    'Batch write size in log config must be positive')
+
+    def __update_batch_write_interval(self):
+        batch_write_interval = self._config.get(self.BATCH_WRITE_INTERVAL)
+
+        if batch_write_interval is not None:
+            self._batch_write_interval = float(batch_write_interval)
+
+            if self._batch_write_interval <= 0:
+                raise ValueError(
+                    'Batch write interval in log config must be positive')
+
 
 class StreamHandlerConfig(ConfigBase):
     STREAM_HANDLER_NAME = 'name'
     TYPE = 'type'
     FILE_PATH = 'file_path'
+    IS_ASYNC = 'is_async'
+    ASYNC_QUEUE_SIZE = 'async_queue_size'
+    ASYNC_OVERFLOW_POLICY = 'async_overflow_policy'
+    RING_BUFFER_SIZE = 'ring_buffer_size'
+    IS_FLIGHT_RECORDER = 'is_flight_recorder'
+    FLIGHT_RECORDER_RECORDS_AMOUNT = 'flight_recorder_records_amount'
+    FLIGHT_RECORDER_MAX_RECORD_AGE = 'flight_recorder_max_record_age'
+    FLIGHT_RECORDER_TRIGGER_LOG_LEVEL = 'flight_recorder_trigger_log_level'
 
     __name: Optional[str] = None
     __type: Optional[StreamHandlerEnum] = None
     __file_path: Optional[str] = None
+    __is_async: bool = False
+    __async_queue_size: Optional[int] = None
+    __async_overflow_policy: Optional[OverflowPolicyEnum] = None
+    __ring_buffer_size: int = DEFAULT_RING_BUFFER_SIZE
+    __is_flight_recorder: bool = False
+    __flight_recorder_records_amount: Optional[int] = None
+    __flight_recorder_max_record_age: Optional[float] = None
+    __flight_recorder_trigger_log_level: Optional[LogLevelEnum] = None
 
     def __init__(self, config: dict, is_parent_debug: bool):
         super().__init__(config, is_parent_debug)
@@ -187,6 +371,14 @@ class StreamHandlerConfig(ConfigBase):
         self.__update_type()
         self._update_log_element_list()
         self.__update_file_path()
+        self.__update_is_async()
+        self.__update_async_queue_size()
+        self.__update_async_overflow_policy()
+        self.__update_ring_buffer_size()
+        self.__update_is_flight_recorder()
+        self.__update_flight_recorder_records_amount()
+        self.__update_flight_recorder_max_record_age()
+        self.__update_flight_recorder_trigger_log_level()
 
     def build_stream_handler(self) -> LoggerStreamHandlerBase:
         if self.type == StreamHandlerEnum.CONSOLE:
@@ -195,6 +387,11 @@ class StreamHandlerConfig(ConfigBase):
         if self.type == StreamHandlerEnum.FILE:
             return FileStreamHandler(self.file_path)
 
+        if self.type == StreamHandlerEnum.RING_BUFFER:
+            return \
+                RingBufferStreamHandler(
+                    self.file_path, self.ring_buffer_size)
+
         raise NotImplementedCodeException(
             'Bug: Not implemented stream handler from config'
             f' for type [{self.type.name}]')
@@ -211,6 +408,38 @@ class StreamHandlerConfig(ConfigBase):
     def file_path(self) -> str:
         return self.__file_path
 
+    @property
+    def is_async(self) -> bool:
+        return self.__is_async
+
+    @property
+    def async_queue_size(self) -> Optional[int]:
+        return self.__async_queue_size
+
+    @property
+    def async_overflow_policy(self) -> Optional[OverflowPolicyEnum]:
+        return self.__async_overflow_policy
+
+    @property
+    def ring_buffer_size(self) -> int:
+        return self.__ring_buffer_size
+
+    @property
+    def is_flight_recorder(self) -> bool:
+        return self.__is_flight_recorder
+
+    @property
+    def flight_recorder_records_amount(self) -> Optional[int]:
+        return self.__flight_recorder_records_amount
+
+    @property
+    def flight_recorder_max_record_age(self) -> Optional[float]:
+        return self.__flight_recorder_max_record_age
+
+    @property
+    def flight_recorder_trigger_log_level(self) -> Optional[LogLevelEnum]:
+        return self.__flight_recorder_trigger_log_level
+
     def __update_type(self):
         sh_type = self._config.get(self.TYPE)
 
@@ -231,13 +460,93 @@ class StreamHandlerConfig(ConfigBase):
     def __update_file_path(self):
         file_path = self._config.get(self.FILE_PATH)
 
-        if not file_path and self.type == StreamHandlerEnum.FILE:
+        if not file_path and self.type in (
+                StreamHandlerEnum.FILE, StreamHandlerEnum.RING_BUFFER):
             raise ValueError(
-                'file stream handler not contain'
+                f'{self.type.value} stream handler not contain'
                 f' {self.FILE_PATH} in log config')
 
         self.__file_path = file_path
 
+    def __update_ring_buffer_size(self):
+        ring_buffer_size_str = self._config.get(self.RING_BUFFER_SIZE)
+
+        if ring_buffer_size_str:
+            self.__ring_buffer_size = \
+                FileSizeEnum.get_bytes(ring_buffer_size_str)
+
+            if self.__ring_buffer_size <= 0:
+                raise ValueError(
+                    'Ring buffer size in log config must be positive')
+
+    def __update_is_async(self):
+        self.__is_async = bool(self._config.get(self.IS_ASYNC))
+
+    def __update_async_queue_size(self):
+        async_queue_size = self._config.get(self.ASYNC_QUEUE_SIZE)
+
+        if async_queue_size is not None:
+            self.__async_queue_size = int(async_queue_size)
+
+            if self.__async_queue_size <= 0:
+                raise ValueError(
+                    'Async queue size in log config must be positive')
+
+    def __update_async_overflow_policy(self):
+        overflow_policy_str = self._config.get(self.ASYNC_OVERFLOW_POLICY)
+
+        if overflow_policy_str:
+            try:
+                self.__async_overflow_policy = \
+                    OverflowPolicyEnum.build(overflow_policy_str)
+            except ValueError:
+                raise ValueError(
+                    f'{self.ASYNC_OVERFLOW_POLICY}'
+                    f' value [{overflow_policy_str}]'
+                    f' in log config is invalid')
+
+    def __update_is_flight_recorder(self):
+        self.__is_flight_recorder = \
+            bool(self._config.get(self.IS_FLIGHT_RECORDER))
+
+    def __update_flight_recorder_records_amount(self):
+        records_amount = \
+            self._config.get(self.FLIGHT_RECORDER_RECORDS_AMOUNT)
+
+        if records_amount is not None:
+            self.__flight_recorder_records_amount = int(records_amount)
+
+            if self.__flight_recorder_records_amount <= 0:
+                raise ValueError(
+                    'Flight recorder records amount in log config'
+                    ' must be positive')
+
+    def __update_flight_recorder_max_record_age(self):
+        max_record_age = \
+            self._config.get(self.FLIGHT_RECORDER_MAX_RECORD_AGE)
+
+        if max_record_age is not None:
+            self.__flight_recorder_max_record_age = float(max_record_age)
+
+            if self.__flight_recorder_max_record_age <= 0:
+                raise ValueError(
+                    'Flight recorder max record age in log config'
+                    ' must be positive')
+
+    def __update_flight_recorder_trigger_log_level(self):
+        log_level_str = \
+            self._config.get(self.FLIGHT_RECORDER_TRIGGER_LOG_LEVEL)
+
+        if log_level_str:
+            try:
+                self.__flight_recorder_trigger_log_level = \
+                    LogLevelEnum.build(log_level_str)
+            except ValueError:
+                raise ValueError(
+                    f'{self.FLIGHT_RECORDER_TRIGGER_LOG_LEVEL}'
+                    f' value [{log_level_str}]'
+                    f' in log config is invalid')
+
 
 class LoggerConfig(ConfigBase):
     LOGGER_NAME = 'name'
@@ -349,6 +658,22 @@ class LoggerManagerConfig(ConfigBase):
                     StreamHandlerConfig.MAX_FILE_SIZE): str,
                 schema.Optional(StreamHandlerConfig.FILES_AMOUNT): int,
                 schema.Optional(StreamHandlerConfig.IS_ZIP): bool,
+                schema.Optional(StreamHandlerConfig.ZIP_COMPRESSION): str,
+                schema.Optional(
+                    StreamHandlerConfig.ZIP_COMPRESSION_LEVEL): int,
+                schema.Optional(
+                    StreamHandlerConfig.IS_PERSISTENT_STREAM): bool,
+                schema.Optional(StreamHandlerConfig.BUFFER_SIZE): str,
+                schema.Optional(StreamHandlerConfig.FLUSH_POLICY): str,
+                schema.Optional(StreamHandlerConfig.FLUSH_LINES_AMOUNT): int,
+                schema.Optional(
+                    StreamHandlerConfig.FLUSH_INTERVAL):
+                        schema.Or(int, float),
+                schema.Optional(StreamHandlerConfig.IS_BATCH_WRITE): bool,
+                schema.Optional(StreamHandlerConfig.BATCH_WRITE_SIZE): str,
+                schema.Optional(
+                    StreamHandlerConfig.BATCH_WRITE_INTERVAL):
+                        schema.Or(int, float),
                 cls.LOGGERS_CONFIG: [
                     {
                         LoggerConfig.LOGGER_NAME: str,
@@ -365,6 +690,28 @@ class LoggerManagerConfig(ConfigBase):
                         schema.Optional(
                             StreamHandlerConfig.FILES_AMOUNT): int,
                         schema.Optional(StreamHandlerConfig.IS_ZIP): bool,
+                        schema.Optional(
+                            StreamHandlerConfig.ZIP_COMPRESSION): str,
+                        schema.Optional(
+                            StreamHandlerConfig.ZIP_COMPRESSION_LEVEL): int,
+                        schema.Optional(
+                            StreamHandlerConfig.IS_PERSISTENT_STREAM): bool,
+                        schema.Optional(
+                            StreamHandlerConfig.BUFFER_SIZE): str,
+                        schema.Optional(
+                            StreamHandlerConfig.FLUSH_POLICY): str,
+                        schema.Optional(
+                            StreamHandlerConfig.FLUSH_LINES_AMOUNT): int,
+                        schema.Optional(
+                            StreamHandlerConfig.FLUSH_INTERVAL):
+                                schema.Or(int, float),
+                        schema.Optional(
+                            StreamHandlerConfig.IS_BATCH_WRITE): bool,
+                        schema.Optional(
+                            StreamHandlerConfig.BATCH_WRITE_SIZE): str,
+                        schema.Optional(
+                            StreamHandlerConfig.BATCH_WRITE_INTERVAL):
+                                schema.Or(int, float),
                         LoggerConfig.STREAM_HANDLERS: [
                             {
                                 StreamHandlerConfig.TYPE: str,
@@ -383,6 +730,59 @@ class LoggerManagerConfig(ConfigBase):
                                     StreamHandlerConfig.FILES_AMOUNT): int,
                                 schema.Optional(
                                     StreamHandlerConfig.IS_ZIP): bool,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .ZIP_COMPRESSION): str,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .ZIP_COMPRESSION_LEVEL): int,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .IS_PERSISTENT_STREAM): bool,
+                                schema.Optional(
+                                    StreamHandlerConfig.BUFFER_SIZE): str,
+                                schema.Optional(
+                                    StreamHandlerConfig.FLUSH_POLICY): str,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .FLUSH_LINES_AMOUNT): int,
+                                schema.Optional(
+                                    StreamHandlerConfig.FLUSH_INTERVAL):
+                                        schema.Or(int, float),
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .IS_BATCH_WRITE): bool,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .BATCH_WRITE_SIZE): str,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .BATCH_WRITE_INTERVAL):
+                                        schema.Or(int, float),
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .RING_BUFFER_SIZE): str,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .IS_FLIGHT_RECORDER): bool,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .FLIGHT_RECORDER_RECORDS_AMOUNT): int,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .FLIGHT_RECORDER_MAX_RECORD_AGE):
+                                        schema.Or(int, float),
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .FLIGHT_RECORDER_TRIGGER_LOG_LEVEL): str,
+                                schema.Optional(
+                                    StreamHandlerConfig.IS_ASYNC): bool,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .ASYNC_QUEUE_SIZE): int,
+                                schema.Optional(
+                                    StreamHandlerConfig
+                                    .ASYNC_OVERFLOW_POLICY): str,
                                 schema.Optional(cls.DEBUG): bool,
                                 schema.Optional(cls.LOG_LEVEL): str,
                                 schema.Optional(cls.STYLE): str,
@@ -0,0 +1,452 @@
+import threading
+from collections import deque
+from dataclasses import replace
+from time import monotonic
+from typing import Optional, Union
+
+from nrt_logging.call_stack import \
+    CallSite, get_thread_key, is_thread_key_alive
+from nrt_logging.log_format import \
+    LogDateFormat, LogElementEnum, LogYamlElements
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger_stream_handlers import \
+    DepthState, LoggerStreamHandlerBase, LogRecord, LogStyleEnum, \
+    ManualDepthEnum
+from nrt_logging.snapshot import SnapshotRenderer
+from nrt_logging.stream_handler_stats import StreamHandlerStats
+
+
+DEFAULT_RECORDS_AMOUNT = 1000
+DEFAULT_TRIGGER_LOG_LEVEL = LogLevelEnum.ERROR
+
+
+class FlightRecorderStreamHandler(LoggerStreamHandlerBase):
+    """
+    Flight recorder stream handler.
+
+    Wraps stream handler, and keeps the last log records of each thread
+    in memory, without writing them.
+    Log records are kept by the thread of the log call,
+    also when they are written by AsyncStreamHandler writer thread.
+    When log record with trigger log level or above is logged,
+    the kept log records of its thread and the trigger log record
+    are written to the wrapped stream handler.
+
+    Log records are kept from wrapped stream handler log level,
+    so TRACE context of errors is logged
+    without writing TRACE logs in normal flow.
+    """
+
+    __stream_handler: LoggerStreamHandlerBase
+    __records_amount: int
+    __max_record_age: Optional[float]
+    __trigger_log_level: LogLevelEnum
+    # {log call thread key: deque of (monotonic time, LogRecord)}
+    __records_dict: dict[int, deque]
+    __records_lock: threading.Lock
+
+    def __init__(
+            self,
+            stream_handler: LoggerStreamHandlerBase,
+            records_amount: int = DEFAULT_RECORDS_AMOUNT,
+            max_record_age: Optional[float] = None,
+            trigger_log_level: LogLevelEnum = DEFAULT_TRIGGER_LOG_LEVEL):
+        """
+        Constractor.
+
+        @param stream_handler: Wrapped stream handler.
+        @param records_amount: Max kept log records per thread.
+        @param max_record_age:
+            Max seconds to keep log record. None for no limit.
+        @param trigger_log_level:
+            Min log level that writes the kept log records.
+        """
+
+        super().__init__(stack_log_start_index=2)
+
+        if records_amount <= 0:
+            raise ValueError('Records amount must be bigger from 0')
+
+        if max_record_age is not None and max_record_age <= 0:
+            raise ValueError('Max record age must be bigger from 0')
+
+        self.__stream_handler = stream_handler
+        self.__records_amount = records_amount
+        self.__max_record_age = max_record_age
+        self.__trigger_log_level = trigger_log_level
+        self.__records_dict = {}
+        self.__records_lock = threading.Lock()
+
+    def critical(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
+
+    def error(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
+
+    def warn(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
+
+    def info(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
+
+    def debug(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
+
+    def trace(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
+
+    def snapshot(
+            self,
+            methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self._log(
+            LogLevelEnum.TRACE,
+            self._create_snapshot_msg(methods_depth, call_site),
+            manual_depth,
+            call_site)
+
+    def log_async(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None) -> None:
+        """
+        Log records are kept in memory,
+        so there is no stream write to wait for in most logs.
+        """
+
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self._log(log_level, msg, manual_depth, call_site)
+
+    def increase_depth(self, call_site: Optional[CallSite] = None):
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self.__stream_handler.increase_depth(call_site)
+
+    def decrease_depth(
+            self, level: int = 1, call_site: Optional[CallSite] = None):
+        if call_site is None:
+            call_site = CallSite.build(start_index=1)
+
+        self.__stream_handler.decrease_depth(level, call_site)
+
+    def dump(self):
+        """
+        Write the kept log records of current thread
+        to the wrapped stream handler.
+        """
+
+        self.__write_records(self.__pop_records(get_thread_key()))
+
+    def close(self):
+        """
+        Close wrapped stream handler.
+        Kept log records are not written.
+        """
+
+        self.__stream_handler.close()
+
+    def flush(self):
+        self.__stream_handler.flush()
+
+    @property
+    def stream_handler(self) -> LoggerStreamHandlerBase:
+        return self.__stream_handler
+
+    @property
+    def records_amount(self) -> int:
+        return self.__records_amount
+
+    @property
+    def max_record_age(self) -> Optional[float]:
+        return self.__max_record_age
+
+    @property
+    def trigger_log_level(self) -> LogLevelEnum:
+        return self.__trigger_log_level
+
+    @trigger_log_level.setter
+    def trigger_log_level(self, trigger_log_level: LogLevelEnum):
+        self.__trigger_log_level = trigger_log_level
+
+    @property
+    def name(self) -> str:
+        return self.__stream_handler.name
+
+    @name.setter
+    def name(self, name: str):
+        self.__stream_handler.name = name
+
+    @property
+    def style(self) -> LogStyleEnum:
+        return self.__stream_handler.style
+
+    @style.setter
+    def style(self, style: LogStyleEnum):
+        self.__stream_handler.style = style
+
+    @property
+    def log_level(self) -> LogLevelEnum:
+        return self.__stream_handler.log_level
+
+    @log_level.setter
+    def log_level(self, log_level: LogLevelEnum):
+        self.__stream_handler.log_level = log_level
+
+    @property
+    def log_date_format(self) -> LogDateFormat:
+        return self.__stream_handler.log_date_format
+
+    @log_date_format.setter
+    def log_date_format(self, log_date_format: LogDateFormat):
+        self.__stream_handler.log_date_format = log_date_format
+
+    @property
+    def log_yaml_elements(self) -> LogYamlElements:
+        return self.__stream_handler.log_yaml_elements
+
+    @log_yaml_elements.setter
+    def log_yaml_elements(
+            self,
+            log_yaml_elements:
+            Union[LogYamlElements, list[LogElementEnum], set[LogElementEnum]]):
+
+        self.__stream_handler.log_yaml_elements = log_yaml_elements
+
+    @property
+    def log_line_template(self) -> str:
+        return self.__stream_handler.log_line_template
+
+    @log_line_template.setter
+    def log_line_template(self, log_line_template: str):
+        self.__stream_handler.log_line_template = log_line_template
+
+    @property
+    def is_debug(self) -> bool:
+        return self.__stream_handler.is_debug
+
+    @is_debug.setter
+    def is_debug(self, is_debug: bool):
+        self.__stream_handler.is_debug = is_debug
+
+    @property
+    def is_batch_write(self) -> bool:
+        return self.__stream_handler.is_batch_write
+
+    @is_batch_write.setter
+    def is_batch_write(self, is_batch_write: bool):
+        self.__stream_handler.is_batch_write = is_batch_write
+
+    @property
+    def batch_write_size(self) -> int:
+        return self.__stream_handler.batch_write_size
+
+    @batch_write_size.setter
+    def batch_write_size(self, batch_write_size: int):
+        self.__stream_handler.batch_write_size = batch_write_size
+
+    @property
+    def batch_write_interval(self) -> float:
+        return self.__stream_handler.batch_write_interval
+
+    @batch_write_interval.setter
+    def batch_write_interval(self, batch_write_interval: float):
+        self.__stream_handler.batch_write_interval = batch_write_interval
+
+    @property
+    def snapshot_renderer(self) -> SnapshotRenderer:
+        return self.__stream_handler.snapshot_renderer
+
+    @snapshot_renderer.setter
+    def snapshot_renderer(self, snapshot_renderer: SnapshotRenderer):
+        self.__stream_handler.snapshot_renderer = snapshot_renderer
+
+    @property
+    def is_stats(self) -> bool:
+        return self.__stream_handler.is_stats
+
+    @is_stats.setter
+    def is_stats(self, is_stats: bool):
+        self.__stream_handler.is_stats = is_stats
+
+    @property
+    def stats(self) -> Optional[StreamHandlerStats]:
+        return self.__stream_handler.stats
+
+    def _log(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if log_level < self.log_level:
+            return
+
+        if call_site is None:
+            call_site = \
+                CallSite.build(start_index=self._stack_log_start_index)
+
+        self.__record(
+            self._create_log_record(log_level, msg, manual_depth, call_site))
+
+    def _create_log_record(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum,
+            call_site: CallSite) -> LogRecord:
+
+        # skipcq: PYL-W0212
+        return \
+            self.__stream_handler._create_log_record(
+                log_level, msg, manual_depth, call_site)
+
+    def _create_snapshot_msg(
+            self, methods_depth: int, call_site: CallSite) -> str:
+
+        # skipcq: PYL-W0212
+        return \
+            self.__stream_handler._create_snapshot_msg(
+                methods_depth, call_site)
+
+    def _get_depth_state(self) -> DepthState:
+        """
+        Log depth is resolved by wrapped stream handler,
+        so scopes are pushed to its depth state.
+        """
+
+        # skipcq: PYL-W0212
+        return self.__stream_handler._get_depth_state()
+
+    def _write_log_records(self, log_record_list: list[LogRecord]):
+        """
+        Keep log records that are written by AsyncStreamHandler,
+        that wraps this stream handler.
+        """
+
+        for log_record in log_record_list:
+            self.__record(log_record)
+
+    def __record(self, log_record: LogRecord):
+        if log_record.log_level < self.__trigger_log_level:
+            with self.__records_lock:
+                self.__get_records(log_record.thread_key).append(
+                    (monotonic(), log_record))
+
+            return
+
+        log_record_list = self.__pop_records(log_record.thread_key)
+        log_record_list.append(log_record)
+        self.__write_records(log_record_list)
+
+    def __get_records(self, thread_key: int) -> deque:
+        """
+        Get kept log records of thread.
+        Called while records lock is acquired.
+
+        @param thread_key: Thread key of log call thread.
+        @return: Deque of (monotonic time, LogRecord).
+        """
+
+        records = self.__records_dict.get(thread_key)
+
+        if records is None:
+            self.__remove_records_of_ended_threads()
+            records = deque(maxlen=self.__records_amount)
+            self.__records_dict[thread_key] = records
+
+        return records
+
+    def __remove_records_of_ended_threads(self):
+        for thread_key in list(self.__records_dict):
+            if not is_thread_key_alive(thread_key):
+                del self.__records_dict[thread_key]
+
+    def __pop_records(self, thread_key: int) -> list[LogRecord]:
+        min_time = \
+            None if self.__max_record_age is None \
+            else monotonic() - self.__max_record_age
+
+        with self.__records_lock:
+            records = self.__records_dict.pop(thread_key, ())
+
+        return [log_record for record_time, log_record in records
+                if min_time is None or record_time >= min_time]
+
+    def __write_records(self, log_record_list: list[LogRecord]):
+        if log_record_list:
+            # skipcq: PYL-W0212
+            self.__stream_handler._write_log_records(
+                self.__rebase_depth(log_record_list))
+
+    @classmethod
+    def __rebase_depth(
+            cls, log_record_list: list[LogRecord]) -> list[LogRecord]:
+        """
+        Rebase depth of log records, so the first log record is root,
+        and each log record is at most one level deeper from the
+        previous log record, since parents of kept log records
+        can be dropped.
+
+        @param log_record_list: Log records.
+        @return: Log records with rebased depth.
+        """
+
+        rebased_list = []
+        depth_shift = log_record_list[0].depth
+        previous_depth = -1
+
+        for log_record in log_record_list:
+            depth = log_record.depth - depth_shift
+
+            if depth < 0:
+                depth_shift = log_record.depth
+                depth = 0
+            elif depth > previous_depth + 1:
+                depth_shift += depth - previous_depth - 1
+                depth = previous_depth + 1
+
+            is_child = 0 <= previous_depth < depth
+
+            if depth != log_record.depth or is_child != log_record.is_child:
+                log_record = \
+                    replace(log_record, depth=depth, is_child=is_child)
+
+            rebased_list.append(log_record)
+            previous_depth = depth
+
+        return rebased_list
@@ -0,0 +1,498 @@
+import atexit
+import os
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from queue import Empty
+from time import monotonic
+from typing import Optional
+
+from nrt_logging.call_stack import CallSite
+from nrt_logging.log_format import LogElementEnum, LogYamlElements
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger_stream_handlers import \
+    FileStreamHandler, LoggerStreamHandlerBase, LogRecord, ManualDepthEnum
+
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_TREE_RECORDS = 10000
+DEFAULT_MAX_TREE_AGE = 1.0
+
+COLLECTOR_LOG_LINE_DEFAULT_TEMPLATE = \
+    f'{LogElementEnum.DATE.line_format}' \
+    f' [{LogElementEnum.LOG_LEVEL.line_format}]' \
+    f' [{LogElementEnum.PID.line_format}]' \
+    f' [{LogElementEnum.PATH.line_format}.' \
+    f'{LogElementEnum.METHOD.line_format}' \
+    f':{LogElementEnum.LINE_NUMBER.line_format}]' \
+    f' {LogElementEnum.MESSAGE.line_format}'
+
+COLLECTOR_YAML_ELEMENTS = \
+    LogYamlElements.DEFAULT_YAML_ELEMENTS + (LogElementEnum.PID,)
+
+
+class LogTreeBuffer:
+    """
+    Buffer of log records of each process,
+    until the root log tree of the process is completed.
+
+    Log depth is resolved in each process,
+    so log tree of a process is written as a unit,
+    and logs of other processes are not written inside it.
+
+    Log tree of idle or crashed process is not completed by next root log,
+    so log tree is written also when it reached max tree age.
+    """
+
+    __max_tree_records: int
+    __max_tree_age: float
+    # {pid: (start time, log records of uncompleted root log tree)},
+    # in start time order
+    __log_tree_dict: dict[int, tuple[float, list[LogRecord]]]
+
+    def __init__(
+            self,
+            max_tree_records: int = DEFAULT_MAX_TREE_RECORDS,
+            max_tree_age: float = DEFAULT_MAX_TREE_AGE):
+        """
+        Constractor.
+
+        @param max_tree_records:
+            Max buffered log records of a process.
+            In case root log tree reached it,
+            it is written before it is completed.
+        @param max_tree_age:
+            Max seconds from first buffered log record of a process.
+            In case root log tree reached it,
+            it is written before it is completed.
+        """
+
+        if max_tree_records <= 0:
+            raise ValueError('Max tree records must be bigger from 0')
+
+        if max_tree_age <= 0:
+            raise ValueError('Max tree age must be bigger from 0')
+
+        self.__max_tree_records = max_tree_records
+        self.__max_tree_age = max_tree_age
+        self.__log_tree_dict = {}
+
+    def add(self, log_record: LogRecord) -> list[LogRecord]:
+        """
+        Add log record to the log tree of its process.
+
+        @param log_record: Log record.
+        @return: Log records of completed log tree, that can be written.
+        """
+
+        completed_list = []
+        log_tree = self.__log_tree_dict.get(log_record.pid)
+
+        # Root log record completes the previous log tree of its process
+        if log_tree is not None and log_record.depth == 0:
+            completed_list = self.__log_tree_dict.pop(log_record.pid)[1]
+            log_tree = None
+
+        if log_tree is None:
+            log_tree = (monotonic(), [])
+            self.__log_tree_dict[log_record.pid] = log_tree
+
+        log_record_list = log_tree[1]
+        log_record_list.append(log_record)
+
+        if len(log_record_list) >= self.__max_tree_records:
+            completed_list += self.__log_tree_dict.pop(log_record.pid)[1]
+
+        return completed_list
+
+    def pop_expired(self) -> list[LogRecord]:
+        """
+        Pop buffered log records of processes,
+        which log tree reached max tree age, grouped by process.
+
+        @return: Log records.
+        """
+
+        expired_list = []
+        min_start_time = monotonic() - self.__max_tree_age
+
+        while self.__log_tree_dict:
+            pid = next(iter(self.__log_tree_dict))
+            start_time, log_record_list = self.__log_tree_dict[pid]
+
+            if start_time > min_start_time:
+                break
+
+            del self.__log_tree_dict[pid]
+            expired_list += log_record_list
+
+        return expired_list
+
+    def pop_all(self) -> list[LogRecord]:
+        """
+        Pop buffered log records of all processes, grouped by process.
+
+        @return: Log records.
+        """
+
+        log_record_list = \
+            [log_record
+             for _, pid_log_record_list in self.__log_tree_dict.values()
+             for log_record in pid_log_record_list]
+        self.__log_tree_dict = {}
+        return log_record_list
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Seconds until the oldest log tree reaches max tree age.
+        None in case there are no buffered log records.
+        """
+
+        if not self.__log_tree_dict:
+            return None
+
+        start_time = next(iter(self.__log_tree_dict.values()))[0]
+        return max(start_time + self.__max_tree_age - monotonic(), 0.0)
+
+    @property
+    def max_tree_records(self) -> int:
+        return self.__max_tree_records
+
+    @property
+    def max_tree_age(self) -> float:
+        return self.__max_tree_age
+
+
+def _read_log_records(
+        queue,
+        batch_size: int,
+        timeout: Optional[float] = None) -> list[Optional[LogRecord]]:
+    """
+    Wait for log record, and read the queued log records after it.
+    Empty list in case timeout is reached.
+    """
+
+    try:
+        log_record_list = [queue.get(timeout=timeout)]
+    except Empty:
+        return []
+
+    while len(log_record_list) < batch_size:
+        try:
+            log_record_list.append(queue.get_nowait())
+        except Empty:
+            break
+
+    return log_record_list
+
+
+def collect_logs(
+        queue,
+        file_path: str,
+        stream_handler_params: dict,
+        batch_size: int,
+        max_tree_records: int = DEFAULT_MAX_TREE_RECORDS,
+        max_tree_age: float = DEFAULT_MAX_TREE_AGE):
+    """
+    Write log records from queue to log file until None is received.
+    Module level function, so it can run in spawned process.
+
+    Log records of each process are written when its root log tree
+    is completed, so log trees of processes are not interleaved.
+    Root log tree that is not completed is written
+    when it reached max tree age.
+
+    @param queue: multiprocessing queue of log records.
+    @param file_path: Log file path.
+    @param stream_handler_params:
+        FileStreamHandler properties {property name: value}.
+    @param batch_size: Max log records that are read from queue at once.
+    @param max_tree_records: Max buffered log records of a process.
+    @param max_tree_age:
+        Max seconds from first buffered log record of a process.
+    """
+
+    sh = FileStreamHandler(file_path)
+
+    for name, value in stream_handler_params.items():
+        setattr(sh, name, value)
+
+    log_tree_buffer = LogTreeBuffer(max_tree_records, max_tree_age)
+    is_running = True
+
+    try:
+        while is_running:
+            log_record_list = \
+                _read_log_records(
+                    queue, batch_size, log_tree_buffer.timeout)
+
+            if log_record_list and log_record_list[-1] is None:
+                log_record_list.pop()
+                is_running = False
+
+            completed_list = []
+
+            for log_record in log_record_list:
+                completed_list += log_tree_buffer.add(log_record)
+
+            completed_list += log_tree_buffer.pop_expired()
+
+            if not is_running:
+                completed_list += log_tree_buffer.pop_all()
+
+            if completed_list:
+                # skipcq: PYL-W0212
+                sh._write_log_records(completed_list)
+    finally:
+        sh.close()
+        sh.flush_archives()
+
+
+class CollectorStreamHandler(LoggerStreamHandlerBase):
+    """
+    Stream handler of worker process, that sends its log records
+    to LogCollector process.
+
+    Call site and log depth are resolved in the worker process,
+    so each process keeps its own log hierarchy.
+    Log records are formatted and written by the collector process.
+    """
+
+    __queue: object
+
+    def __init__(self, queue):
+        """
+        Constractor.
+
+        @param queue: LogCollector queue.
+        """
+
+        super().__init__(
+            stack_log_start_index=5,
+            stack_log_increase_start_index=3,
+            stack_log_decrease_start_index=3)
+
+        self.__queue = queue
+
+    def critical(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
+
+    def error(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
+
+    def warn(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
+
+    def info(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
+
+    def debug(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
+
+    def trace(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
+
+    def snapshot(
+            self,
+            methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._snapshot(methods_depth, manual_depth, call_site)
+
+    def close(self):
+        """
+        Log records are written by the collector process,
+        so there is no stream to close in worker process.
+        """
+
+    def _log(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if log_level >= self.log_level:
+            if call_site is None:
+                call_site = \
+                    CallSite.build(start_index=self._stack_log_start_index)
+
+            self.__queue.put(
+                self._create_log_record(
+                    log_level, msg, manual_depth, call_site))
+
+    def _write_log_records(self, log_record_list: list[LogRecord]):
+        for log_record in log_record_list:
+            self.__queue.put(log_record)
+
+
+class LogCollector:
+    """
+    Single writer of log file that is shared by several processes.
+
+    Collector process owns the FileStreamHandler,
+    including file size limitation and archives compression.
+    Worker processes log with CollectorStreamHandler,
+    that sends log records over multiprocessing queue.
+
+    LogCollector must be started before worker processes are created,
+    so its queue is inherited by them.
+    """
+
+    __file_path: str
+    __stream_handler_params: dict
+    __batch_size: int
+    __max_tree_records: int
+    __max_tree_age: float
+    __mp_context: BaseContext
+    __queue: object
+    __process: Optional[object]
+    __owner_pid: int
+
+    def __init__(
+            self,
+            file_path: str,
+            queue_size: int = DEFAULT_QUEUE_SIZE,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_tree_records: int = DEFAULT_MAX_TREE_RECORDS,
+            max_tree_age: float = DEFAULT_MAX_TREE_AGE,
+            mp_context: Optional[BaseContext] = None,
+            **stream_handler_params):
+        """
+        Constractor.
+
+        @param file_path: Log file path.
+        @param queue_size: Max log records in queue.
+        @param batch_size: Max log records that are read from queue at once.
+        @param max_tree_records:
+            Max buffered log records of a process.
+            Log records of a process are written when its root log tree
+            is completed, or when it reached max tree records.
+        @param max_tree_age:
+            Max seconds from first buffered log record of a process.
+            Log tree of idle or crashed process is written
+            when it reached max tree age.
+        @param mp_context: multiprocessing context. None for default.
+        @param stream_handler_params:
+            FileStreamHandler properties, for example
+            style, log_level, is_limit_file_size, max_file_size, is_zip.
+            Log line template and yaml elements include pid by default.
+        """
+
+        if queue_size <= 0:
+            raise ValueError('Queue size must be bigger from 0')
+
+        if batch_size <= 0:
+            raise ValueError('Batch size must be bigger from 0')
+
+        if max_tree_records <= 0:
+            raise ValueError('Max tree records must be bigger from 0')
+
+        if max_tree_age <= 0:
+            raise ValueError('Max tree age must be bigger from 0')
+
+        stream_handler_params.setdefault(
+            'log_line_template', COLLECTOR_LOG_LINE_DEFAULT_TEMPLATE)
+        stream_handler_params.setdefault(
+            'log_yaml_elements', list(COLLECTOR_YAML_ELEMENTS))
+
+        self.__file_path = file_path
+        self.__stream_handler_params = stream_handler_params
+        self.__batch_size = batch_size
+        self.__max_tree_records = max_tree_records
+        self.__max_tree_age = max_tree_age
+        self.__mp_context = \
+            get_context() if mp_context is None else mp_context
+        self.__queue = self.__mp_context.Queue(maxsize=queue_size)
+        self.__process = None
+        self.__owner_pid = os.getpid()
+
+    def __getstate__(self):
+        # Collector process is owned by the process that started it
+        state = self.__dict__.copy()
+        state['_LogCollector__process'] = None
+        return state
+
+    def start(self):
+        if self.__process is not None:
+            raise RuntimeError('Log collector is already started')
+
+        self.__process = \
+            self.__mp_context.Process(
+                target=collect_logs,
+                args=(
+                    self.__queue,
+                    self.__file_path,
+                    self.__stream_handler_params,
+                    self.__batch_size,
+                    self.__max_tree_records,
+                    self.__max_tree_age),
+                name='nrt_logging_collector',
+                daemon=True)
+        self.__process.start()
+
+        atexit.register(self.stop)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Write queued log records and stop collector process.
+        Does nothing in worker processes.
+
+        @param timeout: Timeout in seconds. None for no timeout.
+        """
+
+        if os.getpid() != self.__owner_pid or self.__process is None:
+            return
+
+        process = self.__process
+        self.__process = None
+
+        self.__queue.put(None)
+        process.join(timeout)
+        atexit.unregister(self.stop)
+
+    def create_stream_handler(self) -> CollectorStreamHandler:
+        """
+        Create stream handler that sends its logs to collector process.
+
+        @return: CollectorStreamHandler.
+        """
+
+        return CollectorStreamHandler(self.__queue)
+
+    @property
+    def file_path(self) -> str:
+        return self.__file_path
+
+    @property
+    def queue(self):
+        return self.__queue
+
+    @property
+    def is_alive(self) -> bool:
+        return self.__process is not None and self.__process.is_alive()
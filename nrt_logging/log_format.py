@@ -1,5 +1,9 @@
+import re
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
+from threading import Lock
+from typing import Callable, Optional, Union
 
 
 class LogElementEnum(Enum):
@@ -9,6 +13,7 @@ class LogElementEnum(Enum):
     METHOD = '$method$'
     LINE_NUMBER = '$line_number$'
     MESSAGE = '$message$'
+    PID = '$pid$'
 
     def __init__(self, line_format: str):
         self.__line_format = line_format
@@ -25,6 +30,10 @@ class LogElementEnum(Enum):
     def __str__(self):
         return self.value
 
+    def __reduce_ex__(self, protocol):
+        # Value is replaced in __init__, so unpickle by name
+        return self.build, (self.name,)
+
     @classmethod
     def build(cls, name: str):
         name_u = name.upper()
@@ -36,12 +45,113 @@ class LogElementEnum(Enum):
         raise ValueError(f'[{name}] is not valid log element name')
 
 
+class LogDateFormatter:
+    """
+    Date formatter that caches the formatted date of the current second.
+
+    In case date format ends with %f,
+    only the microseconds are added to the cached date prefix.
+    Formatters are shared by date format, use get method to create them.
+    """
+
+    __DIRECTIVE_PATTERN = re.compile('%.', re.DOTALL)
+
+    # {date format: LogDateFormatter}
+    __formatters_dict: dict = {}
+    __formatters_lock: Lock = Lock()
+
+    __date_format: str
+    __prefix_date_format: Optional[str]
+    __is_microseconds_suffix: bool
+    # (date without microseconds, formatted date prefix)
+    __cache: tuple
+
+    def __init__(self, date_format: str):
+        self.__date_format = date_format
+        self.__cache = (None, '')
+        self.__update_prefix_date_format()
+
+    @property
+    def date_format(self) -> str:
+        return self.__date_format
+
+    def format(self, date: datetime) -> str:
+        # Aware dates of the same second can be in different time zones
+        if self.__prefix_date_format is None or date.tzinfo is not None:
+            return date.strftime(self.__date_format)
+
+        second_date = date.replace(microsecond=0)
+        cached_second_date, date_prefix = self.__cache
+
+        if second_date != cached_second_date:
+            date_prefix = second_date.strftime(self.__prefix_date_format)
+            self.__cache = (second_date, date_prefix)
+
+        if self.__is_microseconds_suffix:
+            return f'{date_prefix}{date.microsecond:06d}'
+
+        return date_prefix
+
+    def __update_prefix_date_format(self):
+        directive_list = \
+            list(self.__DIRECTIVE_PATTERN.finditer(self.__date_format))
+        microseconds_directive_list = \
+            [directive for directive in directive_list
+             if directive.group() == '%f']
+
+        self.__is_microseconds_suffix = False
+
+        if not microseconds_directive_list:
+            self.__prefix_date_format = self.__date_format
+        elif len(microseconds_directive_list) == 1 \
+                and directive_list[-1].group() == '%f' \
+                and directive_list[-1].end() == len(self.__date_format):
+            self.__prefix_date_format = self.__date_format[:-2]
+            self.__is_microseconds_suffix = True
+        else:
+            # %f that is not in the end cannot be cached
+            self.__prefix_date_format = None
+
+    @classmethod
+    def get(cls, date_format: str) -> 'LogDateFormatter':
+        """
+        Get date formatter that is shared by all users of date format.
+
+        @param date_format: Date format.
+        @return: LogDateFormatter.
+        """
+
+        formatter = cls.__formatters_dict.get(date_format)
+
+        if formatter is None:
+            with cls.__formatters_lock:
+                formatter = cls.__formatters_dict.get(date_format)
+
+                if formatter is None:
+                    formatter = cls(date_format)
+                    cls.__formatters_dict[date_format] = formatter
+
+        return formatter
+
+
 @dataclass
 class LogDateFormat:
     DEFAULT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
 
     date_format: str = DEFAULT_DATE_FORMAT
 
+    # Formatter of date_format, updated when date_format is changed
+    __formatter = None
+
+    def format(self, date: datetime) -> str:
+        formatter = self.__formatter
+
+        if formatter is None or formatter.date_format != self.date_format:
+            formatter = LogDateFormatter.get(self.date_format)
+            self.__formatter = formatter
+
+        return formatter.format(date)
+
 
 @dataclass
 class LogYamlElements:
@@ -68,3 +178,115 @@ class LogYamlElements:
         raise ValueError(
             f'Type [{type(log_yaml_elements)}]'
             f' of log_yaml_elements is not supported')
+
+
+class LogLineTemplate:
+    """
+    Log line template that is compiled once into format string.
+
+    Elements in template ($date$, $message$, ...) are replaced
+    by format fields, so log line is created with single format_map
+    that gets values only for the elements that are in template.
+    """
+
+    __ELEMENTS_PATTERN = \
+        re.compile(
+            '|'.join(
+                re.escape(log_element.line_format)
+                for log_element in LogElementEnum))
+
+    __template: str
+    __format_str: str
+    __elements: tuple[LogElementEnum, ...]
+
+    def __init__(self, template: str):
+        self.__template = template
+        self.__compile()
+
+    @property
+    def template(self) -> str:
+        return self.__template
+
+    @property
+    def elements(self) -> tuple[LogElementEnum, ...]:
+        """
+        Elements in template, without duplications.
+        """
+
+        return self.__elements
+
+    def format_map(self, element_values: dict[str, str]) -> str:
+        """
+        Create log line.
+
+        @param element_values:
+            {element name: element value} for the elements in template.
+        @return: Log line.
+        """
+
+        return self.__format_str.format_map(element_values)
+
+    def __compile(self):
+        format_str_list = []
+        element_list = []
+        start_index = 0
+
+        for match in self.__ELEMENTS_PATTERN.finditer(self.__template):
+            log_element = LogElementEnum.build(match.group()[1:-1])
+            format_str_list.append(
+                self.__escape(self.__template[start_index:match.start()]))
+            format_str_list.append(f'{{{log_element.value}}}')
+
+            if log_element not in element_list:
+                element_list.append(log_element)
+
+            start_index = match.end()
+
+        format_str_list.append(self.__escape(self.__template[start_index:]))
+
+        self.__format_str = ''.join(format_str_list)
+        self.__elements = tuple(element_list)
+
+    @classmethod
+    def __escape(cls, literal: str) -> str:
+        return literal.replace('{', '{{').replace('}', '}}')
+
+
+class LazyMessage:
+    """
+    Log message that is evaluated only if it is written by stream handler.
+
+    Message is callable that returns the message,
+    or %-style format string that is formatted with args.
+    Evaluated message is cached, so it is shared by stream handlers.
+    """
+
+    __msg: Union[str, Callable[[], str]]
+    __args: tuple
+    __evaluated_msg: Optional[str]
+
+    def __init__(self, msg: Union[str, Callable[[], str]], *args):
+        """
+        Constractor.
+
+        @param msg: Callable that returns the message, or format string.
+        @param args: %-style format args.
+        """
+
+        self.__msg = msg
+        self.__args = args
+        self.__evaluated_msg = None
+
+    def __call__(self) -> str:
+        if self.__evaluated_msg is None:
+            msg = self.__msg() if callable(self.__msg) else self.__msg
+
+            if self.__args:
+                msg = msg % self.__args
+
+            self.__evaluated_msg = msg
+
+        return self.__evaluated_msg
+
+    def __str__(self) -> str:
+        return self()
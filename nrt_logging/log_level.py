@@ -15,20 +15,23 @@ class LogLevelEnum(Enum):
     def __hash__(self):
         return hash(self.value)
 
+    # Comparisons use _value_ attribute, that is faster than value property
+
     def __eq__(self, other):
-        return isinstance(other, LogLevelEnum) and self.value == other.value
+        return \
+            isinstance(other, LogLevelEnum) and self._value_ == other._value_
 
     def __gt__(self, other):
-        return self.value > other.value
+        return self._value_ > other._value_
 
     def __ge__(self, other):
-        return self.value >= other.value
+        return self._value_ >= other._value_
 
     def __le__(self, other):
-        return self.value <= other.value
+        return self._value_ <= other._value_
 
     def __lt__(self, other):
-        return self.value < other.value
+        return self._value_ < other._value_
 
     @classmethod
     def build(cls, name: str):
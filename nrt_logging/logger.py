@@ -1,8 +1,70 @@
-from typing import Optional
-
+import asyncio
+import functools
+import inspect
+from typing import Callable, Optional, Union
+
+from nrt_logging.async_log_writer import async_log_writer
+from nrt_logging.call_stack import CallSite
+from nrt_logging.log_format import LazyMessage
 from nrt_logging.log_level import LogLevelEnum
 from nrt_logging.logger_stream_handlers import \
-    LoggerStreamHandlerBase, ManualDepthEnum, DEFAULT_LOG_LEVEL
+    LoggerStreamHandlerBase, ManualDepthEnum, ScopeData, DEFAULT_LOG_LEVEL
+
+
+def _skip_log(*args, **kwargs):
+    """
+    Log method of disabled log level.
+    """
+
+
+class LogScope:
+    """
+    Context manager that logs scope log on enter,
+    and makes the logs in it children of scope log,
+    without call stack inspection.
+    """
+
+    __stream_handler_list: list[LoggerStreamHandlerBase]
+    __log_level: LogLevelEnum
+    __msg: Union[str, Callable[[], str]]
+    __call_site: Optional[CallSite]
+    __scope_list: list[Optional[ScopeData]]
+
+    def __init__(
+            self,
+            stream_handler_list: list[LoggerStreamHandlerBase],
+            log_level: LogLevelEnum,
+            msg: Union[str, Callable[[], str]],
+            call_site: Optional[CallSite]):
+        """
+        Constractor.
+
+        @param stream_handler_list: Stream handlers of scope.
+            Empty list in case scope log level is disabled.
+        @param log_level: Scope log level.
+        @param msg: Scope log message.
+        @param call_site: Scope call site.
+        """
+
+        self.__stream_handler_list = stream_handler_list
+        self.__log_level = log_level
+        self.__msg = msg
+        self.__call_site = call_site
+        self.__scope_list = []
+
+    def __enter__(self) -> 'LogScope':
+        self.__scope_list = \
+            [handler.enter_scope(
+                self.__log_level, self.__msg, self.__call_site)
+             for handler in self.__stream_handler_list]
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for handler, scope in \
+                zip(self.__stream_handler_list, self.__scope_list):
+            handler.exit_scope(scope)
+
+        self.__scope_list = []
 
 
 class NrtLogger:
@@ -16,10 +78,41 @@ class NrtLogger:
     or it can be in line style with children logs of children methods.
 
     User can force logs to be children of previous logs in the same method.
+
+    Log message can be callable (or LazyMessage) that returns the message.
+    It is evaluated only if the log is written by a stream handler,
+    and only once for all stream handlers.
+
+    In asyncio event loop, logs can be awaited (ainfo, aerror, etc.),
+    so stream writes do not block the event loop.
+
+    Hierarchy can be set explicitly with scope context manager
+    and traced decorator, so logs in them do not inspect the call stack.
     """
 
+    __CRITICAL = LogLevelEnum.CRITICAL.value
+    __ERROR = LogLevelEnum.ERROR.value
+    __WARN = LogLevelEnum.WARN.value
+    __INFO = LogLevelEnum.INFO.value
+    __DEBUG = LogLevelEnum.DEBUG.value
+    __TRACE = LogLevelEnum.TRACE.value
+
+    # Log methods that are bound to _skip_log when log level is disabled
+    __LOG_METHOD_LEVELS = \
+        (
+            ('critical', __CRITICAL),
+            ('error', __ERROR),
+            ('warn', __WARN),
+            ('info', __INFO),
+            ('debug', __DEBUG),
+            ('trace', __TRACE),
+            ('snapshot', __TRACE)
+        )
+
     __stream_handler_list: list[LoggerStreamHandlerBase]
     __log_level: Optional[LogLevelEnum] = None
+    # Compiled log_level value
+    __log_level_value: int
 
     __is_debug: bool = False
 
@@ -33,92 +126,275 @@ class NrtLogger:
             only if logger log >= log_level.
         """
 
-        self.__log_level = log_level
         self.__stream_handler_list = []
+        self.__set_log_level(log_level)
 
     def critical(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.CRITICAL:
+        if self.__log_level_value <= self.__CRITICAL:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.critical(msg, manual_depth)
+                handler.critical(msg, manual_depth, call_site)
 
     def error(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.ERROR:
+        if self.__log_level_value <= self.__ERROR:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.error(msg, manual_depth)
+                handler.error(msg, manual_depth, call_site)
 
     def warn(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.WARN:
+        if self.__log_level_value <= self.__WARN:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.warn(msg, manual_depth)
+                handler.warn(msg, manual_depth, call_site)
 
     def info(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.INFO:
+        if self.__log_level_value <= self.__INFO:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.info(msg, manual_depth)
+                handler.info(msg, manual_depth, call_site)
 
     def debug(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.DEBUG:
+        if self.__log_level_value <= self.__DEBUG:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.debug(msg, manual_depth)
+                handler.debug(msg, manual_depth, call_site)
 
     def trace(
             self,
-            msg: str,
+            msg: Union[str, Callable[[], str]],
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
 
-        if self.log_level <= LogLevelEnum.TRACE:
+        if self.__log_level_value <= self.__TRACE:
             self.__verify_stream_handler_list_not_empty()
 
+            msg = self.__get_shared_msg(msg)
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.trace(msg, manual_depth)
+                handler.trace(msg, manual_depth, call_site)
 
     def snapshot(
             self,
             methods_depth: int = LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        if self.log_level <= LogLevelEnum.TRACE:
+        if self.__log_level_value <= self.__TRACE:
             self.__verify_stream_handler_list_not_empty()
 
+            call_site = CallSite.build(start_index=1)
+
             for handler in self.__stream_handler_list:
-                handler.snapshot(methods_depth, manual_depth)
+                handler.snapshot(methods_depth, manual_depth, call_site)
+
+    async def acritical(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__CRITICAL:
+            await self.__alog(
+                LogLevelEnum.CRITICAL,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def aerror(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__ERROR:
+            await self.__alog(
+                LogLevelEnum.ERROR,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def awarn(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__WARN:
+            await self.__alog(
+                LogLevelEnum.WARN,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def ainfo(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__INFO:
+            await self.__alog(
+                LogLevelEnum.INFO,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def adebug(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__DEBUG:
+            await self.__alog(
+                LogLevelEnum.DEBUG,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def atrace(
+            self,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+
+        if self.__log_level_value <= self.__TRACE:
+            await self.__alog(
+                LogLevelEnum.TRACE,
+                msg,
+                manual_depth,
+                CallSite.build(start_index=1))
+
+    async def asnapshot(
+            self,
+            methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+        if self.__log_level_value <= self.__TRACE:
+            self.__verify_stream_handler_list_not_empty()
+
+            call_site = CallSite.build(start_index=1)
+
+            # skipcq: PYL-W0212
+            future_list = \
+                [handler.log_async(
+                    LogLevelEnum.TRACE,
+                    handler._create_snapshot_msg(methods_depth, call_site),
+                    manual_depth,
+                    call_site)
+                 for handler in self.__stream_handler_list
+                 if handler.log_level <= LogLevelEnum.TRACE]
+
+            await self.__wait_for_log_futures(future_list)
 
     def increase_depth(self):
+        call_site = CallSite.build(start_index=1)
+
         for handler in self.__stream_handler_list:
-            handler.increase_depth()
+            handler.increase_depth(call_site)
 
     def decrease_depth(self, level: int = 1):
+        call_site = CallSite.build(start_index=1)
+
         for handler in self.__stream_handler_list:
-            handler.decrease_depth(level)
+            handler.decrease_depth(level, call_site)
+
+    def scope(
+            self,
+            msg: Union[str, Callable[[], str]],
+            log_level: LogLevelEnum = LogLevelEnum.INFO) -> LogScope:
+        """
+        Create scope, that logs msg on enter,
+        and the logs in it are children of msg log.
+
+        Usage:
+            with logger.scope('request'):
+                logger.info('child of request log')
+
+        @param msg: Scope log message.
+        @param log_level: Scope log level.
+        @return: LogScope context manager.
+        """
+
+        return \
+            self.__create_scope(
+                msg, log_level, CallSite.build(start_index=1))
+
+    def traced(
+            self,
+            func: Optional[Callable] = None,
+            *,
+            log_level: LogLevelEnum = LogLevelEnum.TRACE):
+        """
+        Decorator that runs function in scope,
+        with the function qualified name as scope log message.
+
+        Usage:
+            @logger.traced
+            def method(): ...
+
+            @logger.traced(log_level=LogLevelEnum.DEBUG)
+            async def async_method(): ...
+
+        @param func: Decorated function.
+        @param log_level: Scope log level.
+        @return: Decorated function.
+        """
+
+        if func is None:
+            return functools.partial(self.traced, log_level=log_level)
+
+        msg = func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_traced_func(*args, **kwargs):
+                call_site = CallSite.build(start_index=1)
+
+                with self.__create_scope(msg, log_level, call_site):
+                    return await func(*args, **kwargs)
+
+            return async_traced_func
+
+        @functools.wraps(func)
+        def traced_func(*args, **kwargs):
+            call_site = CallSite.build(start_index=1)
+
+            with self.__create_scope(msg, log_level, call_site):
+                return func(*args, **kwargs)
+
+        return traced_func
 
     def add_stream_handler(
             self,
@@ -142,7 +418,19 @@ class NrtLogger:
 
         self.__stream_handler_list.append(stream_handler)
 
+    def flush(self):
+        """
+        Write batched and buffered logs of all stream handlers.
+        """
+
+        async_log_writer.flush()
+
+        for handler in self.__stream_handler_list:
+            handler.flush()
+
     def close_stream_handlers(self):
+        async_log_writer.flush()
+
         for handler in self.__stream_handler_list:
             handler.close()
 
@@ -151,7 +439,7 @@ class NrtLogger:
     def update_log_level(
             self, log_level: LogLevelEnum, is_update_sh: bool = True):
 
-        self.__log_level = log_level
+        self.__set_log_level(log_level)
 
         if is_update_sh:
             self.__update_stream_handlers_log_level(log_level)
@@ -162,7 +450,7 @@ class NrtLogger:
 
     @log_level.setter
     def log_level(self, log_level: LogLevelEnum):
-        self.__log_level = log_level
+        self.__set_log_level(log_level)
 
     @property
     def stream_handler_list(self) -> list[LoggerStreamHandlerBase]:
@@ -176,10 +464,79 @@ class NrtLogger:
     def is_debug(self, is_debug: bool):
         self.__is_debug = is_debug
 
+    def __set_log_level(self, log_level: LogLevelEnum):
+        """
+        Set log level, compile it into integer,
+        and bind log methods of disabled log levels to no-op function,
+        so disabled logs cost a bare function call.
+        """
+
+        self.__log_level = log_level
+        self.__log_level_value = log_level.value
+
+        for method_name, method_log_level in self.__LOG_METHOD_LEVELS:
+            if method_log_level < self.__log_level_value:
+                setattr(self, method_name, _skip_log)
+            else:
+                self.__dict__.pop(method_name, None)
+
+    def __create_scope(
+            self,
+            msg: Union[str, Callable[[], str]],
+            log_level: LogLevelEnum,
+            call_site: CallSite) -> LogScope:
+
+        if self.__log_level_value > log_level.value:
+            return LogScope([], log_level, msg, None)
+
+        self.__verify_stream_handler_list_not_empty()
+
+        return \
+            LogScope(
+                list(self.__stream_handler_list),
+                log_level,
+                self.__get_shared_msg(msg),
+                call_site)
+
     def __update_stream_handlers_log_level(self, log_level: LogLevelEnum):
         for sh in self.__stream_handler_list:
             sh.log_level = log_level
 
+    async def __alog(
+            self,
+            log_level: LogLevelEnum,
+            msg: Union[str, Callable[[], str]],
+            manual_depth: ManualDepthEnum,
+            call_site: CallSite):
+
+        self.__verify_stream_handler_list_not_empty()
+
+        msg = self.__get_shared_msg(msg)
+
+        # Log depth is updated for all stream handlers before first await
+        future_list = \
+            [handler.log_async(log_level, msg, manual_depth, call_site)
+             for handler in self.__stream_handler_list]
+
+        await self.__wait_for_log_futures(future_list)
+
+    @classmethod
+    def __get_shared_msg(cls, msg: Union[str, Callable[[], str]]):
+        # Callable message is evaluated once for all stream handlers
+        if callable(msg) and not isinstance(msg, LazyMessage):
+            return LazyMessage(msg)
+
+        return msg
+
+    @classmethod
+    async def __wait_for_log_futures(
+            cls, future_list: list[Optional[asyncio.Future]]):
+
+        future_list = [future for future in future_list if future is not None]
+
+        if future_list:
+            await asyncio.gather(*future_list)
+
     def __verify_stream_handler_list_not_empty(self):
         if not self.__stream_handler_list:
             raise RuntimeError(
@@ -1,5 +1,9 @@
+import json
 from typing import Optional
 
+from nrt_logging.async_stream_handler import AsyncStreamHandler
+from nrt_logging.flight_recorder_stream_handler import \
+    FlightRecorderStreamHandler
 from nrt_logging.config import \
     LoggerManagerConfig, LoggerConfig, StreamHandlerConfig, ConfigBase
 from nrt_logging.log_format import LogDateFormat
@@ -13,6 +17,7 @@ class NrtLoggerManager:
     __logger_manager_config: Optional[LoggerManagerConfig] = None
 
     __is_debug: bool = False
+    __is_stats: bool = False
 
     def __init__(self):
         self.__verify_not_initiated()
@@ -35,6 +40,14 @@ class NrtLoggerManager:
             logger.close_stream_handlers()
             self.__loggers_dict.pop(name)
 
+    def flush(self):
+        """
+        Write batched and buffered logs of all loggers.
+        """
+
+        for logger in list(self.__loggers_dict.values()):
+            logger.flush()
+
     def close_all_loggers(self):
         logger_dict = self.__loggers_dict.copy()
 
@@ -52,6 +65,41 @@ class NrtLoggerManager:
         for lc in self.__logger_manager_config.loggers_config.values():
             self.__build_logger_from_config(lc, stream_handler_list)
 
+    def stats(self) -> dict:
+        """
+        Get hot path instrumentation of stream handlers with is_stats.
+
+        Stream handler key is its name,
+        or its class name and index in logger in case it has no name.
+
+        @return: {logger name: {stream handler key: stats dict}}
+        """
+
+        stats_dict = {}
+
+        for name, logger in self.__loggers_dict.items():
+            logger_stats_dict = {}
+
+            for i, sh in enumerate(logger.stream_handler_list):
+                if sh.stats is not None:
+                    sh_key = sh.name or f'{sh.__class__.__name__}_{i}'
+                    logger_stats_dict[sh_key] = sh.stats.to_dict()
+
+            if logger_stats_dict:
+                stats_dict[name] = logger_stats_dict
+
+        return stats_dict
+
+    def dump_stats(self, file_path: str):
+        """
+        Write stats of all loggers to JSON file.
+
+        @param file_path: JSON file path.
+        """
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+
     @property
     def loggers_dict(self) -> dict[str, NrtLogger]:
         return self.__loggers_dict
@@ -64,6 +112,23 @@ class NrtLoggerManager:
     def is_debug(self, is_debug: bool):
         self.__is_debug = is_debug
 
+    @property
+    def is_stats(self) -> bool:
+        """
+        Stats of stream handlers of all loggers,
+        and of stream handlers that are created by set_config.
+        """
+
+        return self.__is_stats
+
+    @is_stats.setter
+    def is_stats(self, is_stats: bool):
+        self.__is_stats = is_stats
+
+        for logger in self.__loggers_dict.values():
+            for sh in logger.stream_handler_list:
+                sh.is_stats = is_stats
+
     def __build_logger_from_config(
             self,
             logger_config: LoggerConfig,
@@ -137,10 +202,25 @@ class NrtLoggerManager:
             sh, stream_handler_config, logger_config)
         self.__update_stream_handler_is_zip_from_config(
             sh, stream_handler_config, logger_config)
+        self.__update_stream_handler_persistent_stream_from_config(
+            sh, stream_handler_config, logger_config)
+        self.__update_stream_handler_batch_write_from_config(
+            sh, stream_handler_config, logger_config)
 
         if stream_handler_config.file_path is not None:
             sh.file_path = stream_handler_config.file_path
 
+        if self.__is_stats:
+            sh.is_stats = True
+
+        if stream_handler_config.is_flight_recorder:
+            sh = \
+                self.__create_flight_recorder_stream_handler(
+                    sh, stream_handler_config)
+
+        if stream_handler_config.is_async:
+            sh = self.__create_async_stream_handler(sh, stream_handler_config)
+
         return sh
 
     def __update_stream_handler_log_level_from_config(
@@ -285,6 +365,94 @@ class NrtLoggerManager:
         if is_zip is not None:
             sh.is_zip = is_zip
 
+        for property_name in (
+                ConfigBase.ZIP_COMPRESSION,
+                ConfigBase.ZIP_COMPRESSION_LEVEL):
+            property_value = \
+                self.__get_inherited_property_from_config(
+                    property_name, stream_handler_config, logger_config)
+
+            if property_value is not None:
+                setattr(sh, property_name, property_value)
+
+    def __update_stream_handler_persistent_stream_from_config(
+            self,
+            sh: LoggerStreamHandlerBase,
+            stream_handler_config: StreamHandlerConfig,
+            logger_config: LoggerConfig):
+
+        for property_name in (
+                ConfigBase.IS_PERSISTENT_STREAM,
+                ConfigBase.BUFFER_SIZE,
+                ConfigBase.FLUSH_POLICY,
+                ConfigBase.FLUSH_LINES_AMOUNT,
+                ConfigBase.FLUSH_INTERVAL):
+            property_value = \
+                self.__get_inherited_property_from_config(
+                    property_name, stream_handler_config, logger_config)
+
+            if property_value is not None:
+                setattr(sh, property_name, property_value)
+
+    def __update_stream_handler_batch_write_from_config(
+            self,
+            sh: LoggerStreamHandlerBase,
+            stream_handler_config: StreamHandlerConfig,
+            logger_config: LoggerConfig):
+
+        for property_name in (
+                ConfigBase.BATCH_WRITE_SIZE,
+                ConfigBase.BATCH_WRITE_INTERVAL,
+                ConfigBase.IS_BATCH_WRITE):
+            property_value = \
+                self.__get_inherited_property_from_config(
+                    property_name, stream_handler_config, logger_config)
+
+            if property_value is not None:
+                setattr(sh, property_name, property_value)
+
+    @classmethod
+    def __create_async_stream_handler(
+            cls,
+            sh: LoggerStreamHandlerBase,
+            stream_handler_config: StreamHandlerConfig) -> AsyncStreamHandler:
+
+        async_params = {}
+
+        if stream_handler_config.async_queue_size is not None:
+            async_params['queue_size'] = \
+                stream_handler_config.async_queue_size
+
+        if stream_handler_config.async_overflow_policy is not None:
+            async_params['overflow_policy'] = \
+                stream_handler_config.async_overflow_policy
+
+        return AsyncStreamHandler(sh, **async_params)
+
+    @classmethod
+    def __create_flight_recorder_stream_handler(
+            cls,
+            sh: LoggerStreamHandlerBase,
+            stream_handler_config: StreamHandlerConfig) \
+            -> FlightRecorderStreamHandler:
+
+        flight_recorder_params = {}
+
+        if stream_handler_config.flight_recorder_records_amount is not None:
+            flight_recorder_params['records_amount'] = \
+                stream_handler_config.flight_recorder_records_amount
+
+        if stream_handler_config.flight_recorder_max_record_age is not None:
+            flight_recorder_params['max_record_age'] = \
+                stream_handler_config.flight_recorder_max_record_age
+
+        if stream_handler_config.flight_recorder_trigger_log_level \
+                is not None:
+            flight_recorder_params['trigger_log_level'] = \
+                stream_handler_config.flight_recorder_trigger_log_level
+
+        return FlightRecorderStreamHandler(sh, **flight_recorder_params)
+
     def __get_inherited_property_from_config(
             self,
             property_name: str,
@@ -1,28 +1,42 @@
-import ntpath
+import asyncio
+import atexit
+import io
 import os
 import sys
 import threading
+import weakref
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from bisect import insort
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from glob import glob
-from inspect import stack, FrameInfo
 from os.path import exists, getsize
 from threading import Lock
-from threading import Thread
-from typing import IO, Optional, Union
-from zipfile import ZipFile, ZIP_DEFLATED
-
+from time import monotonic, perf_counter_ns
+from types import FrameType
+from typing import IO, Callable, Optional, Union
+from zipfile import ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2, ZIP_LZMA
+
+from nrt_logging.archive_executor import \
+    ArchiveExecutor, archive_executor, zip_archive
+from nrt_logging.async_log_writer import async_log_writer
+from nrt_logging.call_stack import CallStack, CallSite
 from nrt_logging.exceptions import NotImplementedCodeException
 from nrt_logging.log_format import \
-    LogElementEnum, LogDateFormat, LogYamlElements
+    LogElementEnum, LogDateFormat, LogYamlElements, LogLineTemplate
 from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.snapshot import SnapshotRenderer, snapshot_renderer
+from nrt_logging.stream_handler_stats import \
+    StatsPhaseEnum, StreamHandlerStats
 
 
 class StreamHandlerEnum(Enum):
     CONSOLE = 'console'
     FILE = 'file'
+    RING_BUFFER = 'ring_buffer'
 
 
 class LogStyleEnum(Enum):
@@ -61,6 +75,165 @@ class DepthData:
     total_manual_depth: int = 0
 
 
+@dataclass(eq=False)
+class ScopeData:
+    """
+    Explicit hierarchy node, that is pushed by logger scope.
+    Logs in scope are children of scope log,
+    so their depth is resolved without call stack.
+    """
+
+    # Depth of logs in scope. None until scope log is created.
+    depth: Optional[int] = None
+    is_has_children: bool = False
+
+    def add_child(self) -> tuple[int, bool]:
+        """
+        Add log to scope.
+
+        @return: (depth, is_child) of the log.
+        """
+
+        is_child = not self.is_has_children
+        self.is_has_children = True
+        return self.depth, is_child
+
+
+@dataclass
+class DepthState:
+    """
+    Log depth state of a single thread or asyncio task in stream handler.
+
+    Context that is copied to other thread or asyncio task gets its own
+    depth state, while contextvars.copy_context().run in the same thread
+    or asyncio task shares the depth state of the code that runs it.
+    """
+
+    # Id of asyncio task, or thread id, that updates the depth state
+    owner: int = 0
+    depth: int = 0
+    depth_list: list[DepthData] = field(default_factory=list)
+    # Indexes of depth_list items by frame method name, in depth_list order
+    fm_index_dict: dict[str, list[int]] = field(default_factory=dict)
+    increase_depth_list: list[str] = field(default_factory=list)
+    # Scopes are shared with child contexts, as the logs of child contexts
+    # in scope are children of the same scope log.
+    scope_list: list[ScopeData] = field(default_factory=list)
+    # Amount of depth_list items that are inherited from parent context.
+    # Inherited items are parents of all logs in the context,
+    # even if they are not in the call stack of the context.
+    inherited_length: int = 0
+
+    def inherit(self, owner: int) -> 'DepthState':
+        """
+        Create depth state of child context, that inherits depth list.
+        DepthData is not changed after it is added to depth_list,
+        so it is shared by parent and child depth states.
+
+        @param owner: Id of asyncio task, or thread id, of child context.
+        @return: DepthState.
+        """
+
+        return \
+            DepthState(
+                owner=owner,
+                depth=self.depth,
+                depth_list=list(self.depth_list),
+                fm_index_dict={
+                    fm_name: list(index_list)
+                    for fm_name, index_list in self.fm_index_dict.items()},
+                increase_depth_list=list(self.increase_depth_list),
+                scope_list=list(self.scope_list),
+                inherited_length=len(self.depth_list))
+
+    def append_depth(self, depth_data: DepthData):
+        self.fm_index_dict.setdefault(depth_data.name, []).append(
+            len(self.depth_list))
+        self.depth_list.append(depth_data)
+
+    def truncate_depth_list(self, length: int):
+        """
+        Remove depth_list items from the end, until depth_list has length.
+
+        @param length: New length of depth_list.
+        """
+
+        while len(self.depth_list) > length:
+            depth_data = self.depth_list.pop()
+            index_list = self.fm_index_dict[depth_data.name]
+            index_list.pop()
+
+            if not index_list:
+                del self.fm_index_dict[depth_data.name]
+
+    def remove_depths(self, index_list: list[int]):
+        """
+        Remove depth_list items in one pass.
+        Only indexes of the items after the first removed item are shifted,
+        so only they are indexed again.
+
+        @param index_list: Indexes of items in depth_list.
+        """
+
+        if not index_list:
+            return
+
+        index_set = set(index_list)
+        first_index = min(index_set)
+        kept_list = \
+            [depth_data
+             for i, depth_data in enumerate(
+                 self.depth_list[first_index:], first_index)
+             if i not in index_set]
+
+        self.truncate_depth_list(first_index)
+
+        for depth_data in kept_list:
+            self.append_depth(depth_data)
+
+        self.inherited_length -= \
+            sum(1 for index in index_set if index < self.inherited_length)
+
+    def reset_depth_list(self, depth_data: DepthData):
+        self.depth_list = [depth_data]
+        self.fm_index_dict = {depth_data.name: [0]}
+
+    def get_latest_depth(self, fm_name: str) -> Optional[DepthData]:
+        """
+        Get the last depth_list item of frame method name.
+
+        @param fm_name: Frame method name.
+        @return: DepthData. None if frame method name is not in depth_list.
+        """
+
+        index_list = self.fm_index_dict.get(fm_name)
+
+        if index_list:
+            return self.depth_list[index_list[-1]]
+
+        return None
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    """
+    Log with resolved depth, ready to be formatted to log string.
+    """
+
+    log_level: LogLevelEnum
+    msg: str
+    path: str
+    method: str
+    line_number: str
+    date: datetime
+    depth: int
+    is_child: bool
+    pid: int = 0
+    # Thread key of log call thread,
+    # that can be different from the writing thread
+    thread_key: int = 0
+
+
 DEFAULT_LOG_STYLE = LogStyleEnum.LINE
 DEFAULT_LOG_LEVEL = LogLevelEnum.INFO
 
@@ -142,8 +315,68 @@ class FileSizeEnum(Enum):
         return num
 
 
+class FlushPolicyEnum(Enum):
+    LINE = 'line'
+    LINES = 'lines'
+    # Flush on write, in case flush interval seconds passed since
+    # last flush. There is no flush without write.
+    INTERVAL = 'interval'
+    EXIT = 'exit'
+
+    @classmethod
+    def build(cls, name: str):
+        name_l = name.lower()
+
+        for flush_policy_enum in cls:
+            if name_l == flush_policy_enum.value:
+                return flush_policy_enum
+
+        raise ValueError(f'[{name}] is not valid flush policy name')
+
+
+class ZipCompressionEnum(Enum):
+    STORED = ('stored', ZIP_STORED)
+    DEFLATED = ('deflated', ZIP_DEFLATED)
+    BZIP2 = ('bzip2', ZIP_BZIP2)
+    LZMA = ('lzma', ZIP_LZMA)
+
+    def __init__(self, compression_name: str, compression: int):
+        self._value_ = compression_name
+        self.__compression = compression
+
+    @property
+    def compression(self) -> int:
+        return self.__compression
+
+    @classmethod
+    def build(cls, name: str):
+        name_l = name.lower()
+
+        for zip_compression_enum in cls:
+            if name_l == zip_compression_enum.value:
+                return zip_compression_enum
+
+        raise ValueError(f'[{name}] is not valid zip compression name')
+
+
 DEFAULT_MAX_FILE_SIZE = 10 * FileSizeEnum.MB.bytes
 DEFAULT_FILES_AMOUNT = 10
+DEFAULT_BUFFER_SIZE = io.DEFAULT_BUFFER_SIZE
+DEFAULT_FLUSH_POLICY = FlushPolicyEnum.LINE
+DEFAULT_FLUSH_LINES_AMOUNT = 100
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_ZIP_COMPRESSION = ZipCompressionEnum.DEFLATED
+DEFAULT_ZIP_COMPRESSION_LEVEL = 7
+DEFAULT_BATCH_WRITE_SIZE = 64 * FileSizeEnum.KB.bytes
+DEFAULT_BATCH_WRITE_INTERVAL = 1.0
+
+# {stream handler: DepthState} of each asyncio task or thread context.
+# Single context variable, since contexts keep strong references
+# to their variables. Dictionary is replaced on update (copy on write),
+# as it is shared with copied contexts.
+_depth_state_dict_var: \
+    ContextVar[Optional[weakref.WeakKeyDictionary]] = \
+    ContextVar('nrt_logging_depth_state_dict', default=None)
 
 
 class LoggerStreamHandlerBase(ABC):
@@ -160,9 +393,6 @@ class LoggerStreamHandlerBase(ABC):
         f':{LogElementEnum.LINE_NUMBER.line_format}]' \
         f' {LogElementEnum.MESSAGE.line_format}'
 
-    _CLEAN_THREADS_DICTS = 100
-    __CLEAN_THREADS_COUNT = 2000
-
     __SNAPSHOT_SEPERATOR = \
         '====================================' \
         '====================================\n'
@@ -172,9 +402,9 @@ class LoggerStreamHandlerBase(ABC):
 
     _stream: Optional[IO] = None
 
-    _lock: Lock
+    # Lock of stream writes
+    _write_lock: Lock
 
-    __clean_threads_counter: int
     _stack_log_start_index: int
     __stack_log_increase_start_index: int
     __stack_log_decrease_start_index: int
@@ -183,16 +413,30 @@ class LoggerStreamHandlerBase(ABC):
     _name: Optional[str] = None
     _log_line_template: Optional[str] = None
 
-    # {Thread Id: depth}
-    _depth_dict: dict[int, int]
-    # {Thread Id: list}
-    _depth_list_dict: dict[int, list[DepthData]]
-    # {Thread Id: list}
-    _increase_depth_list_dict: dict[int, list[str]]
-    _decrease_depth_list_dict: dict[int, list[str]]
+    # Compiled log_line_template, recompiled when template is changed
+    __compiled_log_line_template: Optional[LogLineTemplate] = None
+    # Yaml elements, and element creators that are compiled from them
+    __compiled_yaml_elements: Optional[set[LogElementEnum]] = None
+    __yaml_element_creator_list: list
 
     _is_debug: bool = False
 
+    _snapshot_renderer: SnapshotRenderer = snapshot_renderer
+
+    # Hot path instrumentation, None in case it is disabled
+    _stats: Optional[StreamHandlerStats] = None
+
+    # Stream handlers with batched log strings, written at exit
+    __batch_write_stream_handlers: weakref.WeakSet = weakref.WeakSet()
+
+    _is_batch_write: bool = False
+    _batch_write_size: int = DEFAULT_BATCH_WRITE_SIZE
+    _batch_write_interval: float = DEFAULT_BATCH_WRITE_INTERVAL
+    # Log strings that are not written yet, guarded by write lock
+    __batch_list: list[str]
+    __batch_length: int
+    __batch_start_time: float
+
     def __init__(
             self,
             stack_log_start_index: int,
@@ -218,110 +462,185 @@ class LoggerStreamHandlerBase(ABC):
         if self._log_yaml_elements is None:
             self._log_yaml_elements = LogYamlElements()
 
-        thread_id = threading.get_ident()
-        self._depth_dict = {thread_id: 0}
-        self._depth_list_dict = {thread_id: []}
-        self._increase_depth_list_dict = {thread_id: []}
-        self._decrease_depth_list_dict = {thread_id: []}
-        self.__clean_threads_counter = 0
-        self._lock = Lock()
+        self._write_lock = Lock()
+        self.__batch_list = []
+        self.__batch_length = 0
+        self.__batch_start_time = monotonic()
 
     @abstractmethod
     def critical(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def error(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def warn(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def info(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def debug(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def trace(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def snapshot(
             self,
             methods_depth: int = SNAPSHOT_METHODS_DEPTH,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
         raise NotImplementedCodeException
 
     @abstractmethod
     def close(self):
         raise NotImplementedCodeException
 
-    def increase_depth(self):
-        with self._lock:
-            stack_str_list, _ = \
-                self.__get_stack_list(
+    def increase_depth(self, call_site: Optional[CallSite] = None):
+        if call_site is None:
+            call_site = \
+                self.__get_call_site(
                     start_index=self.__stack_log_increase_start_index)
 
-            thread_id = threading.get_ident()
-
-            self.__add_new_thread_id_to_dicts(thread_id)
+        self._get_depth_state().increase_depth_list.append(call_site.fm_name)
 
-            self._increase_depth_list_dict[thread_id].append(
-                stack_str_list[0])
-
-    def decrease_depth(self, level: int = 1):
+    def decrease_depth(
+            self, level: int = 1, call_site: Optional[CallSite] = None):
         if level < 1:
             return
 
-        with self._lock:
-            stack_str_list, _ = \
-                self.__get_stack_list(
+        if call_site is None:
+            call_site = \
+                self.__get_call_site(
                     start_index=self.__stack_log_decrease_start_index)
 
-            fm_name = stack_str_list[0]
-            drop_list = []
+        depth_state = self._get_depth_state()
+        fm_name = call_site.fm_name
+        drop_list = []
+
+        for index in reversed(depth_state.fm_index_dict.get(fm_name, [])):
+            if depth_state.depth_list[index].manual_depth_change == 1:
+                level -= 1
+                drop_list.append(index)
 
-            thread_id = threading.get_ident()
+                if depth_state.depth > 0:
+                    depth_state.depth -= 1
 
-            self.__add_new_thread_id_to_dicts(thread_id)
+        depth_state.remove_depths(drop_list)
 
-            for i, depth in enumerate(
-                    reversed(self._depth_list_dict[thread_id])):
-                if depth.name == fm_name and depth.manual_depth_change == 1:
-                    level -= 1
-                    drop_list.append(
-                        len(self._depth_list_dict[thread_id]) - 1 - i)
+    def enter_scope(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            call_site: Optional[CallSite] = None) -> Optional[ScopeData]:
+        """
+        Log scope log, and push scope, so the next logs
+        of current context are its children until exit_scope,
+        without call stack inspection.
+
+        @param log_level: Scope log level.
+        @param msg: Scope log message.
+        @param call_site: Scope call site.
+        @return: ScopeData for exit_scope.
+            None in case scope log is not logged,
+            so logs in scope are not children of scope log.
+        """
 
-                    if self._depth_dict[thread_id] > 0:
-                        self._depth_dict[thread_id] -= 1
+        if call_site is None:
+            call_site = \
+                self.__get_call_site(
+                    start_index=self.__stack_log_increase_start_index)
 
-            for drop_index in drop_list:
-                self._depth_list_dict[thread_id].pop(drop_index)
+        scope_list = self._get_depth_state().scope_list
+        scope = ScopeData()
+        scope_list.append(scope)
 
-            self._decrease_depth_list_dict[thread_id].append(fm_name)
+        self._log(log_level, msg, ManualDepthEnum.NO_CHANGE, call_site)
+
+        if scope.depth is None:
+            scope_list.remove(scope)
+            return None
+
+        return scope
+
+    def exit_scope(self, scope: Optional[ScopeData]):
+        """
+        Pop scope, that was pushed by enter_scope.
+
+        @param scope: ScopeData that was returned by enter_scope.
+        """
+
+        if scope is None:
+            return
+
+        scope_list = self._get_depth_state().scope_list
+
+        if scope_list and scope_list[-1] is scope:
+            scope_list.pop()
+        elif scope in scope_list:
+            scope_list.remove(scope)
+
+    def log_async(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None) -> Optional[asyncio.Future]:
+        """
+        Log from running event loop without blocking it on stream write.
+        Log depth is updated in the caller, the same as in sync log,
+        and the log is written by async log writer thread.
+
+        @param log_level: Log level.
+        @param msg: Log message, or callable that returns log message.
+        @param manual_depth: Manual depth.
+        @param call_site: Log call site.
+        @return:
+            Future that is done when the log is written,
+            None in case log is not written.
+        """
+
+        if log_level < self.log_level:
+            return None
+
+        if call_site is None:
+            call_site = self.__get_call_site(start_index=2)
+
+        log_record = \
+            self._create_log_record(log_level, msg, manual_depth, call_site)
+
+        return async_log_writer.submit(self._write_log_records, [log_record])
 
     @property
     def name(self) -> str:
@@ -383,247 +702,504 @@ class LoggerStreamHandlerBase(ABC):
     def is_debug(self, is_debug: bool):
         self._is_debug = is_debug
 
+    @property
+    def is_batch_write(self) -> bool:
+        return self._is_batch_write
+
+    @is_batch_write.setter
+    def is_batch_write(self, is_batch_write: bool):
+        with self._write_lock:
+            if not is_batch_write:
+                self._write_batch()
+
+            self._is_batch_write = is_batch_write
+
+    @property
+    def batch_write_size(self) -> int:
+        return self._batch_write_size
+
+    @batch_write_size.setter
+    def batch_write_size(self, batch_write_size: int):
+        if batch_write_size <= 0:
+            raise ValueError('Batch write size must be bigger from 0')
+
+        self._batch_write_size = batch_write_size
+
+    @property
+    def batch_write_interval(self) -> float:
+        return self._batch_write_interval
+
+    @batch_write_interval.setter
+    def batch_write_interval(self, batch_write_interval: float):
+        if batch_write_interval <= 0:
+            raise ValueError('Batch write interval must be bigger from 0')
+
+        self._batch_write_interval = batch_write_interval
+
+    @property
+    def snapshot_renderer(self) -> SnapshotRenderer:
+        return self._snapshot_renderer
+
+    @snapshot_renderer.setter
+    def snapshot_renderer(self, snapshot_renderer_: SnapshotRenderer):
+        self._snapshot_renderer = snapshot_renderer_
+
+    @property
+    def is_stats(self) -> bool:
+        return self._stats is not None
+
+    @is_stats.setter
+    def is_stats(self, is_stats: bool):
+        if is_stats != self.is_stats:
+            self._stats = StreamHandlerStats() if is_stats else None
+
+    @property
+    def stats(self) -> Optional[StreamHandlerStats]:
+        """
+        Hot path instrumentation.
+
+        @return: StreamHandlerStats, or None in case is_stats is False.
+        """
+
+        return self._stats
+
     def _snapshot(
             self,
             methods_depth: int,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+
+        if call_site is None:
+            call_site = \
+                self.__get_call_site(
+                    start_index=self._stack_log_start_index - 1)
+
+        self._log(
+            LogLevelEnum.TRACE,
+            self._create_snapshot_msg(methods_depth, call_site),
+            manual_depth,
+            call_site)
+
+    def _create_snapshot_msg(
+            self, methods_depth: int, call_site: CallSite) -> str:
 
         if methods_depth < 1:
             raise ValueError(
                 f'Logger methods_depth value [{methods_depth}]'
                 f' cannot be less than 1')
 
-        stack_log_start_index = self._stack_log_start_index - 1
-
-        stack_str_list, stack_list = \
-            self.__get_stack_list(start_index=stack_log_start_index)
+        call_stack = call_site.call_stack
+        deadline = self._snapshot_renderer.create_deadline()
 
-        with self._lock:
-            snapshot_str = \
-                self.__SNAPSHOT_SEPERATOR.join(
-                    [self.__get_method_snapshot(
-                        stack_str_list[i], stack_list[i])
-                        for i in range(min(methods_depth, len(stack_list)))])
+        snapshot_str = \
+            self.__SNAPSHOT_SEPERATOR.join(
+                [self.__get_method_snapshot(
+                    call_stack.get_fm_name(i),
+                    call_stack.get_frame(i),
+                    deadline)
+                    for i in range(min(methods_depth, len(call_stack)))])
 
-            stack_log_start_index = self._stack_log_start_index
-            self._stack_log_start_index += 1
-
-            try:
-                self._log(
-                    LogLevelEnum.TRACE,
-                    f'\n{snapshot_str}',
-                    manual_depth,
-                    is_lock=False)
-            finally:
-                self._stack_log_start_index = stack_log_start_index
+        return f'\n{snapshot_str}'
 
     def _log(
             self,
             log_level: LogLevelEnum,
             msg: str,
             manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
-            is_lock: bool = True):
+            call_site: Optional[CallSite] = None):
 
         if log_level >= self.log_level:
-            stack_str_list, stack_list = \
-                self.__get_stack_list(start_index=self._stack_log_start_index)
+            if self._stats is not None:
+                self.__log_with_stats(
+                    self._stats, log_level, msg, manual_depth, call_site)
+                return
 
-            try:
-                self._lock.acquire(is_lock)
+            if call_site is None:
+                call_site = \
+                    self.__get_call_site(
+                        start_index=self._stack_log_start_index)
+
+            log_record = \
+                self._create_log_record(
+                    log_level, msg, manual_depth, call_site)
+
+            log_str = f'{self._create_log_str(log_record)}\n'
+
+            with self._write_lock:
+                self.__write_or_batch(log_str)
+
+    def _create_log_record(
+            self,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum,
+            call_site: CallSite) -> LogRecord:
+        """
+        Update log depth of current context and create log record.
+
+        @param log_level: Log level.
+        @param msg: Log message, or callable that returns log message.
+        @param manual_depth: Manual depth.
+        @param call_site: Log call site.
+        @return: LogRecord.
+        """
+
+        # Lazy message is evaluated once the log level is verified
+        if callable(msg):
+            msg = msg()
+
+        if isinstance(msg, bytes):
+            msg = msg.decode('utf-8')
+
+        if self.is_debug:
+            msg += self.__add_debug_to_message()
+
+        depth_state = self._get_depth_state()
+
+        if depth_state.scope_list:
+            depth, is_child = \
+                self.__update_scope_log_depth(
+                    call_site, manual_depth, depth_state)
+        else:
+            is_child = \
+                self.__update_call_stack_log_depth(
+                    call_site, manual_depth, depth_state)
+            depth = depth_state.depth
+
+        log_record = \
+            LogRecord(
+                log_level=log_level,
+                msg=msg,
+                path=call_site.path,
+                method=call_site.method,
+                line_number=call_site.line_number,
+                date=call_site.date,
+                depth=depth,
+                is_child=is_child,
+                pid=os.getpid(),
+                thread_key=call_site.thread_key)
+
+        return log_record
+
+    def _get_depth_state(self) -> DepthState:
+        """
+        Get log depth state of current context.
+
+        Each asyncio task and each thread has its own depth state.
+        Contexts that are copied to asyncio task or to thread
+        (asyncio.create_task, asyncio.to_thread) inherit the depth
+        of the context that created them, without changing it.
+        contextvars.copy_context().run in the same asyncio task or thread
+        shares the depth state, so the run changes the depth of the code
+        that runs it.
+
+        @return: DepthState.
+        """
+
+        depth_state_dict = _depth_state_dict_var.get()
+        depth_state = \
+            None if depth_state_dict is None else depth_state_dict.get(self)
+        owner = self.__get_depth_state_owner()
+
+        if depth_state is None:
+            depth_state = DepthState(owner=owner)
+        elif depth_state.owner != owner:
+            depth_state = depth_state.inherit(owner)
+        else:
+            return depth_state
+
+        depth_state_dict = \
+            weakref.WeakKeyDictionary(
+                () if depth_state_dict is None else depth_state_dict)
+        depth_state_dict[self] = depth_state
+        _depth_state_dict_var.set(depth_state_dict)
+        return depth_state
+
+    def _create_log_str(self, log_record: LogRecord) -> str:
+        return \
+            self.__create_log_str_prefix(log_record) \
+            + self.__create_log_str_suffix(log_record)
+
+    def _write_log_records(self, log_record_list: list[LogRecord]):
+        """
+        Format log records and write them to stream with a single write.
+
+        @param log_record_list: Log records.
+        """
+
+        if self._stats is not None:
+            self.__write_log_records_with_stats(self._stats, log_record_list)
+            return
 
-                if isinstance(msg, bytes):
-                    msg = msg.decode('utf-8')
+        log_str = \
+            ''.join(
+                [f'{self._create_log_str(log_record)}\n'
+                 for log_record in log_record_list])
+
+        with self._write_lock:
+            self.__write_or_batch(log_str)
+
+    def flush(self):
+        """
+        Write batched log strings and flush stream.
+        """
+
+        with self._write_lock:
+            self._write_batch()
+
+            if self._stream is not None:
+                self._stream.flush()
+
+    def _write_batch(self):
+        """
+        Write batched log strings to stream with a single write.
+        Called while stream handler write lock is acquired.
+        """
+
+        if self.__batch_list:
+            log_str = ''.join(self.__batch_list)
+            self.__batch_list = []
+            self.__batch_length = 0
+            self._write(log_str)
+
+    def _write(self, log_str: str):
+        """
+        Write log string to stream.
+        Called while stream handler write lock is acquired.
+
+        @param log_str: Log string.
+        """
 
-                if self.is_debug:
-                    msg += self.__add_debug_to_message()
+        self._stream.write(log_str)
 
-                thread_id = threading.get_ident()
+    def __log_with_stats(
+            self,
+            stats: StreamHandlerStats,
+            log_level: LogLevelEnum,
+            msg: str,
+            manual_depth: ManualDepthEnum,
+            call_site: Optional[CallSite]):
 
-                self.__add_new_thread_id_to_dicts(thread_id)
+        start_time = perf_counter_ns()
 
-                manual_depth = \
-                    self.__update_manual_depth(
-                        stack_str_list[0], manual_depth, thread_id)
+        if call_site is None:
+            call_site = \
+                self.__get_call_site(
+                    start_index=self._stack_log_start_index + 1)
+            start_time = \
+                stats.add_phase_time(StatsPhaseEnum.CALL_SITE, start_time)
 
-                log_str = \
-                    self.__create_log_str(
-                        msg,
-                        log_level,
-                        stack_str_list,
-                        stack_list,
-                        manual_depth,
-                        thread_id)
+        log_record = \
+            self._create_log_record(log_level, msg, manual_depth, call_site)
+        start_time = stats.add_phase_time(StatsPhaseEnum.DEPTH, start_time)
+        log_str = f'{self._create_log_str(log_record)}\n'
+        stats.add_phase_time(StatsPhaseEnum.FORMAT, start_time)
+        self.__write_or_batch_with_stats(stats, log_str, 1)
+
+    def __write_log_records_with_stats(
+            self,
+            stats: StreamHandlerStats,
+            log_record_list: list[LogRecord]):
+
+        start_time = perf_counter_ns()
+        log_str = \
+            ''.join(
+                [f'{self._create_log_str(log_record)}\n'
+                 for log_record in log_record_list])
+        stats.add_phase_time(StatsPhaseEnum.FORMAT, start_time)
+        self.__write_or_batch_with_stats(
+            stats, log_str, len(log_record_list))
 
-                self._stream.write(f'{log_str}\n')
-                self.__clean_threads_dicts()
-            finally:
-                if is_lock:
-                    self._lock.release()
+    def __write_or_batch_with_stats(
+            self, stats: StreamHandlerStats, log_str: str, records: int):
+
+        if not self._write_lock.acquire(blocking=False):
+            start_time = perf_counter_ns()
+            self._write_lock.acquire()
+            stats.add_lock_contention(start_time)
+
+        try:
+            start_time = perf_counter_ns()
+            self.__write_or_batch(log_str)
+            stats.add_phase_time(StatsPhaseEnum.WRITE, start_time)
+        finally:
+            self._write_lock.release()
+
+        stats.add_records(records, len(log_str.encode('utf-8', 'replace')))
+
+    def __write_or_batch(self, log_str: str):
+        """
+        Write log string, or add it to batch in case of batch write.
+        Batch is written when it reached batch write size,
+        or when batch write interval passed since its first log string.
+        Called while stream handler write lock is acquired.
+
+        @param log_str: Log string.
+        """
+
+        if not self._is_batch_write:
+            self._write(log_str)
+            return
+
+        if not self.__batch_list:
+            self.__batch_start_time = monotonic()
+            self.__batch_write_stream_handlers.add(self)
+
+        self.__batch_list.append(log_str)
+        self.__batch_length += len(log_str)
+
+        if self.__batch_length >= self._batch_write_size \
+                or monotonic() - self.__batch_start_time \
+                >= self._batch_write_interval:
+            self._write_batch()
 
     def __get_method_snapshot(
-            self, frame_name: str, frame_info: FrameInfo) -> str:
+            self, frame_name: str, frame: FrameType, deadline: float) -> str:
         return \
             f'Frame: {frame_name}\n' \
-            f'{self.__get_f_locals_snapshot(frame_info.frame.f_locals)}'
+            f'{self.__get_f_locals_snapshot(frame.f_locals, deadline)}'
 
-    def __get_f_locals_snapshot(self, f_locals: dict):
+    def __get_f_locals_snapshot(self, f_locals: dict, deadline: float):
+        var_list = \
+            self._snapshot_renderer.render_f_locals(f_locals, deadline)
         f_locals_str = \
             'Method vars:\n' + '\n'.join(
-                [f'{self.YAML_SPACES_SEPARATOR}{name}: {var}'
-                 for name, var in f_locals.items()
-                 if name != 'self']
+                [f'{self.YAML_SPACES_SEPARATOR}{name}: {var_str}'
+                 for name, var_str in var_list]
             )
 
         self_ = f_locals.get('self')
 
-        if self_:
-            f_locals_str += f'\n{self.__get_self_snapshot(self_)}'
+        if self_ is not None:
+            f_locals_str += \
+                f'\n{self.__get_self_snapshot(self_, deadline)}'
 
         return f_locals_str
 
-    def __get_self_snapshot(self, self_):
-        self_str = ''
-
-        for attr_name in dir(self_):
-            attr = self_.__getattribute__(attr_name)
-
-            if self.__is_variable(attr, attr_name):
-                self_str += \
-                    f'{self.YAML_SPACES_SEPARATOR}{attr_name}: {attr}\n'
+    def __get_self_snapshot(self, self_, deadline: float):
+        attr_list = self._snapshot_renderer.render_self(self_, deadline)
+        self_str = ''.join(
+            [f'{self.YAML_SPACES_SEPARATOR}{attr_name}: {attr_str}\n'
+             for attr_name, attr_str in attr_list])
 
         if self_str:
             self_str = f'self:\n{self_str}'
 
         return self_str
 
-    def __get_latest_fm_depth(
-            self, fm_name: str, thread_id: int) -> Optional[DepthData]:
-        for fm_depth in reversed(self._depth_list_dict[thread_id]):
-            if fm_name == fm_depth.name:
-                return fm_depth
-
-        return None
-
-    def __create_log_str(
+    def __update_scope_log_depth(
             self,
-            msg: str,
-            log_level: LogLevelEnum,
-            stack_str_list: list[str],
-            stack_list: list[FrameInfo],
+            call_site: CallSite,
             manual_depth: ManualDepthEnum,
-            thread_id: int):
-        if self._depth_list_dict.get(thread_id):
-            return \
-                self.__create_log_str_on_depth_plus(
-                    msg,
-                    log_level,
-                    stack_str_list,
-                    stack_list,
-                    manual_depth,
-                    thread_id)
+            depth_state: DepthState) -> tuple[int, bool]:
+        """
+        Update log depth of log in scope.
+        Manual depth is ignored in scope.
 
-        return \
-            self.__create_log_str_on_depth_0(
-                msg, log_level, stack_str_list, stack_list, thread_id)
+        @param call_site: Log call site.
+        @param manual_depth: Manual depth.
+        @param depth_state: Log depth state of current context.
+        @return: (depth, is_child) of the log.
+        """
 
-    def __update_manual_depth(
+        scope = depth_state.scope_list[-1]
+
+        if scope.depth is not None:
+            return scope.add_child()
+
+        # Scope log is child of parent scope,
+        # or resolved by call stack in case it is the outer scope
+        if len(depth_state.scope_list) > 1:
+            depth, is_child = depth_state.scope_list[-2].add_child()
+        else:
+            is_child = \
+                self.__update_call_stack_log_depth(
+                    call_site, manual_depth, depth_state)
+            depth = depth_state.depth
+
+        scope.depth = depth + 1
+
+        return depth, is_child
+
+    def __update_call_stack_log_depth(
             self,
-            fm_name: str,
+            call_site: CallSite,
             manual_depth: ManualDepthEnum,
-            thread_id: int):
+            depth_state: DepthState) -> bool:
 
-        if manual_depth == ManualDepthEnum.NO_CHANGE \
-                and fm_name in self._increase_depth_list_dict[thread_id]:
-            self._increase_depth_list_dict[thread_id].remove(fm_name)
-            return ManualDepthEnum.INCREASE
+        manual_depth = \
+            self.__update_manual_depth(
+                call_site.fm_name, manual_depth, depth_state)
 
-        return manual_depth
+        return self.__update_log_depth(call_site, manual_depth, depth_state)
 
-    def __create_log_str_on_depth_0(
+    def __update_log_depth(
             self,
-            msg: str,
-            log_level: LogLevelEnum,
-            stack_str_list: list[str],
-            stack_list: list[FrameInfo],
-            thread_id: int) -> str:
+            call_site: CallSite,
+            manual_depth: ManualDepthEnum,
+            depth_state: DepthState) -> bool:
+        """
+        Update log depth.
 
-        fm_name = stack_str_list[0]
+        @param call_site: Log call site.
+        @param manual_depth: Manual depth.
+        @param depth_state: Log depth state of current context.
+        @return: True in case log is child of previous log, else False.
+        """
 
-        self._depth_list_dict[thread_id].append(DepthData(name=fm_name))
+        if depth_state.depth_list:
+            expected_parent_fm_name = depth_state.depth_list[-1].name
 
-        if self.style == LogStyleEnum.YAML:
             return \
-                self.YAML_DOCUMENT_SEPARATOR \
-                + self.__create_yaml_elements_str(
-                    msg, log_level, False, stack_list, thread_id)
+                self.__update_depth(
+                    call_site.fm_name,
+                    call_site.call_stack,
+                    expected_parent_fm_name,
+                    manual_depth,
+                    depth_state)
 
-        if self.style == LogStyleEnum.LINE:
-            return self.__create_line_element_str(
-                msg, log_level, False, stack_list, thread_id)
+        depth_state.append_depth(DepthData(name=call_site.fm_name))
 
-        raise NotImplementedCodeException()
+        return False
 
-    def __create_log_str_on_depth_plus(
-            self,
-            msg: str,
-            log_level: LogLevelEnum,
-            stack_str_list: list[str],
-            stack_list: list[FrameInfo],
+    @classmethod
+    def __update_manual_depth(
+            cls,
+            fm_name: str,
             manual_depth: ManualDepthEnum,
-            thread_id: int):
-
-        fm_name = stack_str_list[0]
-        parent_stack_list = stack_str_list[1:]
-        expected_parent_fm_name = self._depth_list_dict[thread_id][-1].name
+            depth_state: DepthState):
 
-        is_child = \
-            self.__update_depth(
-                fm_name,
-                stack_str_list,
-                expected_parent_fm_name,
-                parent_stack_list,
-                manual_depth,
-                thread_id)
-
-        return \
-            self.__create_log_str_prefix(is_child, thread_id) \
-            + self.__create_log_str_suffix(
-                msg, log_level, is_child, stack_list, thread_id)
+        if manual_depth == ManualDepthEnum.NO_CHANGE \
+                and fm_name in depth_state.increase_depth_list:
+            depth_state.increase_depth_list.remove(fm_name)
+            return ManualDepthEnum.INCREASE
 
-    def __create_log_str_suffix(
-            self,
-            msg: str,
-            log_level: LogLevelEnum,
-            is_child: bool,
-            stack_list: list[FrameInfo],
-            thread_id: int):
+        return manual_depth
 
+    def __create_log_str_suffix(self, log_record: LogRecord):
         if self.style == LogStyleEnum.YAML:
-            return self.__create_yaml_elements_str(
-                msg, log_level, is_child, stack_list, thread_id)
+            return self.__create_yaml_elements_str(log_record)
 
         if self.style == LogStyleEnum.LINE:
-            return self.__create_line_element_str(
-                msg, log_level, is_child, stack_list, thread_id)
+            return self.__create_line_element_str(log_record)
 
         raise NotImplementedCodeException()
 
-    def __create_log_str_prefix(self, is_child: bool, thread_id: int):
-        if is_child:
-            return self.__create_prefix_log_str_for_child(thread_id)
+    def __create_log_str_prefix(self, log_record: LogRecord):
+        if log_record.is_child:
+            return self.__create_prefix_log_str_for_child(log_record.depth)
 
-        if self._depth_dict[thread_id] == 0 \
-                and self.style == LogStyleEnum.YAML:
+        if log_record.depth == 0 and self.style == LogStyleEnum.YAML:
             return f'{self.YAML_DOCUMENT_SEPARATOR}'
 
         return ''
 
-    def __create_prefix_log_str_for_child(self, thread_id: int):
+    def __create_prefix_log_str_for_child(self, depth: int):
         depth_4_spaces = \
             ''.join(
                 [
                     self.YAML_CHILDREN_SPACES_SEPARATOR
-                    for _ in range(self._depth_dict[thread_id] - 1)
+                    for _ in range(depth - 1)
                 ])
         if self.style == LogStyleEnum.YAML:
             return f'{depth_4_spaces}children:'
@@ -636,232 +1212,214 @@ class LoggerStreamHandlerBase(ABC):
     def __update_depth(
             self,
             fm_name: str,
-            stack_list: list[str],
+            call_stack: CallStack,
             expected_parent_fm_name: str,
-            parent_stack_list: list[str],
             manual_depth: ManualDepthEnum,
-            thread_id: int) -> bool:
+            depth_state: DepthState) -> bool:
         """
         Update log depth.
 
         @param fm_name: Frame name.
-        @param stack_list:  Stack list.
+        @param call_stack: Call stack.
         @param expected_parent_fm_name: Expected parent frame name.
-        @param parent_stack_list:  parent frame stack list.
         @param manual_depth: Manual depth.
-        @param thread_id: Thread id.
+        @param depth_state: Log depth state of current context.
         @return: True in case increase depth, else False.
         """
 
-        # In case this is log in child method
+        # In case this is log in child method,
+        # or first log in child context of expected parent
         if self.__is_increased_child_depth(
-                expected_parent_fm_name, parent_stack_list):
-            self.__update_depth_for_increased_child_depth(fm_name, thread_id)
+                expected_parent_fm_name, call_stack) \
+                or len(depth_state.depth_list) \
+                == depth_state.inherited_length:
+            self.__update_depth_for_increased_child_depth(
+                fm_name, depth_state)
             return True
 
         # In case the log is in the same method of previous log
         if self.__is_child_in_previous_child_depth(
-                expected_parent_fm_name, stack_list):
+                expected_parent_fm_name, fm_name):
             is_child = \
                 self.__update_depth_for_change_in_manual_depth(
-                    fm_name, manual_depth, thread_id)
+                    fm_name, manual_depth, depth_state)
             return is_child
 
         # In case go up in the stack so search previous parent
         self.__update_depth_for_go_up_in_stack(
-            stack_list, manual_depth, thread_id)
+            fm_name, call_stack, manual_depth, depth_state)
         return False
 
     def __update_depth_for_go_up_in_stack(
             self,
-            stack_list: list[str],
+            fm_name: str,
+            call_stack: CallStack,
             manual_depth: ManualDepthEnum,
-            thread_id: int):
+            depth_state: DepthState):
 
         reverse_depth = 0
 
-        for i, parent in enumerate(
-                reversed(self._depth_list_dict[thread_id])):
-            if parent.name in stack_list:
-                self._depth_dict[thread_id] -= reverse_depth
+        for parent_index in range(len(depth_state.depth_list) - 1, -1, -1):
+            parent = depth_state.depth_list[parent_index]
 
-                if self._depth_dict[thread_id] < 0:
-                    self._depth_dict[thread_id] = 0
+            if parent_index < depth_state.inherited_length \
+                    or parent.name in call_stack:
+                depth_state.depth -= reverse_depth
 
-                for _ in range(i):
-                    self._depth_list_dict[thread_id].pop()
+                if depth_state.depth < 0:
+                    depth_state.depth = 0
+
+                depth_state.truncate_depth_list(parent_index + 1)
 
                 if manual_depth.value:
                     self.__update_depth_for_change_in_manual_depth(
-                        stack_list[0], manual_depth, thread_id)
+                        fm_name, manual_depth, depth_state)
                 else:
-                    self._depth_list_dict[thread_id].append(
-                        DepthData(name=stack_list[0]))
+                    depth_state.append_depth(DepthData(name=fm_name))
                 return
 
             reverse_depth += parent.manual_depth_change + 1
 
         if manual_depth.value:
             self.__update_depth_for_change_in_manual_depth(
-                stack_list[0], manual_depth, thread_id)
+                fm_name, manual_depth, depth_state)
         else:
-            self._depth_list_dict[thread_id] = \
-                [DepthData(name=stack_list[0])]
-            self._depth_dict[thread_id] = 0
+            depth_state.reset_depth_list(DepthData(name=fm_name))
+            depth_state.depth = 0
 
-    def __get_stack_list(
-            self, start_index: int) -> (list[str], list[FrameInfo]):
+    @classmethod
+    def __get_depth_state_owner(cls) -> int:
+        # skipcq: PYL-W0212
+        if asyncio._get_running_loop() is not None:
+            task = asyncio.current_task()
 
-        stack_str_list = []
-        stack_list = stack()[start_index:]
+            if task is not None:
+                return id(task)
 
-        for sf in stack_list:
-            path, method, _ = \
-                self.__get_log_path_method_and_line_number_from_sf(sf)
-            stack_str_list.append(self.__create_fm_name(path, method))
+        return threading.get_ident()
 
-        return stack_str_list, stack_list
+    @classmethod
+    def __get_call_site(cls, start_index: int) -> CallSite:
+        """
+        Get log call site.
 
-    def __create_yaml_elements_str(
-            self,
-            msg: str,
-            log_level: LogLevelEnum,
-            is_child: bool,
-            stack_list: list[FrameInfo],
-            thread_id: int) -> str:
+        @param start_index:
+            Index of log caller frame in call stack,
+            when index 0 is __get_call_site method.
+        @return: CallSite.
+        """
+
+        return CallSite.build(start_index=start_index)
+
+    def __create_yaml_elements_str(self, log_record: LogRecord) -> str:
         depth_spaces = \
             ''.join(
                 [f'{self.YAML_SPACES_SEPARATOR}  '
-                 for _ in range(self._depth_dict[thread_id])])
+                 for _ in range(log_record.depth)])
 
         yaml_str = ''
 
-        if self._depth_dict[thread_id] > 0:
-            if is_child:
+        if log_record.depth > 0:
+            if log_record.is_child:
                 yaml_str = f'\n{depth_spaces[:-2]}- '
             else:
                 yaml_str = f'{depth_spaces[:-2]}- '
 
-        sf = stack_list[0]
-
-        path, method, line_number = \
-            self.__get_log_path_method_and_line_number_from_sf(sf)
-
         yaml_elements_str = \
-            self.__create_yaml_elements(
-                depth_spaces, log_level, path, method, line_number, msg)
+            self.__create_yaml_elements(depth_spaces, log_record)
 
-        if self._depth_dict[thread_id] > 0:
+        if log_record.depth > 0:
             yaml_elements_str = \
                 yaml_elements_str[len(f'\n{depth_spaces[:-2]}- '):]
 
         return yaml_str + yaml_elements_str
 
     def __create_yaml_elements(
-            self,
-            depth_spaces: str,
-            log_level: LogLevelEnum,
-            path: str,
-            method: str,
-            line_number: str,
-            msg: str) -> str:
+            self, depth_spaces: str, log_record: LogRecord) -> str:
 
         return \
             ''.join([
-                self.__create_yaml_element(
-                    yaml_element,
-                    depth_spaces,
-                    log_level,
-                    path, method,
-                    line_number,
-                    msg)
-                for yaml_element in self.log_yaml_elements.yaml_elements
+                yaml_element_creator(depth_spaces, log_record)
+                for yaml_element_creator
+                in self.__get_yaml_element_creator_list()
             ])
 
-    def __create_yaml_element(
-            self,
-            yaml_element: LogElementEnum,
-            depth_spaces: str,
-            log_level: LogLevelEnum,
-            path: str,
-            method: str,
-            line_number: str,
-            msg: str):
+    def __get_yaml_element_creator_list(self) -> list:
+        yaml_elements = self.log_yaml_elements.yaml_elements
+
+        if self.__compiled_yaml_elements is not yaml_elements:
+            self.__yaml_element_creator_list = \
+                [self.__create_yaml_element_creator(yaml_element)
+                 for yaml_element in yaml_elements]
+            self.__compiled_yaml_elements = yaml_elements
 
+        return self.__yaml_element_creator_list
+
+    def __create_yaml_element_creator(self, yaml_element: LogElementEnum):
         if yaml_element == LogElementEnum.DATE:
-            return f'\n{self.__create_yaml_date_element(depth_spaces)}'
+            return \
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_date_element(
+                    depth_spaces, log_record.date)
 
         if yaml_element == LogElementEnum.LOG_LEVEL:
-            log_level_str = \
-                self.__create_yaml_log_level_element(depth_spaces, log_level)
-            return f'\n{log_level_str}'
+            return \
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_log_level_element(
+                    depth_spaces, log_record.log_level)
 
         if yaml_element == LogElementEnum.PATH:
-            return f'\n{self.__create_yaml_path_element(path, depth_spaces)}'
+            return \
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_path_element(
+                    log_record.path, depth_spaces)
 
         if yaml_element == LogElementEnum.METHOD:
             return \
-                f'\n{self.__create_yaml_method_element(method, depth_spaces)}'
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_method_element(
+                    log_record.method, depth_spaces)
 
         if yaml_element == LogElementEnum.LINE_NUMBER:
             return \
+                lambda depth_spaces, log_record: \
                 '\n' + self.__create_yaml_line_number_element(
-                    line_number, depth_spaces)
+                    log_record.line_number, depth_spaces)
 
         if yaml_element == LogElementEnum.MESSAGE:
             return \
-                '\n' \
-                f'{self.__create_yaml_line_message_element(msg, depth_spaces)}'
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_line_message_element(
+                    log_record.msg, depth_spaces)
+
+        if yaml_element == LogElementEnum.PID:
+            return \
+                lambda depth_spaces, log_record: \
+                '\n' + self.__create_yaml_pid_element(
+                    log_record.pid, depth_spaces)
 
         raise NotImplementedCodeException(
             f'Bug: Yaml element {yaml_element} not implemented')
 
-    def __create_line_element_str(
-            self,
-            msg: str,
-            log_level: LogLevelEnum,
-            is_child: bool,
-            stack_list: list[FrameInfo],
-            thread_id: int) -> str:
+    def __create_line_element_str(self, log_record: LogRecord) -> str:
         depth_spaces = \
             ''.join(
                 [f'{self.YAML_SPACES_SEPARATOR}  '
-                 for _ in range(self._depth_dict[thread_id])])
+                 for _ in range(log_record.depth)])
 
-        sf = stack_list[0]
+        return self.__create_line_element(depth_spaces, log_record)
 
-        path, method, line_number = \
-            self.__get_log_path_method_and_line_number_from_sf(sf)
+    def __create_line_element(
+            self, depth_spaces: str, log_record: LogRecord) -> str:
 
-        return \
-            self.__create_line_element(
-                depth_spaces,
-                log_level,
-                path,
-                method,
-                line_number,
-                msg,
-                is_child)
+        log_line_template = self.__get_compiled_log_line_template()
 
-    def __create_line_element(
-            self,
-            depth_spaces: str,
-            log_level: LogLevelEnum,
-            path: str,
-            method: str,
-            line_number: str,
-            msg: str,
-            is_child: bool) -> str:
-
-        log_line = self.log_line_template\
-            .replace(
-                LogElementEnum.DATE.line_format,
-                datetime.now().strftime(self.log_date_format.date_format))\
-            .replace(LogElementEnum.LOG_LEVEL.line_format, log_level.name)\
-            .replace(LogElementEnum.PATH.line_format, path)\
-            .replace(LogElementEnum.METHOD.line_format, method)\
-            .replace(LogElementEnum.LINE_NUMBER.line_format, line_number)\
-            .replace(LogElementEnum.MESSAGE.line_format, msg)
+        log_line = \
+            log_line_template.format_map({
+                log_element.value:
+                    self.__get_line_element_value(log_element, log_record)
+                for log_element in log_line_template.elements
+            })
 
         if '\n' in log_line:
             multiline_operator = self.__get_yaml_multiline_operator(log_line)
@@ -877,20 +1435,59 @@ class LoggerStreamHandlerBase(ABC):
         else:
             line_log = f'{depth_spaces}- log: {log_line}'
 
-        if is_child:
+        if log_record.is_child:
             line_log = f'\n{line_log}'
 
         return line_log
 
-    def __create_yaml_date_element(self, depth_spaces: str) -> str:
+    def __get_compiled_log_line_template(self) -> LogLineTemplate:
+        log_line_template = self.log_line_template
+
+        if self.__compiled_log_line_template is None \
+                or self.__compiled_log_line_template.template \
+                is not log_line_template:
+            self.__compiled_log_line_template = \
+                LogLineTemplate(log_line_template)
+
+        return self.__compiled_log_line_template
+
+    def __get_line_element_value(
+            self, log_element: LogElementEnum, log_record: LogRecord) -> str:
+
+        if log_element == LogElementEnum.DATE:
+            return self.log_date_format.format(log_record.date)
+
+        if log_element == LogElementEnum.LOG_LEVEL:
+            return log_record.log_level.name
+
+        if log_element == LogElementEnum.PATH:
+            return log_record.path
+
+        if log_element == LogElementEnum.METHOD:
+            return log_record.method
+
+        if log_element == LogElementEnum.LINE_NUMBER:
+            return log_record.line_number
+
+        if log_element == LogElementEnum.MESSAGE:
+            return log_record.msg
+
+        if log_element == LogElementEnum.PID:
+            return str(log_record.pid)
+
+        raise NotImplementedCodeException(
+            f'Bug: Line element {log_element} not implemented')
+
+    def __create_yaml_date_element(
+            self, depth_spaces: str, date: datetime) -> str:
         return \
             f'{depth_spaces}{LogElementEnum.DATE.value}:' \
-            f' {datetime.now().strftime(self.log_date_format.date_format)}'
+            f' {self.log_date_format.format(date)}'
 
     def __update_depth_for_manual_increased_child_depth(
-            self, fm_name: str, thread_id: int) -> bool:
+            self, fm_name: str, depth_state: DepthState) -> bool:
 
-        latest_fm_depth = self.__get_latest_fm_depth(fm_name, thread_id)
+        latest_fm_depth = depth_state.get_latest_depth(fm_name)
 
         if latest_fm_depth is None:
             # Scenario:
@@ -903,75 +1500,51 @@ class LoggerStreamHandlerBase(ABC):
         depth_data.manual_depth_change = 1
         depth_data.total_manual_depth = latest_fm_depth.total_manual_depth + 1
 
-        self._depth_dict[thread_id] += 1
+        depth_state.depth += 1
 
-        self._depth_list_dict[thread_id].append(depth_data)
+        depth_state.append_depth(depth_data)
 
         return True
 
     def __update_depth_for_manual_decreased_child_depth(
-            self, fm_name: str, thread_id: int):
-        latest_fm_depth = self.__get_latest_fm_depth(fm_name, thread_id)
+            self, fm_name: str, depth_state: DepthState):
+        latest_fm_depth = depth_state.get_latest_depth(fm_name)
 
-        if self._depth_dict[thread_id] > 0 \
+        if depth_state.depth > 0 \
                 and latest_fm_depth.total_manual_depth > 0:
             depth_data = DepthData(name=fm_name)
             depth_data.manual_depth_change = -1
             depth_data.total_manual_depth = \
                 latest_fm_depth.total_manual_depth - 1
-            self._depth_dict[thread_id] -= 1
+            depth_state.depth -= 1
 
+    @classmethod
     def __update_depth_for_increased_child_depth(
-            self, fm_name: str, thread_id: int):
-        self._depth_list_dict[thread_id].append(DepthData(name=fm_name))
-        self._depth_dict[thread_id] += 1
+            cls, fm_name: str, depth_state: DepthState):
+        depth_state.append_depth(DepthData(name=fm_name))
+        depth_state.depth += 1
 
     def __update_depth_for_change_in_manual_depth(
             self, fm_name: str,
             manual_depth: ManualDepthEnum,
-            thread_id: int):
+            depth_state: DepthState):
         if manual_depth == ManualDepthEnum.INCREASE:
             return \
                 self.__update_depth_for_manual_increased_child_depth(
-                    fm_name, thread_id)
+                    fm_name, depth_state)
 
         if manual_depth == ManualDepthEnum.DECREASE:
             self.__update_depth_for_manual_decreased_child_depth(
-                fm_name, thread_id)
+                fm_name, depth_state)
 
         return False
 
     def __add_debug_to_message(self) -> str:
-        debug_st_str_list, _ = self.__get_stack_list(start_index=1)
+        debug_call_stack = CallStack.build(start_index=0)
         return \
             '\nNRT-Logging DEBUG:\n' \
             f'Start Index: {self._stack_log_start_index}\n' \
-            + '\n'.join(debug_st_str_list)
-
-    def __add_new_thread_id_to_dicts(self, thread_id: int):
-        if self._depth_dict.get(thread_id) is None:
-            self._depth_dict[thread_id] = 0
-            self._depth_list_dict[thread_id] = []
-            self._increase_depth_list_dict[thread_id] = []
-            self._decrease_depth_list_dict[thread_id] = []
-
-    def __clean_threads_dicts(self):
-        if self.__clean_threads_counter > self.__CLEAN_THREADS_COUNT:
-            self.__clean_threads_counter = 0
-            current_thread_id_list = \
-                [thread.ident for thread in threading.enumerate()]
-            logger_thread_id_list = list(self._depth_list_dict)
-
-            dead_threads_list = \
-                set(logger_thread_id_list) - set(current_thread_id_list)
-
-            for thread_id in dead_threads_list:
-                self._depth_dict.pop(thread_id)
-                self._depth_list_dict.pop(thread_id)
-                self._increase_depth_list_dict.pop(thread_id)
-                self._decrease_depth_list_dict.pop(thread_id)
-        elif len(self._depth_list_dict) >= self._CLEAN_THREADS_DICTS:
-            self.__clean_threads_counter += 1
+            + '\n'.join(debug_call_stack.get_fm_name_list())
 
     @classmethod
     def is_utf_8(cls, msg) -> bool:
@@ -981,6 +1554,15 @@ class LoggerStreamHandlerBase(ABC):
         except UnicodeError:
             return True
 
+    @classmethod
+    def write_batches(cls):
+        """
+        Write batched log strings of all stream handlers.
+        """
+
+        for stream_handler in list(cls.__batch_write_stream_handlers):
+            stream_handler.flush()
+
     @classmethod
     def set_log_level(cls, level: LogLevelEnum):
         cls._log_level = level
@@ -1001,40 +1583,25 @@ class LoggerStreamHandlerBase(ABC):
     def set_log_line_template(cls, log_line_template: str):
         cls._log_line_template = log_line_template
 
-    @classmethod
-    def __is_variable(cls, obj_value, attr_name: str) -> bool:
-        is_var =  \
-            not attr_name.startswith('__') \
-            and not attr_name.endswith('__') \
-            and not attr_name.isupper()
-
-        if not is_var:
-            return False
-
-        if isinstance(obj_value, str):
-            return True
-
-        return 'method' not in str(obj_value)
-
     @classmethod
     def __is_increased_child_depth(
             cls,
             parent_fm_name: str,
-            parent_stack_list: list[str]) -> bool:
-        return parent_fm_name in parent_stack_list
+            call_stack: CallStack) -> bool:
+        return call_stack.is_contains(parent_fm_name, start_index=1)
 
     @classmethod
     def __is_child_in_previous_child_depth(
-            cls, expected_parent_fm_name: str, stack_list: list[str]) -> bool:
+            cls, expected_parent_fm_name: str, fm_name: str) -> bool:
         """
         Check if the log is in the same method of previous log.
 
         @param expected_parent_fm_name:
-        @param stack_list:
+        @param fm_name:
         @return:
         """
 
-        return expected_parent_fm_name == stack_list[0]
+        return expected_parent_fm_name == fm_name
 
     @classmethod
     def __create_yaml_log_level_element(
@@ -1059,6 +1626,10 @@ class LoggerStreamHandlerBase(ABC):
             f'{depth_spaces}'\
             f'{LogElementEnum.LINE_NUMBER.value}: {line_number}'
 
+    @classmethod
+    def __create_yaml_pid_element(cls, pid: int, depth_spaces: str) -> str:
+        return f'{depth_spaces}{LogElementEnum.PID.value}: {pid}'
+
     @classmethod
     def __create_yaml_line_message_element(
             cls, msg: str, depth_spaces: str) -> str:
@@ -1080,26 +1651,6 @@ class LoggerStreamHandlerBase(ABC):
 
         return element
 
-    @classmethod
-    def __get_log_path_method_and_line_number_from_sf(cls, frame) -> tuple:
-        method = frame[3]
-
-        slf = frame[0].f_locals.get('self')
-
-        if slf:
-            class_name = slf.__class__.__name__
-            path = f'{ntpath.basename(frame[1])}.{class_name}'
-        else:
-            path = ntpath.basename(frame[1])
-
-        line_number = str(frame[2])
-
-        return path, method, line_number
-
-    @classmethod
-    def __create_fm_name(cls, path: str, method: str) -> str:
-        return f'{path}.{method}'
-
     @classmethod
     def __get_yaml_multiline_operator(cls, yaml_text: str):
         return '|' if yaml_text[-1] == '\n' else '|-'
@@ -1117,68 +1668,84 @@ class ConsoleStreamHandler(LoggerStreamHandlerBase):
     def critical(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.CRITICAL, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
 
     def error(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.ERROR, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
 
     def warn(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.WARN, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
 
     def info(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.INFO, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
 
     def debug(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.DEBUG, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
 
     def trace(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.TRACE, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
 
     def snapshot(
             self,
             methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._snapshot(methods_depth, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._snapshot(methods_depth, manual_depth, call_site)
 
     def close(self):
         """
-        close function not relevant for ConsoleStreamHandler.
+        Write batched log strings. Console stream is not closed.
         """
 
-    def _log(
+        self.flush()
+
+    def _create_log_record(
             self,
             log_level: LogLevelEnum,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
-            is_lock: bool = True):
+            manual_depth: ManualDepthEnum,
+            call_site: CallSite) -> LogRecord:
+
+        if callable(msg):
+            msg = msg()
 
         # Issue with Pycharm that init std.stdout with encoding cp1252
         if self._stream.__getattribute__('encoding') != 'utf-8' \
                 and isinstance(msg, str):
             msg = msg.encode('ascii', 'ignore').decode()
 
-        super()._log(log_level, msg, manual_depth, is_lock)
+        return \
+            super()._create_log_record(
+                log_level, msg, manual_depth, call_site)
 
 
 class FileStreamHandler(LoggerStreamHandlerBase):
     __ARCHIVE_DATE_FORMAT = '%Y_%m_%d_%H_%M_%S_%f'
-    __ZIP_COMPRESSION_LEVEL = 7
+
+    # File stream handlers with persistent stream, flushed at exit
+    __persistent_stream_handlers: weakref.WeakSet = weakref.WeakSet()
 
     __file_path: str
     __file_path_prefix: str
@@ -1188,6 +1755,28 @@ class FileStreamHandler(LoggerStreamHandlerBase):
     __max_file_size: int = DEFAULT_MAX_FILE_SIZE
     __files_amount: int = DEFAULT_FILES_AMOUNT
     __is_zip: bool = False
+    __zip_compression: ZipCompressionEnum = DEFAULT_ZIP_COMPRESSION
+    __zip_compression_level: int = DEFAULT_ZIP_COMPRESSION_LEVEL
+    __archive_executor: ArchiveExecutor = archive_executor
+    # Lock of archive index
+    __archive_lock: Lock
+    # Archive file paths, without zip extension, from oldest to newest.
+    # Built from log file directory on first rotation.
+    __archive_index: Optional[deque[str]]
+    # Archive file paths of archive index, for membership test
+    __archive_index_set: set[str]
+
+    __is_persistent_stream: bool = False
+    __buffer_size: int = DEFAULT_BUFFER_SIZE
+    __flush_policy: FlushPolicyEnum = DEFAULT_FLUSH_POLICY
+    __flush_lines_amount: int = DEFAULT_FLUSH_LINES_AMOUNT
+    __flush_interval: float = DEFAULT_FLUSH_INTERVAL
+
+    __unflushed_lines: int
+    __last_flush_time: float
+
+    # Bytes in log file, seeded from file size on first write
+    __file_size: Optional[int]
 
     def __init__(self, file_path: str):
         super().__init__(
@@ -1197,52 +1786,138 @@ class FileStreamHandler(LoggerStreamHandlerBase):
         self.__file_path = file_path
         self.__file_path_prefix = self.__get_log_file_path_prefix()
         self.__file_extension = self.__get_log_file_extension()
+        self.__unflushed_lines = 0
+        self.__last_flush_time = monotonic()
+        self.__file_size = None
+        self.__archive_lock = Lock()
+        self.__archive_index = None
+        self.__archive_index_set = set()
 
     def critical(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.CRITICAL, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
 
     def error(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.ERROR, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
 
     def warn(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.WARN, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
 
     def info(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.INFO, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
 
     def debug(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.DEBUG, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
 
     def trace(
             self,
             msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._log(LogLevelEnum.TRACE, msg, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
 
     def snapshot(
             self,
             methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE):
-        self._snapshot(methods_depth, manual_depth)
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._snapshot(methods_depth, manual_depth, call_site)
 
     def close(self):
-        if self._stream is not None:
-            self._stream.close()
+        with self._write_lock:
+            self._write_batch()
+            self.__close_persistent_stream()
+
+    def flush(self):
+        """
+        Write batched log strings and flush persistent stream buffer
+        to log file.
+        """
+
+        with self._write_lock:
+            self._write_batch()
+            self.__flush_persistent_stream()
+
+    @property
+    def is_persistent_stream(self) -> bool:
+        return self.__is_persistent_stream
+
+    @is_persistent_stream.setter
+    def is_persistent_stream(self, is_persistent_stream: bool):
+        with self._write_lock:
+            if not is_persistent_stream:
+                self.__close_persistent_stream()
+
+            self.__is_persistent_stream = is_persistent_stream
+
+    @property
+    def buffer_size(self) -> int:
+        return self.__buffer_size
+
+    @buffer_size.setter
+    def buffer_size(self, buffer_size: int):
+        if buffer_size <= 0:
+            raise ValueError('Log file buffer size must be bigger from 0')
+
+        self.__buffer_size = buffer_size
+
+    @property
+    def flush_policy(self) -> FlushPolicyEnum:
+        return self.__flush_policy
+
+    @flush_policy.setter
+    def flush_policy(self, flush_policy: FlushPolicyEnum):
+        self.__flush_policy = flush_policy
+
+    @property
+    def flush_lines_amount(self) -> int:
+        return self.__flush_lines_amount
+
+    @flush_lines_amount.setter
+    def flush_lines_amount(self, flush_lines_amount: int):
+        if flush_lines_amount <= 0:
+            raise ValueError('Flush lines amount must be bigger from 0')
+
+        self.__flush_lines_amount = flush_lines_amount
+
+    @property
+    def flush_interval(self) -> float:
+        """
+        Seconds from last flush, after which the next write is flushed,
+        in case of interval flush policy.
+
+        Flush is done only on write, so logs that are written
+        before idle period stay in buffer until next write,
+        flush, close or exit.
+        """
+
+        return self.__flush_interval
+
+    @flush_interval.setter
+    def flush_interval(self, flush_interval: float):
+        if flush_interval <= 0:
+            raise ValueError('Flush interval must be bigger from 0')
+
+        self.__flush_interval = flush_interval
 
     @property
     def is_limit_file_size(self) -> bool:
@@ -1250,7 +1925,9 @@ class FileStreamHandler(LoggerStreamHandlerBase):
 
     @is_limit_file_size.setter
     def is_limit_file_size(self, is_limit_file_size: bool):
-        self.__is_limit_file_size = is_limit_file_size
+        with self._write_lock:
+            self.__is_limit_file_size = is_limit_file_size
+            self.__file_size = None
 
     @property
     def max_file_size(self) -> int:
@@ -1282,64 +1959,227 @@ class FileStreamHandler(LoggerStreamHandlerBase):
     def is_zip(self, is_zip: bool):
         self.__is_zip = is_zip
 
-    def _log(
-            self,
-            log_level: LogLevelEnum,
-            msg: str,
-            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
-            is_lock: bool = True):
+    @property
+    def zip_compression(self) -> ZipCompressionEnum:
+        return self.__zip_compression
 
-        self.__limit_file_size()
+    @zip_compression.setter
+    def zip_compression(self, zip_compression: ZipCompressionEnum):
+        self.__zip_compression = zip_compression
 
-        try:
-            self._stream = open(self.__file_path, 'a')
-            super()._log(log_level, msg, manual_depth, is_lock)
-        finally:
-            self.close()
+    @property
+    def zip_compression_level(self) -> int:
+        return self.__zip_compression_level
 
-    def __limit_file_size(self):
+    @zip_compression_level.setter
+    def zip_compression_level(self, zip_compression_level: int):
+        if not 0 <= zip_compression_level <= 9:
+            raise ValueError('Zip compression level must be between 0 and 9')
+
+        self.__zip_compression_level = zip_compression_level
+
+    @property
+    def archive_executor(self) -> ArchiveExecutor:
+        return self.__archive_executor
+
+    @archive_executor.setter
+    def archive_executor(self, executor: ArchiveExecutor):
+        self.__archive_executor = executor
+
+    def flush_archives(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until archives, that are submitted to archive executor,
+        are compressed.
+
+        @param timeout: Timeout in seconds. None for no timeout.
+        @return: True if all submitted archives are compressed.
+        """
+
+        return self.archive_executor.flush_archives(timeout)
+
+    def _write(self, log_str: str):
         if self.is_limit_file_size:
-            if not exists(self.__file_path):
-                return
+            self.__limit_file_size()
+
+        if self.is_persistent_stream:
+            self.__write_to_persistent_stream(log_str)
+            encoding = self._stream.encoding
+        else:
+            with open(self.__file_path, 'a') as f:
+                f.write(log_str)
+                encoding = f.encoding
 
-            file_size = getsize(self.__file_path)
+        if self.__file_size is not None:
+            self.__file_size += len(log_str.encode(encoding, 'replace'))
 
-            if file_size >= self.max_file_size:
-                with self._lock:
-                    archive_file_path = self.__archive_log()
+    def __write_to_persistent_stream(self, log_str: str):
+        if self._stream is None:
+            self._stream = \
+                open(self.__file_path, 'a', buffering=self.buffer_size)
+            self.__unflushed_lines = 0
+            self.__last_flush_time = monotonic()
+            self.__persistent_stream_handlers.add(self)
 
-                t = \
-                    Thread(
-                        target=self.__zip_archive_and_limit_file_amount,
-                        args=(archive_file_path,))
-                t.start()
+        self._stream.write(log_str)
+        self.__unflushed_lines += 1
+
+        if self.__is_flush_required():
+            self.__flush_persistent_stream()
+
+    def __is_flush_required(self) -> bool:
+        if self.flush_policy == FlushPolicyEnum.LINE:
+            return True
+
+        if self.flush_policy == FlushPolicyEnum.LINES:
+            return self.__unflushed_lines >= self.flush_lines_amount
+
+        if self.flush_policy == FlushPolicyEnum.INTERVAL:
+            return monotonic() - self.__last_flush_time >= self.flush_interval
+
+        return False
+
+    def __flush_persistent_stream(self):
+        if self._stream is not None:
+            self._stream.flush()
+            self.__unflushed_lines = 0
+            self.__last_flush_time = monotonic()
+
+    def __close_persistent_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self.__persistent_stream_handlers.discard(self)
+
+    def __get_file_size(self) -> int:
+        if self._stream is not None:
+            return self._stream.tell()
+
+        if not exists(self.__file_path):
+            return 0
+
+        return getsize(self.__file_path)
+
+    def __limit_file_size(self):
+        """
+        Archive log file if it reached max file size.
+        Called while stream handler write lock is acquired.
+
+        File size is read from the file only once,
+        and then it is tracked by the written bytes.
+        """
+
+        if self.__file_size is None:
+            self.__file_size = self.__get_file_size()
+
+        if self.__file_size >= self.max_file_size:
+            stats = self._stats
+
+            if stats is None:
+                self.__rotate()
+            else:
+                start_time = perf_counter_ns()
+                self.__rotate()
+                stats.add_rotation(start_time)
+
+    def __rotate(self):
+        self.__close_persistent_stream()
+        self.__file_size = 0
+
+        if not exists(self.__file_path):
+            return
+
+        # Index is built before log file is archived,
+        # so it does not contain archive that is in compression
+        self.__init_archive_index()
+        archive_file_path = self.__archive_log()
+
+        # if files_amount == 0 than log is truncated in __archive_log()
+        if archive_file_path is None:
+            return
 
-    def __zip_archive_and_limit_file_amount(self, archive_file_path: str):
         if self.is_zip:
-            with ZipFile(
-                    f'{archive_file_path}.zip',
-                    mode='w',
-                    compression=ZIP_DEFLATED,
-                    compresslevel=self.__ZIP_COMPRESSION_LEVEL) as z:
-                z.write(
-                    archive_file_path,
-                    arcname=ntpath.basename(archive_file_path))
-            os.remove(archive_file_path)
-
-        self.__limit_files_amount()
-
-    def __limit_files_amount(self):
-        # if files_amount == 0 than truncate log in __archive_log()
-        if self.files_amount > 0:
-            files_list = self.__get_archive_files_list()
-
-            if len(files_list) > self.files_amount:
-                files_list.sort()
-                os.remove(files_list[0])
-
-    def __get_archive_files_list(self):
-        return [file for file in glob(f'{self.__file_path_prefix}*')
-                if self.__is_archive_file(file)]
+            # Archive is added to index when its compression is done,
+            # so files amount limitation does not remove archive
+            # in compression, and leave its zip file after that
+            self.archive_executor.submit(
+                zip_archive,
+                archive_file_path,
+                self.zip_compression.compression,
+                self.zip_compression_level,
+                callback=self.__create_zip_callback(archive_file_path),
+                error_callback=lambda: self.__add_archive_to_index(
+                    archive_file_path))
+        else:
+            self.__add_archive_to_index(archive_file_path)
+
+    def __create_zip_callback(
+            self, archive_file_path: str) -> Callable[[], None]:
+
+        stats = self._stats
+        start_time = perf_counter_ns()
+
+        def callback():
+            if stats is not None:
+                stats.add_phase_time(StatsPhaseEnum.COMPRESSION, start_time)
+
+            self.__add_archive_to_index(archive_file_path)
+
+        return callback
+
+    def __init_archive_index(self):
+        """
+        Build archive index from log file directory, if it is not built.
+        Index is built on first rotation, and not on stream handler
+        creation, so stream handler that is not rotated
+        does not scan log file directory.
+        """
+
+        with self.__archive_lock:
+            if self.__archive_index is None:
+                self.__archive_index = self.__build_archive_index()
+                self.__archive_index_set = set(self.__archive_index)
+
+    def __add_archive_to_index(self, archive_file_path: str):
+        """
+        Add archive to index, and remove oldest archives
+        above files amount.
+        """
+
+        with self.__archive_lock:
+            if archive_file_path not in self.__archive_index_set:
+                self.__archive_index_set.add(archive_file_path)
+
+                # Archive suffix date format is sortable,
+                # so archive is usually the newest
+                if not self.__archive_index \
+                        or archive_file_path > self.__archive_index[-1]:
+                    self.__archive_index.append(archive_file_path)
+                else:
+                    # Compression of archives can be done not in their order
+                    insort(self.__archive_index, archive_file_path)
+
+            while len(self.__archive_index) > self.files_amount:
+                oldest_archive_file_path = self.__archive_index.popleft()
+                self.__archive_index_set.discard(oldest_archive_file_path)
+                self.__remove_archive(oldest_archive_file_path)
+
+    def __build_archive_index(self) -> deque[str]:
+        archive_file_path_set = \
+            {file.removesuffix('.zip')
+             for file in glob(f'{self.__file_path_prefix}*')
+             if self.__is_archive_file(file)}
+
+        # Archive suffix date format is sortable
+        return deque(sorted(archive_file_path_set))
+
+    @classmethod
+    def __remove_archive(cls, archive_file_path: str):
+        # Archive can be in compression or compressed
+        for file_path in (archive_file_path, f'{archive_file_path}.zip'):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
 
     def __archive_log(self) -> Optional[str]:
         if self.files_amount == 0:
@@ -1382,6 +2222,15 @@ class FileStreamHandler(LoggerStreamHandlerBase):
         except ValueError:
             return False
 
+    @classmethod
+    def flush_persistent_streams(cls):
+        """
+        Flush all file stream handlers with persistent stream.
+        """
+
+        for file_stream_handler in list(cls.__persistent_stream_handlers):
+            file_stream_handler.flush()
+
     @classmethod
     def __create_archive_suffix(cls, file_extension: Optional[str]) -> str:
         if file_extension is not None:
@@ -1389,3 +2238,8 @@ class FileStreamHandler(LoggerStreamHandlerBase):
                    f'.{file_extension}'
 
         return f'_{datetime.now().strftime(cls.__ARCHIVE_DATE_FORMAT)}'
+
+
+atexit.register(FileStreamHandler.flush_persistent_streams)
+# Registered last, so batches are written before persistent streams flush
+atexit.register(LoggerStreamHandlerBase.write_batches)
@@ -0,0 +1,300 @@
+import mmap
+import os
+import struct
+import sys
+from os.path import exists, getsize
+from typing import Optional
+
+from nrt_logging.call_stack import CallSite
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger_stream_handlers import \
+    FileSizeEnum, LoggerStreamHandlerBase, ManualDepthEnum
+
+
+DEFAULT_RING_BUFFER_SIZE = 10 * FileSizeEnum.MB.bytes
+
+RING_BUFFER_MAGIC = b'NRTRING1'
+# magic, ring buffer size, total written bytes
+RING_BUFFER_HEADER_FORMAT = '<8sQQ'
+RING_BUFFER_HEADER_SIZE = 64
+_TOTAL_WRITTEN_OFFSET = struct.calcsize('<8sQ')
+
+
+def read_ring_buffer(file_path: str) -> str:
+    """
+    Read ring buffer file as linear log, from oldest log to newest log.
+
+    In case ring buffer was wrapped, the oldest log is overwritten
+    partially, so logs before the first complete root log are dropped.
+
+    @param file_path: Ring buffer file path.
+    @return: Logs in the style they were written.
+    """
+
+    with open(file_path, 'rb') as f:
+        header = f.read(RING_BUFFER_HEADER_SIZE)
+
+        if len(header) < RING_BUFFER_HEADER_SIZE:
+            raise ValueError(f'[{file_path}] is not ring buffer file')
+
+        magic, ring_buffer_size, total_written = \
+            struct.unpack_from(RING_BUFFER_HEADER_FORMAT, header)
+
+        if magic != RING_BUFFER_MAGIC:
+            raise ValueError(f'[{file_path}] is not ring buffer file')
+
+        ring = f.read(ring_buffer_size)
+
+    if total_written <= ring_buffer_size:
+        return ring[:total_written].decode('utf-8', 'replace')
+
+    offset = total_written % ring_buffer_size
+    log_str = \
+        (ring[offset:] + ring[:offset]).decode('utf-8', 'replace')
+
+    return _drop_partial_logs(log_str)
+
+
+def dump_ring_buffer(file_path: str, output_file_path: Optional[str] = None):
+    """
+    Write ring buffer file as linear log.
+
+    @param file_path: Ring buffer file path.
+    @param output_file_path: Output log file path. None for stdout.
+    """
+
+    log_str = read_ring_buffer(file_path)
+
+    if output_file_path is None:
+        sys.stdout.write(log_str)
+    else:
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            f.write(log_str)
+
+
+def _drop_partial_logs(log_str: str) -> str:
+    line_start = 0
+
+    # First line is partial, even if it starts like a root log
+    while True:
+        line_start = log_str.find('\n', line_start) + 1
+
+        if line_start == 0:
+            return ''
+
+        if log_str.startswith(
+                ('- ', LoggerStreamHandlerBase.YAML_DOCUMENT_SEPARATOR),
+                line_start):
+            return log_str[line_start:]
+
+
+class RingBufferStreamHandler(LoggerStreamHandlerBase):
+    """
+    Stream handler that writes logs into a fixed size
+    memory-mapped file, that is used as ring buffer.
+
+    Log write is a copy into mapped memory, so its cost is low
+    and disk usage is bounded by ring buffer size.
+    Mapped pages are owned by the OS, so logs that were written
+    survive process crash.
+
+    Ring buffer file starts with a header with total written bytes.
+    read_ring_buffer and dump_ring_buffer linearize it into regular log.
+    Ring buffer file must be written by a single process.
+    """
+
+    __file_path: str
+    __ring_buffer_size: int
+    __mmap: Optional[mmap.mmap]
+    __total_written: int
+
+    def __init__(
+            self,
+            file_path: str,
+            ring_buffer_size: int = DEFAULT_RING_BUFFER_SIZE):
+        """
+        Constractor.
+
+        @param file_path: Ring buffer file path.
+        @param ring_buffer_size:
+            Ring buffer size in bytes, without header.
+            Existing ring buffer file with other size is reset.
+        """
+
+        super().__init__(
+            stack_log_start_index=5,
+            stack_log_increase_start_index=3,
+            stack_log_decrease_start_index=3)
+
+        if ring_buffer_size <= 0:
+            raise ValueError('Ring buffer size must be bigger from 0')
+
+        self.__file_path = file_path
+        self.__ring_buffer_size = ring_buffer_size
+        self.__mmap = None
+        self.__total_written = 0
+
+    def critical(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.CRITICAL, msg, manual_depth, call_site)
+
+    def error(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.ERROR, msg, manual_depth, call_site)
+
+    def warn(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.WARN, msg, manual_depth, call_site)
+
+    def info(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.INFO, msg, manual_depth, call_site)
+
+    def debug(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.DEBUG, msg, manual_depth, call_site)
+
+    def trace(
+            self,
+            msg: str,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._log(LogLevelEnum.TRACE, msg, manual_depth, call_site)
+
+    def snapshot(
+            self,
+            methods_depth=LoggerStreamHandlerBase.SNAPSHOT_METHODS_DEPTH,
+            manual_depth: ManualDepthEnum = ManualDepthEnum.NO_CHANGE,
+            call_site: Optional[CallSite] = None):
+        self._snapshot(methods_depth, manual_depth, call_site)
+
+    def close(self):
+        with self._write_lock:
+            self._write_batch()
+            self.__close_mmap()
+
+    def flush(self):
+        """
+        Write batched log strings and flush mapped memory to file.
+        """
+
+        with self._write_lock:
+            self._write_batch()
+
+            if self.__mmap is not None:
+                self.__mmap.flush()
+
+    def read(self) -> str:
+        """
+        Read ring buffer as linear log.
+
+        @return: Logs from oldest log to newest log.
+        """
+
+        return read_ring_buffer(self.__file_path)
+
+    @property
+    def file_path(self) -> str:
+        return self.__file_path
+
+    @file_path.setter
+    def file_path(self, file_path: str):
+        with self._write_lock:
+            if file_path != self.__file_path:
+                self._write_batch()
+                self.__close_mmap()
+                self.__file_path = file_path
+
+    @property
+    def ring_buffer_size(self) -> int:
+        return self.__ring_buffer_size
+
+    @property
+    def total_written(self) -> int:
+        return self.__total_written
+
+    def _write(self, log_str: str):
+        if self.__mmap is None:
+            self.__open()
+
+        data = log_str.encode('utf-8')
+
+        # Only the end of log that is bigger from ring buffer is kept
+        if len(data) > self.__ring_buffer_size:
+            data = data[-self.__ring_buffer_size:]
+
+        offset = self.__total_written % self.__ring_buffer_size
+        start = RING_BUFFER_HEADER_SIZE + offset
+        first_part_size = min(len(data), self.__ring_buffer_size - offset)
+
+        self.__mmap[start:start + first_part_size] = data[:first_part_size]
+
+        if first_part_size < len(data):
+            self.__mmap[
+                RING_BUFFER_HEADER_SIZE:
+                RING_BUFFER_HEADER_SIZE + len(data) - first_part_size] = \
+                data[first_part_size:]
+
+        # Header is updated after data, so it never points to unwritten data
+        self.__total_written += len(data)
+        struct.pack_into(
+            '<Q', self.__mmap, _TOTAL_WRITTEN_OFFSET, self.__total_written)
+
+    def __close_mmap(self):
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+
+    def __open(self):
+        file_size = RING_BUFFER_HEADER_SIZE + self.__ring_buffer_size
+        is_reset = \
+            not exists(self.__file_path) \
+            or getsize(self.__file_path) != file_size
+
+        if is_reset:
+            with open(self.__file_path, 'wb') as f:
+                f.truncate(file_size)
+
+        with open(self.__file_path, 'r+b') as f:
+            self.__mmap = mmap.mmap(f.fileno(), file_size)
+
+        magic, ring_buffer_size, total_written = \
+            struct.unpack_from(RING_BUFFER_HEADER_FORMAT, self.__mmap)
+
+        if magic == RING_BUFFER_MAGIC \
+                and ring_buffer_size == self.__ring_buffer_size:
+            # Continue ring buffer of previous process
+            self.__total_written = total_written
+        else:
+            self.__total_written = 0
+            struct.pack_into(
+                RING_BUFFER_HEADER_FORMAT,
+                self.__mmap,
+                0,
+                RING_BUFFER_MAGIC,
+                self.__ring_buffer_size,
+                0)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        sys.exit(
+            f'Usage: python -m nrt_logging.{os.path.basename(__file__)[:-3]}'
+            ' RING_BUFFER_FILE_PATH [OUTPUT_FILE_PATH]')
+
+    dump_ring_buffer(*sys.argv[1:])
@@ -0,0 +1,398 @@
+import reprlib
+from functools import cached_property, lru_cache
+from inspect import getattr_static, isdatadescriptor, ismemberdescriptor, \
+    isroutine
+from itertools import islice
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Optional
+
+
+CLASS_ATTRIBUTES_CACHE_SIZE = 1024
+
+DEFAULT_MAX_VALUE_LENGTH = 1000
+DEFAULT_MAX_STRING_LENGTH = 200
+DEFAULT_MAX_COLLECTION_ITEMS = 20
+DEFAULT_MAX_LEVEL = 3
+# Seconds
+DEFAULT_MAX_VALUE_TIME = 0.05
+DEFAULT_MAX_SNAPSHOT_TIME = 0.5
+
+SNAPSHOT_TIME_EXCEEDED_VALUE = '<skipped: snapshot time exceeded>'
+SLOW_ATTRIBUTE_VALUE = '<skipped: slow attribute>'
+SLOW_TYPE_VALUE = '<skipped: slow type>'
+
+_VARIABLE = 1
+_PROPERTY = 2
+
+
+def _is_variable_name(name: str) -> bool:
+    return \
+        not name.startswith('__') \
+        and not name.endswith('__') \
+        and not name.isupper()
+
+
+@lru_cache(maxsize=CLASS_ATTRIBUTES_CACHE_SIZE)
+def _get_class_attributes(cls: type) -> MappingProxyType:
+    """
+    Get variables and properties of class, without methods.
+    Attributes are resolved statically, so properties are not evaluated.
+
+    @param cls: Class.
+    @return: {attribute name: _VARIABLE or _PROPERTY}.
+    """
+
+    class_attributes = {}
+
+    for name in dir(cls):
+        if not _is_variable_name(name):
+            continue
+
+        try:
+            attr = getattr_static(cls, name)
+        except AttributeError:
+            continue
+
+        if isinstance(attr, (staticmethod, classmethod)) or isroutine(attr):
+            continue
+
+        is_property = \
+            isinstance(attr, (property, cached_property)) \
+            or (isdatadescriptor(attr) and not ismemberdescriptor(attr))
+
+        if is_property:
+            class_attributes[name] = _PROPERTY
+        else:
+            class_attributes[name] = _VARIABLE
+
+    return MappingProxyType(class_attributes)
+
+
+class _SnapshotRepr(reprlib.Repr):
+    """
+    reprlib.Repr that keeps dict and set iteration order,
+    so big collections are not sorted.
+    """
+
+    def repr_dict(self, x, level):
+        if not x:
+            return '{}'
+
+        if level <= 0:
+            return '{' + self.fillvalue + '}'
+
+        pieces = \
+            [f'{self.repr1(key, level - 1)}: {self.repr1(value, level - 1)}'
+             for key, value in islice(x.items(), self.maxdict)]
+
+        if len(x) > self.maxdict:
+            pieces.append(self.fillvalue)
+
+        return '{' + ', '.join(pieces) + '}'
+
+    def repr_set(self, x, level):
+        if not x:
+            return 'set()'
+
+        return self._repr_iterable(x, level, '{', '}', self.maxset)
+
+    def repr_frozenset(self, x, level):
+        if not x:
+            return 'frozenset()'
+
+        return \
+            self._repr_iterable(
+                x, level, 'frozenset({', '})', self.maxfrozenset)
+
+    def is_builtin_type(self, value) -> bool:
+        return hasattr(self, f'repr_{type(value).__name__}')
+
+    def str_instance(self, x) -> str:
+        """
+        str of object, truncated to maxother reprlib style.
+        """
+
+        s = str(x)
+
+        if len(s) > self.maxother:
+            i = max(0, (self.maxother - len(self.fillvalue)) // 2)
+            j = max(0, self.maxother - len(self.fillvalue) - i)
+            s = s[:i] + self.fillvalue + s[len(s) - j:]
+
+        return s
+
+
+class SnapshotRenderer:
+    """
+    Render snapshot variables with size and time budgets.
+
+    Strings, numbers and builtin collections are truncated
+    reprlib style, so only the rendered part is iterated.
+    Other objects are rendered by str, and truncated reprlib style
+    to max value length.
+
+    Class attributes are resolved once per class.
+    Attributes that exceed max value time are skipped in next snapshots,
+    and values that are rendered after max snapshot time are skipped.
+    str of object cannot be interrupted, so types of objects
+    that exceed max value time are skipped in next snapshots,
+    in frame locals and in attributes.
+    """
+
+    __max_value_length: int
+    __max_value_time: float
+    __max_snapshot_time: float
+    __is_skip_properties: bool
+    __repr: _SnapshotRepr
+
+    # (class, attribute name) of attributes that exceeded max value time
+    __slow_attributes: set[tuple[type, str]]
+    # Types of objects that their str exceeded max value time
+    __slow_types: set[type]
+    __slow_lock: Lock
+
+    def __init__(
+            self,
+            max_value_length: int = DEFAULT_MAX_VALUE_LENGTH,
+            max_string_length: int = DEFAULT_MAX_STRING_LENGTH,
+            max_collection_items: int = DEFAULT_MAX_COLLECTION_ITEMS,
+            max_level: int = DEFAULT_MAX_LEVEL,
+            max_value_time: float = DEFAULT_MAX_VALUE_TIME,
+            max_snapshot_time: float = DEFAULT_MAX_SNAPSHOT_TIME,
+            is_skip_properties: bool = False):
+        """
+        Constractor.
+
+        @param max_value_length: Max length of rendered value.
+        @param max_string_length: Max length of string in collection.
+        @param max_collection_items: Max rendered items of collection.
+        @param max_level: Max rendered level of nested collections.
+        @param max_value_time:
+            Max seconds to get and render attribute value,
+            or to render object by str.
+            Slower attributes and object types
+            are skipped in next snapshots.
+        @param max_snapshot_time:
+            Max seconds to render snapshot.
+            Values are skipped after this time.
+        @param is_skip_properties: Skip properties of self.
+        """
+
+        for name, value in (
+                ('Max value length', max_value_length),
+                ('Max string length', max_string_length),
+                ('Max collection items', max_collection_items),
+                ('Max level', max_level),
+                ('Max value time', max_value_time),
+                ('Max snapshot time', max_snapshot_time)):
+
+            if value <= 0:
+                raise ValueError(f'{name} must be bigger from 0')
+
+        self.__max_value_length = max_value_length
+        self.__max_value_time = max_value_time
+        self.__max_snapshot_time = max_snapshot_time
+        self.__is_skip_properties = is_skip_properties
+
+        self.__repr = _SnapshotRepr()
+        self.__repr.maxlevel = max_level
+        self.__repr.maxstring = max_string_length
+        self.__repr.maxlong = max_value_length
+        self.__repr.maxother = max_value_length
+        self.__repr.maxdict = max_collection_items
+        self.__repr.maxlist = max_collection_items
+        self.__repr.maxtuple = max_collection_items
+        self.__repr.maxset = max_collection_items
+        self.__repr.maxfrozenset = max_collection_items
+        self.__repr.maxdeque = max_collection_items
+        self.__repr.maxarray = max_collection_items
+
+        self.__slow_attributes = set()
+        self.__slow_types = set()
+        self.__slow_lock = Lock()
+
+    def create_deadline(self) -> float:
+        """
+        Create deadline of snapshot that is started now.
+
+        @return: time.monotonic deadline.
+        """
+
+        return monotonic() + self.__max_snapshot_time
+
+    def render_value(self, value) -> str:
+        """
+        Render value, truncated to max value length.
+        Exceptions of value __str__ and __repr__ are not raised.
+        Objects of slow types are skipped.
+
+        @param value: Value.
+        @return: Rendered value.
+        """
+
+        try:
+            if isinstance(value, str):
+                value_str = value[:self.__max_value_length + 1]
+            elif self.__repr.is_builtin_type(value):
+                value_str = self.__repr.repr(value)
+            else:
+                value_str = self.__render_object(value)
+        except Exception as e:
+            return f'<{e.__class__.__name__} on render of' \
+                   f' {value.__class__.__name__}>'
+
+        if len(value_str) > self.__max_value_length:
+            value_str = \
+                value_str[:self.__max_value_length] + self.__repr.fillvalue
+
+        return value_str
+
+    def render_f_locals(
+            self,
+            f_locals: dict,
+            deadline: Optional[float] = None) -> list[tuple[str, str]]:
+        """
+        Render frame local variables, without self.
+
+        @param f_locals: Frame locals.
+        @param deadline: Snapshot deadline. None for no deadline.
+        @return: [(variable name, rendered value)].
+        """
+
+        return \
+            [(name, self.__render_in_time(var, deadline))
+             for name, var in f_locals.items()
+             if name != 'self']
+
+    def render_self(
+            self,
+            self_,
+            deadline: Optional[float] = None) -> list[tuple[str, str]]:
+        """
+        Render variables of self, sorted by name.
+        Methods, dunder names and upper case names are skipped.
+
+        @param self_: Object.
+        @param deadline: Snapshot deadline. None for no deadline.
+        @return: [(attribute name, rendered value)].
+        """
+
+        cls = type(self_)
+        class_attributes = _get_class_attributes(cls)
+
+        try:
+            instance_dict = object.__getattribute__(self_, '__dict__')
+        except AttributeError:
+            instance_dict = {}
+
+        attr_names = \
+            set(class_attributes).union(
+                name for name in instance_dict if _is_variable_name(name))
+
+        rendered_list = []
+
+        for attr_name in sorted(attr_names):
+            is_property = class_attributes.get(attr_name) == _PROPERTY
+
+            if is_property and self.__is_skip_properties:
+                continue
+
+            if (cls, attr_name) in self.__slow_attributes:
+                rendered_list.append((attr_name, SLOW_ATTRIBUTE_VALUE))
+            elif deadline is not None and monotonic() > deadline:
+                rendered_list.append(
+                    (attr_name, SNAPSHOT_TIME_EXCEEDED_VALUE))
+            else:
+                attr_str = self.__render_attribute(self_, attr_name)
+
+                if attr_str is not None:
+                    rendered_list.append((attr_name, attr_str))
+
+        return rendered_list
+
+    def clear_cache(self):
+        """
+        Clear class attributes cache, slow attributes and slow types.
+        """
+
+        _get_class_attributes.cache_clear()
+
+        with self.__slow_lock:
+            self.__slow_attributes.clear()
+            self.__slow_types.clear()
+
+    def __render_object(self, value) -> str:
+        """
+        Render object that is not builtin type by str,
+        and mark its type as slow type if it exceeds max value time.
+        """
+
+        value_type = type(value)
+
+        if value_type in self.__slow_types:
+            return SLOW_TYPE_VALUE
+
+        start_time = monotonic()
+        value_str = self.__repr.str_instance(value)
+
+        if monotonic() - start_time > self.__max_value_time:
+            with self.__slow_lock:
+                self.__slow_types.add(value_type)
+
+        return value_str
+
+    def __render_attribute(self, self_, attr_name: str) -> Optional[str]:
+        """
+        Render attribute of self,
+        and mark it as slow attribute if it exceeds max value time.
+
+        @return: Rendered attribute. None if attribute is not a variable.
+        """
+
+        start_time = monotonic()
+
+        try:
+            attr = getattr(self_, attr_name)
+        except AttributeError:
+            # Not assigned slot or instance variable
+            return None
+        except Exception as e:
+            return f'<{e.__class__.__name__} on get attribute>'
+
+        if isroutine(attr):
+            return None
+
+        attr_str = self.render_value(attr)
+
+        if monotonic() - start_time > self.__max_value_time:
+            with self.__slow_lock:
+                self.__slow_attributes.add((type(self_), attr_name))
+
+        return attr_str
+
+    def __render_in_time(self, value, deadline: Optional[float]) -> str:
+        if deadline is not None and monotonic() > deadline:
+            return SNAPSHOT_TIME_EXCEEDED_VALUE
+
+        return self.render_value(value)
+
+    @property
+    def max_value_length(self) -> int:
+        return self.__max_value_length
+
+    @property
+    def max_value_time(self) -> float:
+        return self.__max_value_time
+
+    @property
+    def max_snapshot_time(self) -> float:
+        return self.__max_snapshot_time
+
+    @property
+    def is_skip_properties(self) -> bool:
+        return self.__is_skip_properties
+
+
+snapshot_renderer = SnapshotRenderer()
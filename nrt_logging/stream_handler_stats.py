@@ -0,0 +1,235 @@
+from enum import Enum
+from threading import Lock
+from time import perf_counter_ns
+from typing import Optional
+
+
+class StatsPhaseEnum(Enum):
+    # Call site creation by stream handler.
+    # NrtLogger creates call site once for all its stream handlers.
+    CALL_SITE = 'call_site'
+    # Log record creation, including depth resolution
+    # and the call stack walk that it requires
+    DEPTH = 'depth'
+    FORMAT = 'format'
+    # Wait for write lock, in case it is acquired by other thread
+    LOCK_WAIT = 'lock_wait'
+    WRITE = 'write'
+    ROTATION = 'rotation'
+    # From archive submit until archive is compressed
+    COMPRESSION = 'compression'
+
+
+class NsHistogram:
+    """
+    Histogram of durations in nanoseconds.
+
+    Bucket i counts durations from 2^(i-1) ns to less than 2^i ns.
+    """
+
+    BUCKETS_AMOUNT = 64
+
+    __count: int
+    __total_ns: int
+    __min_ns: Optional[int]
+    __max_ns: int
+    __bucket_list: list[int]
+
+    def __init__(self):
+        self.__count = 0
+        self.__total_ns = 0
+        self.__min_ns = None
+        self.__max_ns = 0
+        self.__bucket_list = [0] * self.BUCKETS_AMOUNT
+
+    def add(self, ns: int):
+        self.__count += 1
+        self.__total_ns += ns
+
+        if self.__min_ns is None or ns < self.__min_ns:
+            self.__min_ns = ns
+
+        if ns > self.__max_ns:
+            self.__max_ns = ns
+
+        self.__bucket_list[min(ns.bit_length(), self.BUCKETS_AMOUNT - 1)] += 1
+
+    def get_percentile_ns(self, percentile: float) -> int:
+        """
+        Get upper bound of the bucket that contains percentile.
+
+        @param percentile: Percentile between 0 and 100.
+        @return: Percentile upper bound in nanoseconds.
+        """
+
+        if not 0 <= percentile <= 100:
+            raise ValueError('Percentile must be between 0 and 100')
+
+        if self.__count == 0:
+            return 0
+
+        min_count = self.__count * percentile / 100
+        count = 0
+
+        for i, bucket_count in enumerate(self.__bucket_list):
+            count += bucket_count
+
+            if bucket_count and count >= min_count:
+                return min(1 << i, self.__max_ns)
+
+        return self.__max_ns
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def total_ns(self) -> int:
+        return self.__total_ns
+
+    @property
+    def min_ns(self) -> int:
+        return 0 if self.__min_ns is None else self.__min_ns
+
+    @property
+    def max_ns(self) -> int:
+        return self.__max_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.__total_ns / self.__count if self.__count else 0.0
+
+    @property
+    def bucket_dict(self) -> dict[int, int]:
+        """
+        Get buckets that are not empty.
+
+        @return: {bucket upper bound in nanoseconds: count}
+        """
+
+        return {
+            1 << i: bucket_count
+            for i, bucket_count in enumerate(self.__bucket_list)
+            if bucket_count
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'min_ns': self.min_ns,
+            'max_ns': self.max_ns,
+            'mean_ns': self.mean_ns,
+            'p50_ns': self.get_percentile_ns(50),
+            'p99_ns': self.get_percentile_ns(99),
+            'buckets': self.bucket_dict
+        }
+
+
+class StreamHandlerStats:
+    """
+    Instrumentation of stream handler hot path.
+
+    Holds nanoseconds histogram of each phase,
+    and counters of records, bytes, lock contentions and rotations.
+    """
+
+    __lock: Lock
+    __histogram_dict: dict[StatsPhaseEnum, NsHistogram]
+    __records: int
+    __bytes_written: int
+    __lock_contentions: int
+    __rotations: int
+
+    def __init__(self):
+        """
+        Constractor.
+        """
+
+        self.__lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.__lock:
+            self.__histogram_dict = \
+                {phase: NsHistogram() for phase in StatsPhaseEnum}
+            self.__records = 0
+            self.__bytes_written = 0
+            self.__lock_contentions = 0
+            self.__rotations = 0
+
+    def add_phase_time(self, phase: StatsPhaseEnum, start_time: int) -> int:
+        """
+        Add phase duration from start time until now.
+
+        @param phase: Phase.
+        @param start_time: Phase start time from perf_counter_ns.
+        @return: Now from perf_counter_ns, so it can be next phase start.
+        """
+
+        now = perf_counter_ns()
+
+        with self.__lock:
+            self.__histogram_dict[phase].add(now - start_time)
+
+        return now
+
+    def add_records(self, records: int, bytes_written: int):
+        with self.__lock:
+            self.__records += records
+            self.__bytes_written += bytes_written
+
+    def add_lock_contention(self, start_time: int):
+        """
+        Add write lock wait of log that found write lock acquired.
+
+        @param start_time: Wait start time from perf_counter_ns.
+        """
+
+        self.add_phase_time(StatsPhaseEnum.LOCK_WAIT, start_time)
+
+        with self.__lock:
+            self.__lock_contentions += 1
+
+    def add_rotation(self, start_time: int):
+        self.add_phase_time(StatsPhaseEnum.ROTATION, start_time)
+
+        with self.__lock:
+            self.__rotations += 1
+
+    def get_histogram(self, phase: StatsPhaseEnum) -> NsHistogram:
+        return self.__histogram_dict[phase]
+
+    @property
+    def records(self) -> int:
+        return self.__records
+
+    @property
+    def bytes_written(self) -> int:
+        """
+        Bytes of log strings that are written to stream,
+        or added to batch in case of batch write.
+        """
+
+        return self.__bytes_written
+
+    @property
+    def lock_contentions(self) -> int:
+        return self.__lock_contentions
+
+    @property
+    def rotations(self) -> int:
+        return self.__rotations
+
+    def to_dict(self) -> dict:
+        with self.__lock:
+            return {
+                'records': self.__records,
+                'bytes_written': self.__bytes_written,
+                'lock_contentions': self.__lock_contentions,
+                'rotations': self.__rotations,
+                'phases': {
+                    phase.value: histogram.to_dict()
+                    for phase, histogram in self.__histogram_dict.items()
+                }
+            }
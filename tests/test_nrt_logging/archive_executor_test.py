@@ -0,0 +1,120 @@
+import os
+import unittest
+from threading import Event, Thread
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from parameterized import parameterized
+
+from nrt_logging.archive_executor import ArchiveExecutor, zip_archive
+from tests.test_nrt_logging.test_base import TestBase
+
+
+def raise_exception():
+    raise ValueError('Archive failed')
+
+
+class ArchiveExecutorTests(TestBase):
+    FILE_PATH = os.path.join(TestBase.TEMP_PATH, 'log_test.log')
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    def test_zip_archive(self):
+        with open(self.FILE_PATH, 'w') as f:
+            f.write(self.MSG_1000_BYTES)
+
+        zip_archive(self.FILE_PATH, ZIP_DEFLATED, 9)
+
+        self.assertFalse(os.path.exists(self.FILE_PATH))
+
+        with ZipFile(f'{self.FILE_PATH}.zip') as z:
+            self.assertEqual(['log_test.log'], z.namelist())
+            self.assertEqual(
+                self.MSG_1000_BYTES,
+                z.read('log_test.log').decode('utf-8'))
+
+    def test_submit_and_flush_archives(self):
+        executor = ArchiveExecutor(max_workers=2)
+        callback_list = []
+
+        for i in range(5):
+            executor.submit(
+                lambda: None,
+                callback=lambda i=i: callback_list.append(i))
+
+        self.assertTrue(executor.flush_archives(timeout=5))
+        executor.shutdown()
+
+        self.assertEqual([0, 1, 2, 3, 4], sorted(callback_list))
+        self.assertEqual(0, executor.pending_archives)
+        self.assertEqual(5, executor.completed_archives)
+        self.assertEqual(0, executor.failed_archives)
+
+    def test_submit_blocked_when_queue_is_full(self):
+        executor = ArchiveExecutor(max_workers=1, max_pending_archives=2)
+        release_event = Event()
+
+        executor.submit(release_event.wait)
+        executor.submit(release_event.wait)
+
+        t = Thread(target=executor.submit, args=(release_event.wait,))
+        t.start()
+        t.join(0.2)
+
+        self.assertTrue(t.is_alive())
+        self.assertEqual(2, executor.pending_archives)
+        self.assertEqual(1, executor.blocked_submits)
+        self.assertFalse(executor.flush_archives(timeout=0.1))
+
+        release_event.set()
+        t.join()
+
+        self.assertTrue(executor.flush_archives(timeout=5))
+        executor.shutdown()
+
+        self.assertEqual(3, executor.completed_archives)
+        self.assertEqual(2, executor.max_pending_archives_reached)
+
+    def test_failed_archive(self):
+        executor = ArchiveExecutor()
+        callback_list = []
+
+        executor.submit(
+            raise_exception,
+            callback=lambda: callback_list.append(1),
+            error_callback=lambda: callback_list.append(2))
+
+        self.assertTrue(executor.flush_archives(timeout=5))
+        executor.shutdown()
+
+        self.assertEqual([2], callback_list)
+        self.assertEqual(1, executor.failed_archives)
+        self.assertEqual(0, executor.completed_archives)
+
+    def test_submit_to_process_pool(self):
+        with open(self.FILE_PATH, 'w') as f:
+            f.write(self.MSG_100_BYTES)
+
+        executor = ArchiveExecutor(max_workers=1, is_process_pool=True)
+        executor.submit(zip_archive, self.FILE_PATH, ZIP_DEFLATED, 7)
+
+        self.assertTrue(executor.flush_archives(timeout=30))
+        executor.shutdown()
+
+        self.assertEqual(1, executor.completed_archives)
+        self.assertTrue(os.path.exists(f'{self.FILE_PATH}.zip'))
+
+    @parameterized.expand([
+        [{'max_workers': 0}],
+        [{'max_pending_archives': 0}]
+    ])
+    def test_invalid_params_negative(self, params: dict):
+        with self.assertRaises(ValueError):
+            ArchiveExecutor(**params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+import os
+import time
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from threading import Event, Thread
+
+from parameterized import parameterized
+
+from nrt_logging.async_stream_handler import \
+    AsyncStreamHandler, OverflowPolicyEnum
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, FileStreamHandler, LogStyleEnum, ManualDepthEnum
+from tests.test_nrt_logging.test_base import NAME_1, TestBase
+
+
+class BlockingStreamHandler(ConsoleStreamHandler):
+    """
+    Stream handler that keeps log strings in memory,
+    and blocks the first write until it is released.
+    """
+
+    write_started_event: Event
+    release_event: Event
+    log_str_list: list[str]
+
+    def __init__(self):
+        super().__init__()
+        self.style = LogStyleEnum.LINE
+        self.log_line_template = '$message$'
+        self.write_started_event = Event()
+        self.release_event = Event()
+        self.log_str_list = []
+
+    def _write(self, log_str: str):
+        self.write_started_event.set()
+        self.release_event.wait()
+        self.log_str_list.append(log_str)
+
+    def close(self):
+        pass
+
+    @property
+    def msg_list(self) -> list[str]:
+        return \
+            [line.removeprefix('- log: ')
+             for line in ''.join(self.log_str_list).splitlines()]
+
+
+class FailingStreamHandler(BlockingStreamHandler):
+    """
+    Stream handler that fails in the first write.
+    """
+
+    __is_failed: bool = False
+
+    def _write(self, log_str: str):
+        if not self.__is_failed:
+            self.__is_failed = True
+            raise OSError('Write failed')
+
+        super()._write(log_str)
+
+
+class OverflowPolicyEnumTests(TestBase):
+
+    def test_build(self):
+        self.assertEqual(
+            OverflowPolicyEnum.DROP_OLDEST,
+            OverflowPolicyEnum.build('Drop_Oldest'))
+
+    def test_build_not_exist_negative(self):
+        with self.assertRaises(ValueError):
+            OverflowPolicyEnum.build('not exist')
+
+
+class AsyncStreamHandlerTests(TestBase):
+    FILE_PATH_1 = os.path.join(TestBase.TEMP_PATH, 'log_test_1.txt')
+    FILE_PATH_2 = os.path.join(TestBase.TEMP_PATH, 'log_test_2.txt')
+    CONFIG_FILE_PATH = \
+        os.path.join('baseline', 'config_files', 'logging_config_async.yaml')
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    @parameterized.expand([
+        [LogStyleEnum.YAML],
+        [LogStyleEnum.LINE]
+    ])
+    def test_write_same_as_sync_stream_handler(self, log_style: LogStyleEnum):
+        sh_1 = FileStreamHandler(self.FILE_PATH_1)
+        sh_1.style = log_style
+        sh_2 = FileStreamHandler(self.FILE_PATH_2)
+        sh_2.style = log_style
+        async_sh = AsyncStreamHandler(sh_2, batch_size=3)
+        logger = logger_manager.get_logger(NAME_1)
+        logger.log_level = LogLevelEnum.TRACE
+        sh_1.log_level = LogLevelEnum.TRACE
+        async_sh.log_level = LogLevelEnum.TRACE
+        logger.add_stream_handler(sh_1)
+        logger.add_stream_handler(async_sh)
+
+        self.__a1(logger)
+        logger.info('c', ManualDepthEnum.INCREASE)
+        logger.increase_depth()
+        logger.snapshot()
+        logger.decrease_depth()
+        logger.info('d')
+
+        logger_manager.close_logger(NAME_1)
+
+        with open(self.FILE_PATH_1) as f_1, open(self.FILE_PATH_2) as f_2:
+            log_1 = f_1.read()
+            self.assertTrue(log_1)
+            self.assertEqual(log_1, f_2.read())
+
+    def test_write_without_logger(self):
+        sh = BlockingStreamHandler()
+        sh.release_event.set()
+        sh.log_line_template = '$path$.$method$ $message$'
+        async_sh = AsyncStreamHandler(sh)
+
+        async_sh.info('a')
+        async_sh.close()
+
+        self.assertEqual(
+            ['async_stream_handler_test.py.AsyncStreamHandlerTests'
+             '.test_write_without_logger a'],
+            sh.msg_list)
+
+    def test_write_below_log_level(self):
+        sh = BlockingStreamHandler()
+        sh.release_event.set()
+        async_sh = AsyncStreamHandler(sh)
+        async_sh.log_level = LogLevelEnum.ERROR
+
+        async_sh.warn('a')
+        async_sh.error('b')
+        async_sh.close()
+
+        self.assertEqual(['b'], sh.msg_list)
+        self.assertEqual(LogLevelEnum.ERROR, sh.log_level)
+
+    @parameterized.expand([
+        [OverflowPolicyEnum.DROP_NEWEST, ['a', 'b', 'c']],
+        [OverflowPolicyEnum.DROP_OLDEST, ['a', 'e', 'f']],
+        [OverflowPolicyEnum.SAMPLE, ['a', 'c', 'e']]
+    ])
+    def test_overflow_policy(
+            self,
+            overflow_policy: OverflowPolicyEnum,
+            expected_msg_list: list[str]):
+
+        sh = BlockingStreamHandler()
+        async_sh = \
+            AsyncStreamHandler(
+                sh,
+                queue_size=2,
+                overflow_policy=overflow_policy,
+                sample_rate=2)
+
+        async_sh.info('a')
+        self.assertTrue(sh.write_started_event.wait(5))
+
+        for msg in ['b', 'c', 'd', 'e', 'f']:
+            async_sh.info(msg)
+
+        self.assertEqual(3, async_sh.dropped_records_amount)
+
+        sh.release_event.set()
+        async_sh.close()
+
+        self.assertEqual(expected_msg_list, sh.msg_list)
+
+    def test_write_after_close(self):
+        sh = BlockingStreamHandler()
+        sh.release_event.set()
+        async_sh = AsyncStreamHandler(sh)
+        async_sh.info('a')
+        async_sh.close()
+        async_sh.info('b')
+        async_sh.close()
+
+        self.assertEqual(['a'], sh.msg_list)
+
+    def test_write_after_failed_write(self):
+        sh = FailingStreamHandler()
+        sh.release_event.set()
+        async_sh = AsyncStreamHandler(sh, queue_size=1)
+        stderr = StringIO()
+
+        with redirect_stderr(stderr):
+            async_sh.info('a')
+            async_sh.flush()
+
+        for msg in ['b', 'c', 'd']:
+            async_sh.info(msg)
+
+        async_sh.close()
+
+        self.assertIn('OSError: Write failed', stderr.getvalue())
+        self.assertEqual(['b', 'c', 'd'], sh.msg_list)
+
+    def test_close_while_put_is_blocked(self):
+        sh = BlockingStreamHandler()
+        async_sh = AsyncStreamHandler(sh, queue_size=1)
+
+        async_sh.info('a')
+        self.assertTrue(sh.write_started_event.wait(5))
+        async_sh.info('b')
+
+        # Queue is full, so put of 'c' is blocked until writer is released
+        put_thread = Thread(target=lambda: async_sh.info('c'))
+        put_thread.start()
+        time.sleep(0.1)
+        close_thread = Thread(target=async_sh.close)
+        close_thread.start()
+        time.sleep(0.1)
+        sh.release_event.set()
+
+        put_thread.join(5)
+        close_thread.join(5)
+
+        self.assertFalse(close_thread.is_alive())
+        self.assertEqual(['a', 'b', 'c'], sh.msg_list)
+
+    @parameterized.expand([
+        [{'queue_size': 0}],
+        [{'batch_size': 0}],
+        [{'sample_rate': -1}]
+    ])
+    def test_invalid_params_negative(self, params: dict):
+        with self.assertRaises(ValueError):
+            AsyncStreamHandler(BlockingStreamHandler(), **params)
+
+    def test_config_with_async_stream_handler(self):
+        logger_manager.set_config(file_path=self.CONFIG_FILE_PATH)
+        logger = logger_manager.get_logger('TEST1')
+
+        sh_1, sh_2 = logger.stream_handler_list
+
+        self.assertIsInstance(sh_1, AsyncStreamHandler)
+        self.assertIsInstance(sh_1.stream_handler, FileStreamHandler)
+        self.assertEqual(
+            OverflowPolicyEnum.DROP_NEWEST, sh_1.overflow_policy)
+        self.assertIsInstance(sh_2, FileStreamHandler)
+
+        logger.info('a')
+        logger.info('b')
+        logger_manager.close_logger('TEST1')
+
+        with open(self.FILE_PATH_1) as f_1, open(self.FILE_PATH_2) as f_2:
+            self.assertEqual('- log: a\n- log: b\n', f_1.read())
+            self.assertEqual('- log: a\n- log: b\n', f_2.read())
+
+    @classmethod
+    def __a1(cls, logger):
+        logger.info('a')
+        cls.__a2(logger)
+
+    @classmethod
+    def __a2(cls, logger):
+        logger.warn('b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+import asyncio
+import contextvars
+import gc
+import threading
+import unittest
+import weakref
+from typing import Optional
+
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, LogStyleEnum, ManualDepthEnum
+from tests.test_nrt_logging.test_base import \
+    TestBase, NAME_1, stdout_redirect, r_stdout
+
+
+STREAM_HANDLERS_AMOUNT = 200
+
+
+class ThreadNameConsoleStreamHandler(ConsoleStreamHandler):
+    write_thread_name_list: list[str]
+
+    def __init__(self):
+        super().__init__()
+        self.write_thread_name_list = []
+
+    def _write(self, log_str: str):
+        self.write_thread_name_list.append(threading.current_thread().name)
+        super()._write(log_str)
+
+
+class AsyncioDepthTests(TestBase):
+    __logger: NrtLogger
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+
+    def tearDown(self):
+        logger_manager.close_all_loggers()
+
+    @stdout_redirect
+    def test_depth_per_task(self):
+        self.__create_logger_and_sh()
+
+        async def run_tasks():
+            await asyncio.gather(self.__parent('a'), self.__parent('b'))
+
+        asyncio.run(run_tasks())
+
+        expected_log = \
+            '- log: a parent\n' \
+            '- log: b parent\n' \
+            '  children:\n' \
+            '    - log: a child\n' \
+            '  children:\n' \
+            '    - log: b child\n' \
+            '    - log: a child 2\n' \
+            '    - log: b child 2\n' \
+            '- log: a parent 2\n' \
+            '- log: b parent 2\n'
+
+        self.assertEqual(expected_log, r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_task_and_thread_inherit_depth(self):
+        self.__create_logger_and_sh()
+
+        async def child_task():
+            self.__logger.info('task child')
+
+        def child_thread():
+            self.__logger.info('thread child')
+            self.__logger.info('thread child 2')
+
+        async def parent():
+            self.__logger.info('parent')
+            await asyncio.to_thread(child_thread)
+            await asyncio.create_task(child_task())
+            self.__logger.info('parent 2')
+
+        asyncio.run(parent())
+
+        expected_log = \
+            '- log: parent\n' \
+            '  children:\n' \
+            '    - log: thread child\n' \
+            '    - log: thread child 2\n' \
+            '  children:\n' \
+            '    - log: task child\n' \
+            '- log: parent 2\n'
+
+        self.assertEqual(expected_log, r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_copy_context_run_shares_depth(self):
+        self.__create_logger_and_sh()
+
+        self.__logger.info('parent')
+        # Depth increase in copied context run is also depth increase
+        # of the code that runs it
+        contextvars.copy_context().run(self.__logger.increase_depth)
+        contextvars.copy_context().run(self.__logger.info, 'context child')
+        self.__logger.info('child')
+
+        expected_log = \
+            '- log: parent\n' \
+            '  children:\n' \
+            '    - log: context child\n' \
+            '    - log: child\n'
+
+        self.assertEqual(expected_log, r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_discarded_stream_handler_depth_state(self):
+        context_vars_amount = len(contextvars.copy_context())
+        depth_states_amount = self.__get_context_depth_states_amount()
+        sh_ref_list = []
+
+        for _ in range(STREAM_HANDLERS_AMOUNT):
+            sh = ConsoleStreamHandler()
+            sh.info('log')
+            sh_ref_list.append(weakref.ref(sh))
+
+        del sh
+        gc.collect()
+
+        self.assertTrue(all(sh_ref() is None for sh_ref in sh_ref_list))
+        # Depth states of all stream handlers are in a single context var
+        self.assertLessEqual(
+            len(contextvars.copy_context()), context_vars_amount + 1)
+        self.assertLessEqual(
+            self.__get_context_depth_states_amount(), depth_states_amount)
+
+    async def __parent(self, name: str):
+        self.__logger.info(f'{name} parent')
+        await asyncio.sleep(0)
+        await self.__child(name)
+        await asyncio.sleep(0)
+        self.__logger.info(f'{name} parent 2')
+
+    async def __child(self, name: str):
+        self.__logger.info(f'{name} child')
+        await asyncio.sleep(0)
+        self.__logger.info(f'{name} child 2')
+
+    @classmethod
+    def __get_context_depth_states_amount(cls) -> int:
+        return \
+            sum(len(value) for value in contextvars.copy_context().values()
+                if isinstance(value, weakref.WeakKeyDictionary))
+
+    def __create_logger_and_sh(self):
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_level = LogLevelEnum.TRACE
+        sh.log_line_template = '$message$'
+        self.__logger = logger_manager.get_logger(NAME_1)
+        self.__logger.add_stream_handler(sh)
+
+
+class AsyncLoggerTests(TestBase):
+    __logger: NrtLogger
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+
+    def tearDown(self):
+        logger_manager.close_all_loggers()
+
+    @stdout_redirect
+    def test_async_log_same_as_sync_log(self):
+        self.__create_logger_and_sh()
+        self.__sync_parent()
+        sync_log = r_stdout.getvalue()
+        r_stdout.seek(0)
+        r_stdout.truncate()
+
+        logger_manager.close_all_loggers()
+        self.__create_logger_and_sh()
+        asyncio.run(self.__async_parent())
+
+        self.assertEqual(sync_log, r_stdout.getvalue())
+        self.assertIn('warn message', sync_log)
+
+    @stdout_redirect
+    def test_async_log_written_by_writer_thread(self):
+        sh = self.__create_logger_and_sh(ThreadNameConsoleStreamHandler())
+
+        asyncio.run(self.__logger.aerror('error message'))
+
+        self.assertEqual(1, len(sh.write_thread_name_list))
+        self.assertTrue(
+            sh.write_thread_name_list[0].startswith('nrt_logging_writer'))
+        self.assertEqual('- log: error message\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_async_snapshot(self):
+        self.__create_logger_and_sh()
+
+        async def snapshot():
+            snapshot_var = 'snapshot_value'
+            self.assertIsNotNone(snapshot_var)
+            await self.__logger.asnapshot()
+
+        asyncio.run(snapshot())
+
+        self.assertIn('snapshot_var: snapshot_value', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_async_log_lower_level(self):
+        sh = self.__create_logger_and_sh(ThreadNameConsoleStreamHandler())
+        sh.log_level = LogLevelEnum.ERROR
+
+        asyncio.run(self.__logger.ainfo('info message'))
+
+        self.assertEqual([], sh.write_thread_name_list)
+        self.assertEqual('', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_log_async_without_event_loop_negative(self):
+        sh = self.__create_logger_and_sh()
+
+        with self.assertRaises(RuntimeError):
+            sh.log_async(LogLevelEnum.INFO, 'info message')
+
+    def __sync_parent(self):
+        self.__logger.info('parent')
+        self.__sync_child()
+        self.__logger.increase_depth()
+        self.__logger.warn('warn message')
+        self.__logger.critical('critical message', ManualDepthEnum.DECREASE)
+        self.__logger.trace('trace message')
+
+    def __sync_child(self):
+        self.__logger.debug('child')
+        self.__logger.trace('child trace')
+
+    async def __async_parent(self):
+        await self.__logger.ainfo('parent')
+        await self.__async_child()
+        self.__logger.increase_depth()
+        await self.__logger.awarn('warn message')
+        await self.__logger.acritical(
+            'critical message', ManualDepthEnum.DECREASE)
+        await self.__logger.atrace('trace message')
+
+    async def __async_child(self):
+        await self.__logger.adebug('child')
+        await self.__logger.atrace('child trace')
+
+    def __create_logger_and_sh(
+            self, sh: Optional[ConsoleStreamHandler] = None):
+
+        if sh is None:
+            sh = ConsoleStreamHandler()
+
+        sh.style = LogStyleEnum.LINE
+        sh.log_level = LogLevelEnum.TRACE
+        sh.log_line_template = '$message$'
+        self.__logger = logger_manager.get_logger(NAME_1)
+        self.__logger.add_stream_handler(sh)
+        return sh
+
+
+if __name__ == '__main__':
+    unittest.main()
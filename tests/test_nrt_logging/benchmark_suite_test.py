@@ -0,0 +1,94 @@
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from parameterized import parameterized
+
+from benchmarks.benchmark_suite import \
+    BenchmarkResult, compare_results, main, run_benchmarks, save_results
+from tests.test_nrt_logging.test_base import TestBase
+
+
+class BenchmarkSuiteTests(TestBase):
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    @parameterized.expand([
+        ['style'],
+        ['rotation_zip'],
+        ['disabled_level']
+    ])
+    def test_run_benchmarks(self, name_filter: str):
+        result_list = run_benchmarks(name_filter, lines_amount=20, repeat=1)
+
+        self.assertGreater(len(result_list), 0)
+
+        for result in result_list:
+            self.assertIsInstance(result, BenchmarkResult)
+            self.assertGreater(result.ops, 0)
+            self.assertGreater(result.lines_per_sec, 0)
+
+    def test_compare_results(self):
+        baseline_dict = self.__create_results_dict(
+            {'a': 1000, 'b': 1000, 'c': 1000})
+        results_dict = self.__create_results_dict(
+            {'a': 850, 'b': 700, 'd': 10})
+
+        regression_list = compare_results(baseline_dict, results_dict, 0.2)
+
+        self.assertEqual(['b'], [r.name for r in regression_list])
+        self.assertAlmostEqual(-0.3, regression_list[0].change)
+
+    def test_compare_results_invalid_threshold_negative(self):
+        with self.assertRaises(ValueError):
+            compare_results({'results': {}}, {'results': {}}, 1)
+
+    def test_main_compare(self):
+        baseline_path = os.path.join(self.TEMP_PATH, 'baseline.json')
+
+        self.assertEqual(0, self.__run_main('--save-baseline'))
+        self.assertTrue(os.path.exists(baseline_path))
+        self.assertEqual(
+            0, self.__run_main('--compare', '--threshold', '0.99'))
+
+    def test_main_compare_without_baseline_negative(self):
+        self.assertEqual(1, self.__run_main('--compare'))
+
+    def test_main_compare_without_common_benchmarks_negative(self):
+        save_results(
+            self.__create_results_dict({'not_exist': 1000}),
+            os.path.join(self.TEMP_PATH, 'baseline.json'))
+
+        self.assertEqual(1, self.__run_main('--compare'))
+
+    def test_main_compare_and_save_baseline_negative(self):
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            self.__run_main('--compare', '--save-baseline')
+
+    def __run_main(self, *args: str) -> int:
+        with redirect_stdout(StringIO()):
+            return main([
+                '-k', 'disabled_level',
+                '--lines', '10',
+                '--repeat', '1',
+                '--output', os.path.join(self.TEMP_PATH, 'latest.json'),
+                '--baseline', os.path.join(self.TEMP_PATH, 'baseline.json'),
+                *args])
+
+    @classmethod
+    def __create_results_dict(cls, lines_per_sec_dict: dict) -> dict:
+        return {
+            'results': {
+                name: {'lines_per_sec': lines_per_sec}
+                for name, lines_per_sec in lines_per_sec_dict.items()
+            }
+        }
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import sys
+import threading
+import unittest
+
+from nrt_logging.call_stack import \
+    CallStack, CallSite, get_thread_key, is_thread_key_alive
+from tests.test_nrt_logging.test_base import TestBase
+
+
+TEST_FILE_NAME = 'call_stack_test.py'
+
+
+def build_call_stack_in_function() -> CallStack:
+    return CallStack.build(start_index=0)
+
+
+class CallStackTests(TestBase):
+
+    def test_get_fm_name(self):
+        call_stack = CallStack.build(start_index=0)
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}.test_get_fm_name',
+            call_stack.get_fm_name(0))
+
+    def test_get_fm_name_in_function(self):
+        call_stack = build_call_stack_in_function()
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.build_call_stack_in_function',
+            call_stack.get_fm_name(0))
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}'
+            '.test_get_fm_name_in_function',
+            call_stack.get_fm_name(1))
+
+    def test_get_path_method_and_line_number(self):
+        path, method, line_number = CallStack.build(0).get_path_method_and_line_number(0)  # noqa: E501
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}', path)
+        self.assertEqual('test_get_path_method_and_line_number', method)
+        self.assertEqual('38', line_number)
+
+    def test_is_contains(self):
+        call_stack = build_call_stack_in_function()
+        fm_name = \
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}.test_is_contains'
+
+        self.assertIn(fm_name, call_stack)
+        self.assertTrue(call_stack.is_contains(fm_name, start_index=1))
+        self.assertFalse(call_stack.is_contains(fm_name, start_index=2))
+        self.assertNotIn('not_exist.py.method', call_stack)
+
+    def test_len_and_get_fm_name_list(self):
+        call_stack = CallStack.build(start_index=0)
+        expected_len = 0
+        frame = sys._getframe(0)
+
+        while frame is not None:
+            expected_len += 1
+            frame = frame.f_back
+
+        self.assertEqual(expected_len, len(call_stack))
+        self.assertEqual(expected_len, len(call_stack.get_fm_name_list()))
+
+    def test_get_frame_out_of_range_negative(self):
+        call_stack = CallStack(None)
+
+        self.assertEqual(0, len(call_stack))
+
+        with self.assertRaises(IndexError):
+            call_stack.get_frame(0)
+
+        with self.assertRaises(IndexError):
+            call_stack.get_fm_name(0)
+
+    def test_build_start_index_out_of_range(self):
+        call_stack = CallStack.build(start_index=10 ** 6)
+
+        self.assertEqual(0, len(call_stack))
+
+    def test_fm_name_is_shared_between_calls(self):
+        fm_name_1 = build_call_stack_in_function().get_fm_name(0)
+        fm_name_2 = build_call_stack_in_function().get_fm_name(0)
+
+        self.assertIs(fm_name_1, fm_name_2)
+
+    def test_fm_name_by_receiver_class(self):
+        parent_call_stack = CallStackParent().build_call_stack()
+        child_call_stack = CallStackChild().build_call_stack()
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.CallStackParent.build_call_stack',
+            parent_call_stack.get_fm_name(0))
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.CallStackChild.build_call_stack',
+            child_call_stack.get_fm_name(0))
+
+    def test_fm_name_in_closure_with_self(self):
+        def build_call_stack_in_closure():
+            self.assertIsNotNone(self)
+            return CallStack.build(start_index=0)
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}'
+            '.build_call_stack_in_closure',
+            build_call_stack_in_closure().get_fm_name(0))
+
+    def test_clear_frame_identity_cache(self):
+        fm_name = build_call_stack_in_function().get_fm_name(0)
+
+        CallStack.clear_frame_identity_cache()
+
+        self.assertEqual(
+            fm_name, build_call_stack_in_function().get_fm_name(0))
+
+    def test_is_contains_after_walk(self):
+        call_stack = build_call_stack_in_function()
+        fm_name = \
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}' \
+            '.test_is_contains_after_walk'
+
+        self.assertNotIn('not_exist.py.method', call_stack)
+        self.assertTrue(call_stack.is_contains(fm_name, start_index=1))
+        self.assertFalse(call_stack.is_contains(fm_name, start_index=2))
+        self.assertFalse(
+            call_stack.is_contains(
+                f'{TEST_FILE_NAME}.build_call_stack_in_function',
+                start_index=1))
+
+
+class CallStackParent:
+
+    def build_call_stack(self) -> CallStack:
+        return CallStack.build(start_index=0)
+
+
+class CallStackChild(CallStackParent):
+    pass
+
+
+class CallSiteTests(TestBase):
+
+    def test_build(self):
+        call_site = CallSite.build(start_index=0)
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}', call_site.path)
+        self.assertEqual('test_build', call_site.method)
+        self.assertEqual('146', call_site.line_number)
+        self.assertEqual(
+            f'{call_site.path}.{call_site.method}', call_site.fm_name)
+        self.assertEqual(get_thread_key(), call_site.thread_key)
+        self.assertEqual(
+            call_site.fm_name, call_site.call_stack.get_fm_name(0))
+
+    def test_immutable_negative(self):
+        call_site = CallSite.build(start_index=0)
+
+        with self.assertRaises(AttributeError):
+            call_site.line_number = '1'
+
+    def test_thread_key(self):
+        thread_key_list = []
+
+        for _ in range(3):
+            thread = \
+                threading.Thread(
+                    target=lambda: thread_key_list.append(get_thread_key()))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(get_thread_key(), get_thread_key())
+        self.assertTrue(is_thread_key_alive(get_thread_key()))
+        # Thread keys are not reused, like idents of ended threads
+        self.assertEqual(3, len(set(thread_key_list)))
+        self.assertNotIn(get_thread_key(), thread_key_list)
+
+        for thread_key in thread_key_list:
+            self.assertFalse(is_thread_key_alive(thread_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+from threading import Thread
+
+from parameterized import parameterized
+
+from nrt_logging.call_tracker import \
+    CallTrackerBackendEnum, CallTrackerOverheadReport, call_tracker
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, LogStyleEnum
+from tests.test_nrt_logging.test_base import \
+    TestBase, stdout_redirect, r_stdout
+
+
+TEST_FILE_NAME = 'call_tracker_test.py'
+
+EXPECTED_HIERARCHY = \
+    '- log: parent\n' \
+    '  children:\n' \
+    '    - log: child\n' \
+    '      children:\n' \
+    '        - log: leaf\n' \
+    '- log: parent 2\n'
+
+AVAILABLE_BACKENDS = \
+    [[backend] for backend in CallTrackerBackendEnum if backend.is_available]
+
+
+def log_parent(logger: NrtLogger):
+    logger.info('parent')
+    log_child(logger)
+    logger.info('parent 2')
+
+
+def log_child(logger: NrtLogger):
+    logger.info('child')
+    log_leaf(logger)
+
+
+def log_leaf(logger: NrtLogger):
+    logger.info('leaf')
+
+
+def generate_call_path():
+    yield call_tracker.get_call_path()
+    yield call_tracker.get_call_path()
+
+
+class CallTrackerTests(TestBase):
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+        call_tracker.enable_module(__name__)
+
+    def tearDown(self):
+        call_tracker.stop()
+        call_tracker.disable_module(__name__)
+        call_tracker.disable_code(generate_call_path)
+        logger_manager.close_all_loggers()
+
+    @parameterized.expand(AVAILABLE_BACKENDS)
+    @stdout_redirect
+    def test_log_hierarchy_from_tracked_calls(
+            self, backend: CallTrackerBackendEnum):
+
+        call_tracker.start(backend)
+
+        self.assertEqual(backend, call_tracker.backend)
+
+        log_parent(self.__create_logger())
+
+        self.assertEqual(EXPECTED_HIERARCHY, r_stdout.getvalue())
+
+    @parameterized.expand(AVAILABLE_BACKENDS)
+    def test_call_path(self, backend: CallTrackerBackendEnum):
+        call_tracker.start(backend)
+        expected_call_path = [f'{TEST_FILE_NAME}.generate_call_path']
+
+        for call_path in generate_call_path():
+            self.assertEqual(expected_call_path, call_path[-1:])
+
+        self.assertEqual(
+            f'{TEST_FILE_NAME}.{self.__class__.__name__}.test_call_path',
+            call_tracker.get_call_path()[-1])
+
+    def test_call_path_in_thread(self):
+        call_tracker.start()
+        call_path_list = []
+
+        def append_call_path():
+            call_path_list.append(call_tracker.get_call_path())
+
+        thread = Thread(target=append_call_path)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(
+            [f'{TEST_FILE_NAME}.append_call_path'],
+            call_path_list[0])
+
+    def test_enable_code(self):
+        call_tracker.disable_module(__name__)
+        call_tracker.enable_code(generate_call_path)
+        call_tracker.start()
+
+        self.assertEqual([], call_tracker.get_call_path())
+        self.assertEqual(
+            [[f'{TEST_FILE_NAME}.generate_call_path']] * 2,
+            list(generate_call_path()))
+        self.assertEqual(0, call_tracker.stats.tracked_modules)
+        self.assertEqual(1, call_tracker.stats.tracked_codes)
+
+    @stdout_redirect
+    def test_measure_overhead(self):
+        logger = self.__create_logger()
+
+        report = \
+            call_tracker.measure_overhead(
+                lambda: log_parent(logger), repeat=2)
+
+        self.assertIsInstance(report, CallTrackerOverheadReport)
+        self.assertGreater(report.stack_walk_time, 0)
+        self.assertGreater(report.tracking_time, 0)
+        self.assertGreater(report.overhead_ratio, 0)
+        self.assertEqual(8, report.tracked_calls)
+        self.assertFalse(call_tracker.is_running)
+
+    def test_start_twice_negative(self):
+        call_tracker.start()
+
+        with self.assertRaises(RuntimeError):
+            call_tracker.start()
+
+    @parameterized.expand([
+        ['Monitoring', CallTrackerBackendEnum.MONITORING],
+        ['PROFILE', CallTrackerBackendEnum.PROFILE]
+    ])
+    def test_build_backend(
+            self, name: str, expected_backend: CallTrackerBackendEnum):
+        self.assertEqual(expected_backend, CallTrackerBackendEnum.build(name))
+
+    def test_build_backend_negative(self):
+        with self.assertRaises(ValueError):
+            CallTrackerBackendEnum.build('settrace')
+
+    @classmethod
+    def __create_logger(cls) -> NrtLogger:
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = '$message$'
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+        return logger
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -710,6 +710,149 @@ class LoggerManagerConfigTests(TestBase):
         with self.assertRaises(ValueError):
             logger_manager.set_config(file_path=file_path)
 
+    def test_config_with_persistent_stream(self):
+        file_path = \
+            os.path.join(
+                self.BASELINE_PATH,
+                'logging_config_line_with_persistent_stream.yaml')
+
+        logger_manager.set_config(file_path=file_path)
+        logger = logger_manager.get_logger(self.LOGGER_NAME_1)
+
+        sh_1, sh_2 = logger.stream_handler_list
+
+        self.assertTrue(sh_1.is_persistent_stream)
+        self.assertEqual(64 * 1000, sh_1.buffer_size)
+        self.assertEqual('lines', sh_1.flush_policy.value)
+        self.assertEqual(3, sh_1.flush_lines_amount)
+        self.assertFalse(sh_2.is_persistent_stream)
+
+        logger.info('a')
+        logger.info('b')
+
+        self.assertEqual(0, os.path.getsize(self.FILE_PATH_1))
+        self.assertGreater(os.path.getsize(self.FILE_PATH_2), 0)
+
+        logger.info('c')
+
+        with open(self.FILE_PATH_1) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(['a', 'b', 'c'], [log['log'] for log in log_list])
+
+    def test_config_with_invalid_flush_policy_negative(self):
+        config = {
+            'flush_policy': 'not exist',
+            'loggers': [
+                {
+                    'name': self.LOGGER_NAME_1,
+                    'stream_handlers': [{'type': 'console'}]
+                }
+            ]
+        }
+
+        with self.assertRaises(ValueError):
+            logger_manager.set_config(config=config)
+
+    def test_config_with_batch_write(self):
+        config = {
+            'is_batch_write': True,
+            'batch_write_interval': 5,
+            'loggers': [
+                {
+                    'name': self.LOGGER_NAME_1,
+                    'stream_handlers': [
+                        {
+                            'type': 'file',
+                            'file_path': self.FILE_PATH_1,
+                            'batch_write_size': '1 KB'
+                        },
+                        {
+                            'type': 'file',
+                            'file_path': self.FILE_PATH_2,
+                            'is_batch_write': False
+                        }
+                    ]
+                }
+            ]
+        }
+
+        logger_manager.set_config(config=config)
+        logger = logger_manager.get_logger(self.LOGGER_NAME_1)
+
+        sh_1, sh_2 = logger.stream_handler_list
+
+        self.assertTrue(sh_1.is_batch_write)
+        self.assertEqual(1000, sh_1.batch_write_size)
+        self.assertEqual(5, sh_1.batch_write_interval)
+        self.assertFalse(sh_2.is_batch_write)
+
+        logger.info('a')
+
+        self.assertFalse(os.path.exists(self.FILE_PATH_1))
+        self.assertTrue(os.path.exists(self.FILE_PATH_2))
+
+        logger_manager.flush()
+
+        self.assertTrue(os.path.exists(self.FILE_PATH_1))
+
+    def test_config_with_zip_compression(self):
+        config = {
+            'zip_compression': 'lzma',
+            'loggers': [
+                {
+                    'name': self.LOGGER_NAME_1,
+                    'zip_compression_level': 3,
+                    'stream_handlers': [
+                        {'type': 'file', 'file_path': self.FILE_PATH_1},
+                        {
+                            'type': 'file',
+                            'file_path': self.FILE_PATH_2,
+                            'zip_compression': 'bzip2'
+                        }
+                    ]
+                }
+            ]
+        }
+
+        logger_manager.set_config(config=config)
+        logger = logger_manager.get_logger(self.LOGGER_NAME_1)
+
+        sh_1, sh_2 = logger.stream_handler_list
+
+        self.assertEqual('lzma', sh_1.zip_compression.value)
+        self.assertEqual(3, sh_1.zip_compression_level)
+        self.assertEqual('bzip2', sh_2.zip_compression.value)
+        self.assertEqual(3, sh_2.zip_compression_level)
+
+    def test_config_with_invalid_zip_compression_negative(self):
+        config = {
+            'zip_compression': 'not exist',
+            'loggers': [
+                {
+                    'name': self.LOGGER_NAME_1,
+                    'stream_handlers': [{'type': 'console'}]
+                }
+            ]
+        }
+
+        with self.assertRaises(ValueError):
+            logger_manager.set_config(config=config)
+
+    def test_config_with_invalid_zip_compression_level_negative(self):
+        config = {
+            'zip_compression_level': 10,
+            'loggers': [
+                {
+                    'name': self.LOGGER_NAME_1,
+                    'stream_handlers': [{'type': 'console'}]
+                }
+            ]
+        }
+
+        with self.assertRaises(ValueError):
+            logger_manager.set_config(config=config)
+
     def __verify_log_yaml(
             self,
             log_yaml: dict,
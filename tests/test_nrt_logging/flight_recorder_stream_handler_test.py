@@ -0,0 +1,254 @@
+import time
+import unittest
+from threading import Thread
+
+from parameterized import parameterized
+
+from nrt_logging.async_stream_handler import AsyncStreamHandler
+from nrt_logging.flight_recorder_stream_handler import \
+    FlightRecorderStreamHandler
+from nrt_logging.log_format import LogElementEnum
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, LogStyleEnum
+from tests.test_nrt_logging.test_base import \
+    TestBase, NAME_1, stdout_redirect, r_stdout
+
+
+class FlightRecorderStreamHandlerTests(TestBase):
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    @stdout_redirect
+    def test_write_kept_logs_on_error(self):
+        logger = self.__create_logger(FlightRecorderStreamHandler(
+            self.__create_console_stream_handler()))
+
+        self.__parent(logger)
+
+        self.assertEqual('', r_stdout.getvalue())
+
+        logger.error('error')
+
+        self.assertEqual(
+            '- log: parent\n'
+            '  children:\n'
+            '    - log: child\n'
+            '- log: error\n',
+            r_stdout.getvalue())
+
+        logger.info('after')
+
+        self.assertEqual(
+            '- log: parent\n'
+            '  children:\n'
+            '    - log: child\n'
+            '- log: error\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_rebase_depth_of_kept_logs(self):
+        logger = self.__create_logger(
+            FlightRecorderStreamHandler(
+                self.__create_console_stream_handler(), records_amount=1))
+
+        self.__parent(logger)
+        logger.error('error')
+
+        self.assertEqual(
+            '- log: child\n'
+            '- log: error\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_records_amount(self):
+        logger = self.__create_logger(
+            FlightRecorderStreamHandler(
+                self.__create_console_stream_handler(), records_amount=3))
+
+        for i in range(10):
+            logger.trace(f'log {i}')
+
+        logger.critical('critical')
+
+        self.assertEqual(
+            '- log: log 7\n'
+            '- log: log 8\n'
+            '- log: log 9\n'
+            '- log: critical\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_max_record_age(self):
+        logger = self.__create_logger(
+            FlightRecorderStreamHandler(
+                self.__create_console_stream_handler(),
+                max_record_age=0.05))
+
+        logger.info('old')
+        time.sleep(0.1)
+        logger.info('new')
+        logger.error('error')
+
+        self.assertEqual('- log: new\n- log: error\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_trigger_log_level_and_dump(self):
+        sh = \
+            FlightRecorderStreamHandler(
+                self.__create_console_stream_handler(),
+                trigger_log_level=LogLevelEnum.WARN)
+        logger = self.__create_logger(sh)
+
+        logger.debug('debug')
+        logger.warn('warn')
+        logger.info('info')
+
+        self.assertEqual('- log: debug\n- log: warn\n', r_stdout.getvalue())
+
+        sh.dump()
+
+        self.assertEqual(
+            '- log: debug\n- log: warn\n- log: info\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_async_flight_recorder(self):
+        logger = self.__create_logger(
+            AsyncStreamHandler(
+                FlightRecorderStreamHandler(
+                    self.__create_console_stream_handler())))
+
+        logger.info('info')
+        logger.flush()
+
+        self.assertEqual('', r_stdout.getvalue())
+
+        logger.error('error')
+        logger.flush()
+
+        self.assertEqual('- log: info\n- log: error\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_config_with_async_flight_recorder(self):
+        config = {
+            'loggers': [
+                {
+                    'name': NAME_1,
+                    'stream_handlers': [
+                        {
+                            'type': 'console',
+                            'style': 'line',
+                            'log_line_template': '$message$',
+                            'is_async': True,
+                            'is_flight_recorder': True,
+                            'log_level': 'TRACE'
+                        }
+                    ]
+                }
+            ]
+        }
+
+        logger_manager.set_config(config=config)
+        logger = logger_manager.get_logger(NAME_1)
+
+        self.assertIsInstance(
+            logger.stream_handler_list[0], AsyncStreamHandler)
+
+        logger.trace('main')
+        thread = Thread(target=lambda: logger.trace('other thread'))
+        thread.start()
+        thread.join()
+        logger.error('error')
+        logger.flush()
+
+        self.assertEqual('- log: main\n- log: error\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_kept_logs_of_sequential_threads(self):
+        logger = self.__create_logger(FlightRecorderStreamHandler(
+            self.__create_console_stream_handler()))
+
+        def log_in_thread(i: int):
+            logger.trace(f'thread {i}')
+
+            if i == 2:
+                logger.error('error')
+
+        # Ended thread ident is reused by the next thread
+        for i in range(3):
+            thread = Thread(target=log_in_thread, args=(i,))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(
+            '- log: thread 2\n- log: error\n', r_stdout.getvalue())
+
+    def test_config_with_flight_recorder(self):
+        config = {
+            'loggers': [
+                {
+                    'name': NAME_1,
+                    'stream_handlers': [
+                        {
+                            'type': 'console',
+                            'is_flight_recorder': True,
+                            'flight_recorder_records_amount': 100,
+                            'flight_recorder_max_record_age': 60,
+                            'flight_recorder_trigger_log_level': 'WARN',
+                            'log_level': 'TRACE'
+                        }
+                    ]
+                }
+            ]
+        }
+
+        logger_manager.set_config(config=config)
+        sh = logger_manager.get_logger(NAME_1).stream_handler_list[0]
+
+        self.assertIsInstance(sh, FlightRecorderStreamHandler)
+        self.assertIsInstance(sh.stream_handler, ConsoleStreamHandler)
+        self.assertEqual(100, sh.records_amount)
+        self.assertEqual(60, sh.max_record_age)
+        self.assertEqual(LogLevelEnum.WARN, sh.trigger_log_level)
+        self.assertEqual(LogLevelEnum.TRACE, sh.log_level)
+
+    @parameterized.expand([
+        [{'records_amount': 0}],
+        [{'max_record_age': -1}]
+    ])
+    def test_invalid_params_negative(self, params: dict):
+        with self.assertRaises(ValueError):
+            FlightRecorderStreamHandler(ConsoleStreamHandler(), **params)
+
+    @classmethod
+    def __parent(cls, logger: NrtLogger):
+        logger.info('parent')
+        cls.__child(logger)
+
+    @classmethod
+    def __child(cls, logger: NrtLogger):
+        logger.trace('child')
+
+    @classmethod
+    def __create_console_stream_handler(cls) -> ConsoleStreamHandler:
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.log_level = LogLevelEnum.TRACE
+        return sh
+
+    @classmethod
+    def __create_logger(cls, sh) -> NrtLogger:
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+        return logger
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+import os
+import unittest
+from multiprocessing import Event, Process
+from time import sleep
+
+import yaml
+from parameterized import parameterized
+
+from nrt_logging.log_collector import LogCollector, LogTreeBuffer
+from nrt_logging.log_format import LogElementEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_stream_handlers import LogRecord, LogStyleEnum
+from tests.test_nrt_logging.test_base import TestBase
+
+
+LOOP = 50
+
+
+def log_in_worker(log_collector: LogCollector):
+    logger = NrtLogger()
+    logger.add_stream_handler(log_collector.create_stream_handler())
+
+    for i in range(LOOP):
+        log_parent(logger, i)
+
+
+def log_in_idle_worker(log_collector: LogCollector, stop_event: Event):
+    logger = NrtLogger()
+    logger.add_stream_handler(log_collector.create_stream_handler())
+    log_parent(logger, 0)
+    stop_event.wait(timeout=10)
+
+
+def log_parent(logger: NrtLogger, i: int):
+    logger.info(f'parent {i}')
+    log_child(logger, i)
+
+
+def log_child(logger: NrtLogger, i: int):
+    logger.info(f'child {i}')
+
+
+class LogCollectorTests(TestBase):
+    FILE_PATH = os.path.join(TestBase.TEMP_PATH, 'log_test.log')
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    def test_collect_logs_from_processes(self):
+        log_collector = \
+            LogCollector(
+                self.FILE_PATH,
+                log_line_template=f'{LogElementEnum.PID.line_format}'
+                                  f' {LogElementEnum.MESSAGE.line_format}')
+        log_collector.start()
+
+        process_list = \
+            [Process(target=log_in_worker, args=(log_collector,))
+             for _ in range(3)]
+
+        for process in process_list:
+            process.start()
+
+        for process in process_list:
+            process.join()
+
+        log_collector.stop()
+
+        self.assertFalse(log_collector.is_alive)
+
+        with open(self.FILE_PATH) as f:
+            log_line_list = f.read().splitlines()
+
+        for process in process_list:
+            log_line_list_of_process = \
+                [log_line.strip() for log_line in log_line_list
+                 if f' {process.pid} ' in log_line]
+
+            self.assertEqual(2 * LOOP, len(log_line_list_of_process))
+
+            for i in range(LOOP):
+                self.assertEqual(
+                    f'- log: {process.pid} parent {i}',
+                    log_line_list_of_process[2 * i])
+                self.assertEqual(
+                    f'- log: {process.pid} child {i}',
+                    log_line_list_of_process[2 * i + 1])
+
+        self.assertEqual(3 * LOOP, log_line_list.count('  children:'))
+
+    def test_collect_logs_in_yaml_style(self):
+        log_collector = LogCollector(self.FILE_PATH, style=LogStyleEnum.YAML)
+        log_collector.start()
+
+        log_in_worker(log_collector)
+
+        log_collector.stop()
+
+        with open(self.FILE_PATH) as f:
+            log_list = list(yaml.safe_load_all(f.read()))
+
+        self.assertEqual(LOOP, len(log_list))
+
+        for log in log_list:
+            self.assertEqual(os.getpid(), log['pid'])
+            self.assertEqual(os.getpid(), log['children'][0]['pid'])
+
+    def test_collect_logs_from_processes_in_yaml_style(self):
+        log_collector = LogCollector(self.FILE_PATH, style=LogStyleEnum.YAML)
+        log_collector.start()
+
+        process_list = \
+            [Process(target=log_in_worker, args=(log_collector,))
+             for _ in range(3)]
+
+        for process in process_list:
+            process.start()
+
+        for process in process_list:
+            process.join()
+
+        log_collector.stop()
+
+        with open(self.FILE_PATH) as f:
+            log_list = list(yaml.safe_load_all(f.read()))
+
+        self.assertEqual(3 * LOOP, len(log_list))
+
+        for log in log_list:
+            self.assertEqual(1, len(log['children']))
+            self.assertEqual(log['pid'], log['children'][0]['pid'])
+            self.assertEqual(
+                log['message'].replace('parent', 'child'),
+                log['children'][0]['message'])
+
+        for process in process_list:
+            self.assertEqual(
+                [f'parent {i}' for i in range(LOOP)],
+                [log['message'] for log in log_list
+                 if log['pid'] == process.pid])
+
+    def test_collect_logs_from_idle_process(self):
+        log_collector = \
+            LogCollector(
+                self.FILE_PATH,
+                max_tree_age=0.1,
+                log_line_template=LogElementEnum.MESSAGE.line_format)
+        log_collector.start()
+
+        stop_event = Event()
+        process = \
+            Process(
+                target=log_in_idle_worker, args=(log_collector, stop_event))
+        process.start()
+
+        try:
+            log_str = ''
+
+            for _ in range(1000):
+                if os.path.exists(self.FILE_PATH):
+                    with open(self.FILE_PATH) as f:
+                        log_str = f.read()
+
+                if log_str:
+                    break
+
+                sleep(0.01)
+
+            # Log tree is written while worker process is alive
+            self.assertTrue(process.is_alive())
+            self.assertEqual(
+                '- log: parent 0\n'
+                '  children:\n'
+                '    - log: child 0\n',
+                log_str)
+        finally:
+            stop_event.set()
+            process.join()
+            log_collector.stop()
+
+    def test_log_tree_buffer_max_tree_age(self):
+        log_tree_buffer = LogTreeBuffer(max_tree_age=0.1)
+
+        self.assertIsNone(log_tree_buffer.timeout)
+
+        log_tree_buffer.add(self.__log_record(1, 0))
+        log_tree_buffer.add(self.__log_record(1, 1))
+
+        self.assertGreater(log_tree_buffer.timeout, 0)
+        self.assertEqual([], log_tree_buffer.pop_expired())
+
+        sleep(0.1)
+        log_tree_buffer.add(self.__log_record(2, 0))
+
+        self.assertEqual(0, log_tree_buffer.timeout)
+        self.assertEqual(
+            [(1, 0), (1, 1)], self.__pid_depth(log_tree_buffer.pop_expired()))
+        self.assertEqual(
+            [(2, 0)], self.__pid_depth(log_tree_buffer.pop_all()))
+
+    def test_log_tree_buffer(self):
+        log_tree_buffer = LogTreeBuffer(max_tree_records=3)
+
+        self.assertEqual([], log_tree_buffer.add(self.__log_record(1, 0)))
+        self.assertEqual([], log_tree_buffer.add(self.__log_record(2, 0)))
+        self.assertEqual([], log_tree_buffer.add(self.__log_record(1, 1)))
+
+        completed_list = log_tree_buffer.add(self.__log_record(1, 0))
+
+        self.assertEqual([(1, 0), (1, 1)], self.__pid_depth(completed_list))
+
+        self.assertEqual([], log_tree_buffer.add(self.__log_record(2, 1)))
+
+        completed_list = log_tree_buffer.add(self.__log_record(2, 2))
+
+        self.assertEqual(
+            [(2, 0), (2, 1), (2, 2)], self.__pid_depth(completed_list))
+        self.assertEqual(
+            [(1, 0)], self.__pid_depth(log_tree_buffer.pop_all()))
+        self.assertEqual([], log_tree_buffer.pop_all())
+
+    def test_start_twice_negative(self):
+        log_collector = LogCollector(self.FILE_PATH)
+        log_collector.start()
+
+        with self.assertRaises(RuntimeError):
+            log_collector.start()
+
+        log_collector.stop()
+
+    @parameterized.expand([
+        [{'queue_size': 0}],
+        [{'batch_size': 0}],
+        [{'max_tree_records': 0}],
+        [{'max_tree_age': 0}]
+    ])
+    def test_invalid_params_negative(self, params: dict):
+        with self.assertRaises(ValueError):
+            LogCollector(self.FILE_PATH, **params)
+
+    @classmethod
+    def __log_record(cls, pid: int, depth: int) -> LogRecord:
+        return \
+            LogRecord(
+                log_level=None,
+                msg='log',
+                path='path',
+                method='method',
+                line_number=1,
+                date='date',
+                depth=depth,
+                is_child=False,
+                pid=pid)
+
+    @classmethod
+    def __pid_depth(cls, log_record_list: list[LogRecord]) -> list[tuple]:
+        return [(r.pid, r.depth) for r in log_record_list]
+
+
+if __name__ == '__main__':
+    unittest.main()
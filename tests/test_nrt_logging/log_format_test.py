@@ -1,8 +1,12 @@
+import pickle
 import unittest
+from datetime import datetime, timedelta, timezone
 
 from parameterized import parameterized
 
-from nrt_logging.log_format import LogElementEnum, LogYamlElements
+from nrt_logging.log_format import \
+    LogElementEnum, LogYamlElements, LogLineTemplate, \
+    LogDateFormat, LogDateFormatter, LazyMessage
 
 
 class LogElementEnumTests(unittest.TestCase):
@@ -17,6 +21,10 @@ class LogElementEnumTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             LogElementEnum.build('not exist')
 
+    @parameterized.expand([[log_element] for log_element in LogElementEnum])
+    def test_pickle(self, log_element: LogElementEnum):
+        self.assertIs(log_element, pickle.loads(pickle.dumps(log_element)))
+
 
 class LogYamlElementsTests(unittest.TestCase):
     UPDATED_YAML_ELEMENTS = {LogElementEnum.LOG_LEVEL, LogElementEnum.PATH}
@@ -44,5 +52,114 @@ class LogYamlElementsTests(unittest.TestCase):
             LogYamlElements.build('test')
 
 
+class LogLineTemplateTests(unittest.TestCase):
+
+    @parameterized.expand([
+        ['$date$ [$log_level$] $message$',
+         (LogElementEnum.DATE, LogElementEnum.LOG_LEVEL,
+          LogElementEnum.MESSAGE),
+         'D [L] M'],
+        ['{$message$} $message$ {}',
+         (LogElementEnum.MESSAGE,),
+         '{M} M {}'],
+        ['$path$.$method$:$line_number$ $date',
+         (LogElementEnum.PATH, LogElementEnum.METHOD,
+          LogElementEnum.LINE_NUMBER),
+         'P.Me:1 $date'],
+        ['no elements', (), 'no elements']
+    ])
+    def test_format_map(
+            self,
+            template: str,
+            expected_elements: tuple,
+            expected_log_line: str):
+
+        element_values = {
+            'date': 'D',
+            'log_level': 'L',
+            'path': 'P',
+            'method': 'Me',
+            'line_number': '1',
+            'message': 'M'
+        }
+
+        log_line_template = LogLineTemplate(template)
+
+        self.assertEqual(template, log_line_template.template)
+        self.assertEqual(expected_elements, log_line_template.elements)
+        self.assertEqual(
+            expected_log_line,
+            log_line_template.format_map(
+                {log_element.value: element_values[log_element.value]
+                 for log_element in log_line_template.elements}))
+
+
+class LogDateFormatterTests(unittest.TestCase):
+    DATE = datetime(2022, 12, 31, 23, 59, 59, 999998)
+
+    @parameterized.expand([
+        [LogDateFormat.DEFAULT_DATE_FORMAT],
+        ['%Y-%m-%d %H:%M:%S'],
+        ['%f %S'],
+        ['%H:%M:%S %%f'],
+        ['%S%%%f'],
+        ['%f.%f']
+    ])
+    def test_format(self, date_format: str):
+        log_date_formatter = LogDateFormatter.get(date_format)
+
+        for i in range(5):
+            date = self.DATE + timedelta(microseconds=i)
+
+            self.assertEqual(
+                date.strftime(date_format), log_date_formatter.format(date))
+
+    def test_format_date_with_time_zone(self):
+        log_date_formatter = LogDateFormatter.get('%H %z')
+        date = self.DATE.replace(tzinfo=timezone.utc)
+
+        self.assertEqual('23 +0000', log_date_formatter.format(date))
+        self.assertEqual(
+            '01 +0200',
+            log_date_formatter.format(
+                date.astimezone(timezone(timedelta(hours=2)))))
+
+    def test_get_shared_formatter(self):
+        self.assertIs(
+            LogDateFormatter.get('%Y %f'), LogDateFormatter.get('%Y %f'))
+
+    def test_log_date_format_after_date_format_update(self):
+        log_date_format = LogDateFormat()
+
+        self.assertEqual(
+            '2022-12-31 23:59:59.999998', log_date_format.format(self.DATE))
+
+        log_date_format.date_format = '%Y'
+
+        self.assertEqual('2022', log_date_format.format(self.DATE))
+
+
+class LazyMessageTests(unittest.TestCase):
+
+    @parameterized.expand([
+        [LazyMessage('message'), 'message'],
+        [LazyMessage(lambda: 'message'), 'message'],
+        [LazyMessage('%s %d %r', 'message', 1, 'a'), "message 1 'a'"],
+        [LazyMessage(lambda: '%s', [1, 2]), '[1, 2]']
+    ])
+    def test_lazy_message(self, lazy_message: LazyMessage, expected_msg: str):
+        self.assertEqual(expected_msg, lazy_message())
+        self.assertEqual(expected_msg, str(lazy_message))
+
+    def test_lazy_message_evaluated_once(self):
+        evaluation_list = []
+        lazy_message = \
+            LazyMessage(lambda: evaluation_list.append(1) or 'message')
+
+        self.assertEqual('message', lazy_message())
+        self.assertEqual('message', lazy_message())
+        self.assertEqual([1], evaluation_list)
+
+
 if __name__ == '__main__':
     unittest.main()
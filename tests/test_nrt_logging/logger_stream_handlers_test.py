@@ -1,17 +1,23 @@
 import os
 import unittest
+from bisect import insort
+from glob import glob
+from threading import Event, Thread
 from time import sleep
+from unittest.mock import patch
+from zipfile import ZipFile, ZIP_BZIP2, ZIP_LZMA
 
 import yaml
 from parameterized import parameterized
 
+from nrt_logging.archive_executor import ArchiveExecutor, zip_archive
 from nrt_logging.log_format import \
     LogDateFormat, LogElementEnum, LogYamlElements
 from nrt_logging.log_level import LogLevelEnum
 from nrt_logging.logger_manager import logger_manager
 from nrt_logging.logger_stream_handlers import \
-    LogStyleEnum, FileStreamHandler, \
-    ManualDepthEnum, FileSizeEnum, ConsoleStreamHandler
+    LogStyleEnum, FileStreamHandler, ZipCompressionEnum, FlushPolicyEnum, \
+    DepthData, DepthState, ManualDepthEnum, FileSizeEnum, ConsoleStreamHandler
 from tests.test_nrt_logging.test_base import \
     NAME_2, TestBase
 
@@ -87,7 +93,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.CRITICAL,
             expected_class_path,
             expected_method_name,
-            64,
+            70,
             msg_1)
 
         children = log_list[0].get('children')
@@ -100,7 +106,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.ERROR,
             expected_class_path,
             expected_method_name,
-            65,
+            71,
             child_1)
 
         self._verify_log_line(
@@ -109,7 +115,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.WARN,
             expected_class_path,
             expected_method_name,
-            66,
+            72,
             child_2)
 
         self._verify_log_line(
@@ -118,7 +124,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.INFO,
             expected_class_path,
             expected_method_name,
-            67,
+            73,
             child_1)
 
         self._verify_log_line(
@@ -127,7 +133,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.INFO,
             expected_class_path,
             expected_method_name,
-            69,
+            75,
             msg_2)
 
         children = log_list[2].get('children')
@@ -140,7 +146,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.ERROR,
             expected_class_path,
             expected_method_name,
-            71,
+            77,
             child_1)
 
         self._verify_log_line(
@@ -149,7 +155,7 @@ class FileStreamHandlerTests(TestBase):
             LogLevelEnum.INFO,
             expected_class_path,
             expected_method_name,
-            73,
+            79,
             msg_2)
 
     def test_write_to_log_and_limit_files_size(self):
@@ -192,6 +198,426 @@ class FileStreamHandlerTests(TestBase):
 
         self.assertLess(len(log_list), 3)
 
+    def test_write_same_call_site_to_multiple_stream_handlers(self):
+        file_path_2 = os.path.join(self.TEMP_PATH, 'log_test_2.log')
+        logger = logger_manager.get_logger(NAME_2)
+
+        for file_path in (self.FILE_PATH, file_path_2):
+            sh = FileStreamHandler(file_path)
+            sh.style = LogStyleEnum.LINE
+            logger.add_stream_handler(sh)
+
+        logger.info('abc')
+        logger.increase_depth()
+        logger.info('def')
+
+        with open(self.FILE_PATH) as f:
+            log_str_1 = f.read()
+
+        with open(file_path_2) as f:
+            log_str_2 = f.read()
+
+        self.assertEqual(log_str_1, log_str_2)
+
+        log_list = yaml.safe_load(log_str_1)
+
+        self.assertEqual(1, len(log_list))
+        self.assertEqual(1, len(log_list[0]['children']))
+
+    def test_write_to_log_with_persistent_stream(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_persistent_stream = True
+        sh.flush_policy = FlushPolicyEnum.LINES
+        sh.flush_lines_amount = 3
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        logger.info('a')
+        logger.info('b')
+
+        self.assertEqual(0, os.path.getsize(self.FILE_PATH))
+
+        logger.info('c')
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(['a', 'b', 'c'], [log['log'] for log in log_list])
+
+        logger.info('d')
+        sh.flush()
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(4, len(log_list))
+
+    def test_write_to_log_with_persistent_stream_flush_at_exit(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.is_persistent_stream = True
+        sh.flush_policy = FlushPolicyEnum.EXIT
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        logger.info('abc')
+
+        self.assertEqual(0, os.path.getsize(self.FILE_PATH))
+
+        FileStreamHandler.flush_persistent_streams()
+
+        self.assertGreater(os.path.getsize(self.FILE_PATH), 0)
+
+    def test_write_to_log_with_persistent_stream_flush_interval(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_persistent_stream = True
+        sh.flush_policy = FlushPolicyEnum.INTERVAL
+        sh.flush_interval = 0.1
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        logger.info('a')
+        sleep(0.2)
+
+        # Interval flush is done only on write
+        self.assertEqual(0, os.path.getsize(self.FILE_PATH))
+
+        logger.info('b')
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(['a', 'b'], [log['log'] for log in log_list])
+
+    def test_write_to_log_with_batch_write(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_batch_write = True
+        # Each log line is 13 characters
+        sh.batch_write_size = 60
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        with patch.object(sh, '_write', wraps=sh._write) as write_mock:
+            for i in range(4):
+                logger.info(f'log {i}')
+
+            self.assertFalse(os.path.exists(self.FILE_PATH))
+
+            logger.info('log 4')
+            logger.info('log 5')
+
+            self.assertEqual(1, write_mock.call_count)
+
+            logger.info('log 6')
+            logger_manager.flush()
+
+            self.assertEqual(2, write_mock.call_count)
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(
+            [f'log {i}' for i in range(7)], [log['log'] for log in log_list])
+
+    def test_write_to_log_with_batch_write_interval(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.is_batch_write = True
+        sh.batch_write_interval = 0.1
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        logger.info('a')
+
+        self.assertFalse(os.path.exists(self.FILE_PATH))
+
+        sleep(0.2)
+        logger.info('b')
+
+        self.assertGreater(os.path.getsize(self.FILE_PATH), 0)
+
+    def test_write_to_log_with_persistent_stream_and_limit_files_size(self):
+        file_size_limitation = 1000
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.files_amount = 2
+        sh.max_file_size = file_size_limitation
+        sh.is_persistent_stream = True
+        sh.flush_policy = FlushPolicyEnum.EXIT
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        for _ in range(11):
+            logger.info(self.MSG_100_BYTES)
+
+        sh.flush()
+        sleep(0.1)
+
+        log_files = os.listdir(self.TEMP_PATH)
+        self.assertEqual(2, len(log_files))
+        log_files.sort()
+
+        archive_1_path = os.path.join(self.TEMP_PATH, log_files[1])
+
+        with open(archive_1_path) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(10, len(log_list))
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(1, len(log_list))
+
+    def test_limit_files_size_get_file_size_once(self):
+        with open(self.FILE_PATH, 'w') as f:
+            f.write(self.MSG_100_BYTES)
+
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.max_file_size = 1000
+        sh.files_amount = 2
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        with patch(
+                'nrt_logging.logger_stream_handlers.getsize',
+                wraps=os.path.getsize) as getsize_mock:
+            for _ in range(5):
+                logger.info(self.MSG_100_BYTES)
+
+        self.assertEqual(1, getsize_mock.call_count)
+
+        for _ in range(5):
+            logger.info(self.MSG_100_BYTES)
+
+        sleep(0.1)
+
+        self.assertEqual(2, len(os.listdir(self.TEMP_PATH)))
+
+    def test_limit_files_size_with_multiple_threads(self):
+        threads_amount = 4
+        logs_amount = 50
+        file_size_limitation = 1000
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.files_amount = threads_amount * logs_amount
+        sh.max_file_size = file_size_limitation
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        def write_logs():
+            for _ in range(logs_amount):
+                logger.info(self.MSG_100_BYTES)
+
+        threads = [Thread(target=write_logs) for _ in range(threads_amount)]
+
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        sleep(0.1)
+
+        logs_counter = 0
+
+        for log_file in os.listdir(self.TEMP_PATH):
+            log_file_path = os.path.join(self.TEMP_PATH, log_file)
+
+            self.assertLess(
+                os.path.getsize(log_file_path),
+                file_size_limitation + len(self.MSG_100_BYTES) + 10)
+
+            with open(log_file_path) as f:
+                logs_counter += len(yaml.safe_load(f.read()))
+
+        self.assertEqual(threads_amount * logs_amount, logs_counter)
+
+    def test_write_to_log_and_zip_archives(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.files_amount = 2
+        sh.max_file_size = 1000
+        sh.is_zip = True
+        sh.zip_compression = ZipCompressionEnum.BZIP2
+        sh.zip_compression_level = 9
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        for _ in range(31):
+            logger.info(self.MSG_100_BYTES)
+
+        self.assertTrue(sh.flush_archives(timeout=10))
+
+        log_files = os.listdir(self.TEMP_PATH)
+        log_files.sort()
+
+        self.assertEqual(3, len(log_files))
+
+        for log_file in log_files[1:]:
+            self.assertTrue(log_file.endswith('.zip'))
+
+            with ZipFile(os.path.join(self.TEMP_PATH, log_file)) as z:
+                self.assertEqual(
+                    ZIP_BZIP2, z.infolist()[0].compress_type)
+
+    def test_limit_files_amount_with_existing_archives(self):
+        existing_archive_list = \
+            [os.path.join(
+                self.TEMP_PATH,
+                f'{self.FILE_NAME_PREFIX}_2020_01_0{i}_00_00_00_000000'
+                f'.{self.FILE_EXTENSION}')
+             for i in range(1, 6)]
+        existing_archive_list[1] += '.zip'
+
+        for archive_path in existing_archive_list:
+            with open(archive_path, 'w') as f:
+                f.write(self.MSG_100_BYTES)
+
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.files_amount = 2
+        sh.max_file_size = 1000
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        with patch(
+                'nrt_logging.logger_stream_handlers.glob',
+                wraps=glob) as glob_mock, \
+                patch(
+                    'nrt_logging.logger_stream_handlers.insort',
+                    wraps=insort) as insort_mock:
+            for _ in range(31):
+                logger.info(self.MSG_100_BYTES)
+
+        self.assertEqual(1, glob_mock.call_count)
+        # Archives of rotations are appended in order
+        self.assertEqual(0, insort_mock.call_count)
+
+        log_files = os.listdir(self.TEMP_PATH)
+
+        self.assertEqual(3, len(log_files))
+
+        for archive_path in existing_archive_list:
+            self.assertFalse(os.path.exists(archive_path))
+
+    def test_limit_files_amount_with_archive_in_compression(self):
+        zip_event = Event()
+        archive_list = []
+
+        def blocked_zip_archive(archive_file_path: str, *args):
+            archive_list.append(archive_file_path)
+
+            # First archive is in compression until zip event is set
+            if len(archive_list) == 1:
+                zip_event.wait(timeout=10)
+
+            zip_archive(archive_file_path, *args)
+
+        executor = ArchiveExecutor(max_workers=2)
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = LogElementEnum.MESSAGE.line_format
+        sh.is_limit_file_size = True
+        sh.files_amount = 1
+        sh.max_file_size = 1000
+        sh.is_zip = True
+        sh.archive_executor = executor
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        with patch(
+                'nrt_logging.logger_stream_handlers.zip_archive',
+                blocked_zip_archive):
+            # 3 rotations
+            for _ in range(31):
+                logger.info(self.MSG_100_BYTES)
+
+            for _ in range(1000):
+                if executor.completed_archives == 2:
+                    break
+
+                sleep(0.01)
+
+            self.assertEqual(2, executor.completed_archives)
+            # Archive in compression is not removed by newer archives
+            self.assertTrue(os.path.exists(archive_list[0]))
+
+            zip_event.set()
+
+            self.assertTrue(sh.flush_archives(timeout=10))
+
+        executor.shutdown()
+
+        self.assertEqual(
+            sorted([
+                os.path.basename(self.FILE_PATH),
+                f'{os.path.basename(archive_list[2])}.zip']),
+            sorted(os.listdir(self.TEMP_PATH)))
+
+    def test_write_to_log_with_log_line_template_without_date(self):
+        sh = FileStreamHandler(self.FILE_PATH)
+        sh.style = LogStyleEnum.LINE
+        # Date is not formatted, since it is not in log line template
+        sh.log_date_format = LogDateFormat(date_format=None)
+        sh.log_line_template = 'L{$log_level$} $message$ $message$'
+        logger = logger_manager.get_logger(NAME_2)
+        logger.add_stream_handler(sh)
+
+        logger.info('a')
+        sh.log_line_template = '$method$ $message$'
+        logger.info('b')
+
+        with open(self.FILE_PATH) as f:
+            log_list = yaml.safe_load(f.read())
+
+        self.assertEqual(
+            ['L{INFO} a a',
+             'test_write_to_log_with_log_line_template_without_date b'],
+            [log['log'] for log in log_list])
+
+    def test_invalid_zip_compression_level_negative(self):
+        file_stream_handler = FileStreamHandler('/test.txt')
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.zip_compression_level = 10
+
+    def test_invalid_persistent_stream_parameters_negative(self):
+        file_stream_handler = FileStreamHandler('/test.txt')
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.buffer_size = 0
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.flush_lines_amount = 0
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.flush_interval = 0
+
+    def test_invalid_batch_write_parameters_negative(self):
+        file_stream_handler = FileStreamHandler('/test.txt')
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.batch_write_size = 0
+
+        with self.assertRaises(ValueError):
+            file_stream_handler.batch_write_interval = 0
+
     def test_set_log_level(self):
         original_log_level = ConsoleStreamHandler().log_level
         updated_log_level = LogLevelEnum.CRITICAL
@@ -254,6 +680,89 @@ class FileStreamHandlerTests(TestBase):
             file_stream_handler.files_amount = -1
 
 
+class DepthStateTests(TestBase):
+
+    def test_depth_index(self):
+        depth_state = DepthState()
+
+        for name in ['a', 'b', 'a', 'c', 'a']:
+            depth_state.append_depth(DepthData(name=name))
+
+        self.assertEqual(
+            {'a': [0, 2, 4], 'b': [1], 'c': [3]}, depth_state.fm_index_dict)
+        self.assertIs(
+            depth_state.depth_list[4], depth_state.get_latest_depth('a'))
+
+        depth_state.truncate_depth_list(3)
+
+        self.assertEqual({'a': [0, 2], 'b': [1]}, depth_state.fm_index_dict)
+
+        depth_state.remove_depths([1])
+
+        self.assertEqual({'a': [0, 1]}, depth_state.fm_index_dict)
+        self.assertIsNone(depth_state.get_latest_depth('b'))
+
+        inherited_depth_state = depth_state.inherit(owner=1)
+        inherited_depth_state.append_depth(DepthData(name='a'))
+
+        self.assertEqual({'a': [0, 1]}, depth_state.fm_index_dict)
+        self.assertEqual(
+            {'a': [0, 1, 2]}, inherited_depth_state.fm_index_dict)
+
+        depth_state.reset_depth_list(DepthData(name='d'))
+
+        self.assertEqual({'d': [0]}, depth_state.fm_index_dict)
+
+    def test_remove_depths(self):
+        depth_state = DepthState()
+
+        for name in ['a', 'b', 'a', 'c', 'b', 'a']:
+            depth_state.append_depth(DepthData(name=name))
+
+        depth_state = depth_state.inherit(owner=1)
+        depth_state.append_depth(DepthData(name='c'))
+        depth_state.remove_depths([4, 1, 6, 2])
+
+        self.assertEqual(
+            ['a', 'c', 'a'], [d.name for d in depth_state.depth_list])
+        self.assertEqual({'a': [0, 2], 'c': [1]}, depth_state.fm_index_dict)
+        self.assertEqual(3, depth_state.inherited_length)
+
+        depth_state.remove_depths([])
+
+        self.assertEqual(3, len(depth_state.depth_list))
+
+
+class FlushPolicyEnumTests(TestBase):
+
+    @parameterized.expand([
+        ['line', FlushPolicyEnum.LINE],
+        ['LINES', FlushPolicyEnum.LINES],
+        ['Interval', FlushPolicyEnum.INTERVAL],
+        ['exit', FlushPolicyEnum.EXIT],
+    ])
+    def test_build(
+            self, name: str, expected_flush_policy_enum: FlushPolicyEnum):
+        self.assertEqual(
+            expected_flush_policy_enum, FlushPolicyEnum.build(name))
+
+    def test_build_negative(self):
+        with self.assertRaises(ValueError):
+            FlushPolicyEnum.build('not exist')
+
+
+class ZipCompressionEnumTests(TestBase):
+
+    def test_build(self):
+        self.assertEqual(
+            ZipCompressionEnum.LZMA, ZipCompressionEnum.build('LzMa'))
+        self.assertEqual(ZIP_LZMA, ZipCompressionEnum.LZMA.compression)
+
+    def test_build_negative(self):
+        with self.assertRaises(ValueError):
+            ZipCompressionEnum.build('gzip')
+
+
 class FileSizeEnumTests(TestBase):
 
     @parameterized.expand([
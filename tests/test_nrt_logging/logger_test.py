@@ -0,0 +1,281 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from nrt_logging.async_stream_handler import AsyncStreamHandler
+from nrt_logging.call_stack import CallStack
+from nrt_logging.log_format import LazyMessage
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger, _skip_log
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, LoggerStreamHandlerBase, LogStyleEnum
+from tests.test_nrt_logging.test_base import \
+    TestBase, stdout_redirect, r_stdout
+
+
+class NrtLoggerLogLevelTests(TestBase):
+    LOG_METHOD_LEVELS = \
+        [
+            ['critical', LogLevelEnum.CRITICAL],
+            ['error', LogLevelEnum.ERROR],
+            ['warn', LogLevelEnum.WARN],
+            ['info', LogLevelEnum.INFO],
+            ['debug', LogLevelEnum.DEBUG],
+            ['trace', LogLevelEnum.TRACE],
+            ['snapshot', LogLevelEnum.TRACE]
+        ]
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+
+    def tearDown(self):
+        logger_manager.close_all_loggers()
+
+    @parameterized.expand(LOG_METHOD_LEVELS)
+    def test_disabled_log_methods(
+            self, method_name: str, log_level: LogLevelEnum):
+
+        for logger_log_level in LogLevelEnum:
+            logger = NrtLogger(logger_log_level)
+            method = getattr(logger, method_name)
+
+            if logger_log_level <= log_level:
+                self.assertIsNot(_skip_log, method)
+                self.assertEqual(method_name, method.__name__)
+            else:
+                self.assertIs(_skip_log, method)
+
+    @stdout_redirect
+    def test_enable_log_methods_after_log_level_update(self):
+        logger = NrtLogger(LogLevelEnum.ERROR)
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_level = LogLevelEnum.TRACE
+        sh.log_line_template = '$message$'
+        logger.add_stream_handler(sh, is_min_sh_logger_level=False)
+
+        logger.trace('trace message 1')
+        logger.error('error message 1')
+
+        self.assertIs(_skip_log, logger.trace)
+
+        logger.update_log_level(LogLevelEnum.TRACE, is_update_sh=False)
+        logger.trace('trace message 2')
+
+        logger.log_level = LogLevelEnum.CRITICAL
+        logger.error('error message 2')
+
+        self.assertEqual(
+            '- log: error message 1\n- log: trace message 2\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_flush_batch_write(self):
+        logger = NrtLogger()
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = '$message$'
+        sh.is_batch_write = True
+        logger.add_stream_handler(sh)
+
+        logger.info('message 1')
+        logger.info('message 2')
+
+        self.assertEqual('', r_stdout.getvalue())
+
+        logger.flush()
+
+        self.assertEqual(
+            '- log: message 1\n- log: message 2\n', r_stdout.getvalue())
+
+    def test_disabled_log_without_stream_handlers(self):
+        logger = NrtLogger(LogLevelEnum.INFO)
+        logger.debug('debug message')
+
+        with self.assertRaises(RuntimeError):
+            logger.info('info message')
+
+
+class NrtLoggerLazyMessageTests(TestBase):
+    __evaluations: int
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+        self.__evaluations = 0
+
+    def tearDown(self):
+        logger_manager.close_all_loggers()
+
+    @stdout_redirect
+    def test_lazy_message_evaluated_once(self):
+        logger = self.__create_logger(LogLevelEnum.TRACE, LogLevelEnum.DEBUG)
+
+        logger.debug(self.__create_msg)
+        logger.info(LazyMessage('%s %d', 'message', 2))
+
+        self.assertEqual(1, self.__evaluations)
+        self.assertEqual(
+            '- log: message 1\n'
+            '- log: message 1\n'
+            '- log: message 2\n'
+            '- log: message 2\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_lazy_message_not_evaluated_for_disabled_level(self):
+        logger = self.__create_logger(LogLevelEnum.INFO, LogLevelEnum.INFO)
+        logger.update_log_level(LogLevelEnum.TRACE, is_update_sh=False)
+
+        logger.trace(self.__create_msg)
+        logger.debug(LazyMessage(self.__create_msg))
+
+        self.assertEqual(0, self.__evaluations)
+        self.assertEqual('', r_stdout.getvalue())
+
+    def __create_msg(self) -> str:
+        self.__evaluations += 1
+        return f'message {self.__evaluations}'
+
+    @classmethod
+    def __create_logger(cls, *sh_log_level_list: LogLevelEnum) -> NrtLogger:
+        logger = NrtLogger()
+
+        for sh_log_level in sh_log_level_list:
+            sh = ConsoleStreamHandler()
+            sh.style = LogStyleEnum.LINE
+            sh.log_level = sh_log_level
+            sh.log_line_template = '$message$'
+            logger.add_stream_handler(sh)
+
+        return logger
+
+
+class NrtLoggerScopeTests(TestBase):
+    __logger: NrtLogger
+
+    def setUp(self):
+        logger_manager.close_all_loggers()
+
+    def tearDown(self):
+        logger_manager.close_all_loggers()
+
+    @stdout_redirect
+    def test_scope_and_traced(self):
+        self.__logger = self.__create_logger(ConsoleStreamHandler())
+
+        self.__log_in_scope()
+
+        self.assertEqual(
+            '- log: before\n'
+            '- log: scope\n'
+            '  children:\n'
+            '    - log: child 1\n'
+            '    - log: NrtLoggerScopeTests.__traced.<locals>.traced\n'
+            '      children:\n'
+            '        - log: traced child\n'
+            '    - log: not traced child\n'
+            '    - log: child 2\n'
+            '- log: after\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_scope_without_call_stack_inspection(self):
+        self.__logger = self.__create_logger(ConsoleStreamHandler())
+
+        with self.__logger.scope('scope'):
+            with patch.object(CallStack, 'is_contains') as is_contains_mock:
+                self.__logger.info('child')
+                self.__not_traced()
+
+        is_contains_mock.assert_not_called()
+        self.assertEqual(
+            '- log: scope\n'
+            '  children:\n'
+            '    - log: child\n'
+            '    - log: not traced child\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_traced_async_function(self):
+        self.__logger = self.__create_logger(ConsoleStreamHandler())
+
+        @self.__logger.traced(log_level=LogLevelEnum.INFO)
+        async def traced_async():
+            await asyncio.sleep(0)
+            self.__logger.info('traced child')
+
+        asyncio.run(traced_async())
+
+        self.assertEqual(
+            '- log: NrtLoggerScopeTests.test_traced_async_function'
+            '.<locals>.traced_async\n'
+            '  children:\n'
+            '    - log: traced child\n',
+            r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_scope_of_disabled_log_level(self):
+        self.__logger = \
+            self.__create_logger(ConsoleStreamHandler(), LogLevelEnum.INFO)
+
+        with self.__logger.scope('scope', LogLevelEnum.DEBUG):
+            self.__logger.info('child')
+
+        self.assertEqual('- log: child\n', r_stdout.getvalue())
+
+    @stdout_redirect
+    def test_scope_with_async_stream_handler(self):
+        self.__logger = \
+            self.__create_logger(AsyncStreamHandler(ConsoleStreamHandler()))
+
+        with self.__logger.scope('scope'):
+            self.__logger.info('child')
+
+        self.__logger.close_stream_handlers()
+
+        self.assertEqual(
+            '- log: scope\n'
+            '  children:\n'
+            '    - log: child\n',
+            r_stdout.getvalue())
+
+    def __log_in_scope(self):
+        self.__logger.info('before')
+
+        with self.__logger.scope('scope'):
+            self.__logger.info('child 1')
+            self.__traced()
+            self.__not_traced()
+            self.__logger.info('child 2')
+
+        self.__logger.info('after')
+
+    def __traced(self):
+        @self.__logger.traced
+        def traced():
+            self.__logger.info('traced child')
+
+        traced()
+
+    def __not_traced(self):
+        self.__logger.info('not traced child')
+
+    @classmethod
+    def __create_logger(
+            cls,
+            sh: LoggerStreamHandlerBase,
+            sh_log_level: LogLevelEnum = LogLevelEnum.TRACE) -> NrtLogger:
+
+        sh.style = LogStyleEnum.LINE
+        sh.log_level = sh_log_level
+        sh.log_line_template = '$message$'
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+        return logger
+
+
+if __name__ == '__main__':
+    unittest.main()
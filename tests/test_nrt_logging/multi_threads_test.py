@@ -1,4 +1,6 @@
+import gc
 import unittest
+import weakref
 from threading import Thread
 
 from nrt_logging.log_level import LogLevelEnum
@@ -97,6 +99,28 @@ class MultiThreadsTests(TestBase):
         self.__create_logger_and_sh()
         self.__execute_multi_thread_test(LoggerThread2, 200)
 
+    @stdout_redirect
+    def test_depth_state_per_thread(self):
+        sh = ConsoleStreamHandler()
+        logger_manager.get_logger(NAME_1).add_stream_handler(sh)
+        depth_state_ref_list = []
+
+        def log_in_thread():
+            LoggerThread2().run()
+            depth_state = sh._get_depth_state()
+            depth_state_ref_list.append(weakref.ref(depth_state))
+            self.assertEqual(1, len(depth_state.depth_list))
+
+        t = Thread(target=log_in_thread)
+        t.start()
+        t.join()
+        gc.collect()
+
+        self.assertEqual(0, sh._get_depth_state().depth)
+        self.assertEqual([], sh._get_depth_state().depth_list)
+        self.assertEqual(1, len(depth_state_ref_list))
+        self.assertIsNone(depth_state_ref_list[0]())
+
     def __execute_multi_thread_test(
             self, logger_thread_cls, loop_amount: int):
         multi_thread_list = []
@@ -0,0 +1,178 @@
+import os
+import unittest
+from multiprocessing import Process
+
+import yaml
+
+from nrt_logging.log_format import LogElementEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import LogStyleEnum
+from nrt_logging.ring_buffer_stream_handler import \
+    RING_BUFFER_HEADER_SIZE, RingBufferStreamHandler, dump_ring_buffer, \
+    read_ring_buffer
+from tests.test_nrt_logging.test_base import TestBase, NAME_1
+
+
+def log_and_crash(file_path: str):
+    sh = RingBufferStreamHandler(file_path, 1000)
+    sh.style = LogStyleEnum.LINE
+    sh.log_line_template = LogElementEnum.MESSAGE.line_format
+    logger = NrtLogger()
+    logger.add_stream_handler(sh)
+    logger.info('before crash')
+    os._exit(1)
+
+
+class RingBufferStreamHandlerTests(TestBase):
+    FILE_PATH = os.path.join(TestBase.TEMP_PATH, 'log_test.ring')
+    DUMP_FILE_PATH = os.path.join(TestBase.TEMP_PATH, 'log_test.log')
+
+    @classmethod
+    def setUpClass(cls):
+        if not os.path.exists(cls.TEMP_PATH):
+            os.makedirs(cls.TEMP_PATH)
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        self._close_loggers_and_delete_logs()
+
+    def test_write_to_ring_buffer(self):
+        sh = RingBufferStreamHandler(self.FILE_PATH, 1000)
+        logger = self.__create_logger(sh)
+
+        self.__parent(logger, 'a')
+        logger.info('b')
+
+        self.assertEqual(
+            RING_BUFFER_HEADER_SIZE + 1000, os.path.getsize(self.FILE_PATH))
+        self.assertEqual(
+            '- log: a\n'
+            '  children:\n'
+            '    - log: a child\n'
+            '- log: b\n',
+            sh.read())
+
+    def test_write_to_ring_buffer_with_wraparound(self):
+        sh = RingBufferStreamHandler(self.FILE_PATH, 200)
+        logger = self.__create_logger(sh)
+
+        for i in range(100):
+            self.__parent(logger, f'log {i}')
+
+        log_list = yaml.safe_load(read_ring_buffer(self.FILE_PATH))
+
+        self.assertEqual(RING_BUFFER_HEADER_SIZE + 200,
+                         os.path.getsize(self.FILE_PATH))
+        self.assertGreater(sh.total_written, 200)
+        self.assertEqual('log 99', log_list[-1]['log'])
+        self.assertEqual(
+            [f'log {i}' for i in range(100 - len(log_list), 100)],
+            [log['log'] for log in log_list])
+
+        for log in log_list:
+            self.assertEqual(
+                f'{log["log"]} child', log['children'][0]['log'])
+
+    def test_continue_ring_buffer_after_reopen(self):
+        logger = self.__create_logger(
+            RingBufferStreamHandler(self.FILE_PATH, 1000))
+        logger.info('a')
+        logger_manager.close_all_loggers()
+
+        logger = self.__create_logger(
+            RingBufferStreamHandler(self.FILE_PATH, 1000))
+        logger.info('b')
+
+        self.assertEqual(
+            '- log: a\n- log: b\n', read_ring_buffer(self.FILE_PATH))
+
+        logger_manager.close_all_loggers()
+
+        logger = self.__create_logger(
+            RingBufferStreamHandler(self.FILE_PATH, 500))
+        logger.info('c')
+
+        self.assertEqual('- log: c\n', read_ring_buffer(self.FILE_PATH))
+
+    def test_logs_survive_process_crash(self):
+        process = Process(target=log_and_crash, args=(self.FILE_PATH,))
+        process.start()
+        process.join()
+
+        self.assertEqual(1, process.exitcode)
+        self.assertEqual(
+            '- log: before crash\n', read_ring_buffer(self.FILE_PATH))
+
+    def test_dump_ring_buffer(self):
+        sh = RingBufferStreamHandler(self.FILE_PATH, 1000)
+        sh.style = LogStyleEnum.YAML
+        logger = self.__create_logger(sh)
+        logger.info('a')
+        logger.close_stream_handlers()
+
+        dump_ring_buffer(self.FILE_PATH, self.DUMP_FILE_PATH)
+
+        with open(self.DUMP_FILE_PATH) as f:
+            log_yaml = yaml.safe_load(f.read())
+
+        self.assertEqual(
+            'a', log_yaml[LogElementEnum.MESSAGE.element_name])
+
+    def test_config_with_ring_buffer(self):
+        config = {
+            'loggers': [
+                {
+                    'name': NAME_1,
+                    'stream_handlers': [
+                        {
+                            'type': 'ring_buffer',
+                            'file_path': self.FILE_PATH,
+                            'ring_buffer_size': '4 KB'
+                        }
+                    ]
+                }
+            ]
+        }
+
+        logger_manager.set_config(config=config)
+        sh = logger_manager.get_logger(NAME_1).stream_handler_list[0]
+
+        self.assertIsInstance(sh, RingBufferStreamHandler)
+        self.assertEqual(4000, sh.ring_buffer_size)
+
+    def test_invalid_ring_buffer_size_negative(self):
+        with self.assertRaises(ValueError):
+            RingBufferStreamHandler(self.FILE_PATH, 0)
+
+    def test_read_not_ring_buffer_file_negative(self):
+        with open(self.FILE_PATH, 'w') as f:
+            f.write('a' * 100)
+
+        with self.assertRaises(ValueError):
+            read_ring_buffer(self.FILE_PATH)
+
+    @classmethod
+    def __parent(cls, logger: NrtLogger, msg: str):
+        logger.info(msg)
+        cls.__child(logger, msg)
+
+    @classmethod
+    def __child(cls, logger: NrtLogger, msg: str):
+        logger.info(f'{msg} child')
+
+    @classmethod
+    def __create_logger(cls, sh: RingBufferStreamHandler) -> NrtLogger:
+        if sh.style != LogStyleEnum.YAML:
+            sh.style = LogStyleEnum.LINE
+            sh.log_line_template = LogElementEnum.MESSAGE.line_format
+
+        logger = logger_manager.get_logger(NAME_1)
+        logger.add_stream_handler(sh)
+        return logger
+
+
+if __name__ == '__main__':
+    unittest.main()
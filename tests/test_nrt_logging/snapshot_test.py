@@ -0,0 +1,171 @@
+import time
+import unittest
+
+from parameterized import parameterized
+
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, LogStyleEnum
+from nrt_logging.snapshot import \
+    SLOW_ATTRIBUTE_VALUE, SLOW_TYPE_VALUE, SNAPSHOT_TIME_EXCEEDED_VALUE, \
+    SnapshotRenderer
+from tests.test_nrt_logging.test_base import \
+    TestBase, stdout_redirect, r_stdout
+
+
+class SnapshotObject:
+    MAX = 10
+
+    class_var = 'class value'
+
+    def __init__(self):
+        self.property_calls = 0
+        self.big_list = list(range(1000))
+        self.text = 'a' * 100
+
+    @property
+    def counted(self) -> int:
+        self.property_calls += 1
+        return self.property_calls
+
+    @property
+    def failed(self):
+        raise KeyError('failed')
+
+    def method(self):
+        return self.MAX
+
+
+class SlowObject:
+    def __init__(self):
+        self.slow_calls = 0
+
+    @property
+    def slow(self) -> str:
+        self.slow_calls += 1
+        time.sleep(0.02)
+        return 'slow value'
+
+
+class SlowStrObject:
+    str_calls = 0
+
+    def __str__(self):
+        SlowStrObject.str_calls += 1
+        time.sleep(0.02)
+        return 'x' * 100
+
+
+class SnapshotRendererTests(TestBase):
+
+    @parameterized.expand([
+        ['abc', 'abc'],
+        ['a' * 30, 'a' * 20 + '...'],
+        [list(range(10)), '[0, 1, 2, ...]'],
+        [{'a': [1, [2]]}, "{'a': [1, [...]]}"],
+        [{3, 1}, '{1, 3}'],
+        [None, 'None']
+    ])
+    def test_render_value(self, value, expected_value_str: str):
+        renderer = \
+            SnapshotRenderer(
+                max_value_length=20, max_collection_items=3, max_level=2)
+
+        self.assertEqual(expected_value_str, renderer.render_value(value))
+
+    def test_render_self(self):
+        obj = SnapshotObject()
+        renderer = SnapshotRenderer(max_value_length=50)
+
+        attr_dict = dict(renderer.render_self(obj))
+
+        self.assertEqual(
+            ['big_list', 'class_var', 'counted', 'failed',
+             'property_calls', 'text'],
+            list(attr_dict))
+        self.assertEqual('1', attr_dict['counted'])
+        self.assertEqual('<KeyError on get attribute>', attr_dict['failed'])
+        self.assertEqual('a' * 50 + '...', attr_dict['text'])
+        self.assertEqual(
+            str(list(range(20)))[:50] + '...', attr_dict['big_list'])
+
+    def test_render_self_skip_properties(self):
+        obj = SnapshotObject()
+        renderer = SnapshotRenderer(is_skip_properties=True)
+
+        attr_dict = dict(renderer.render_self(obj))
+
+        self.assertNotIn('counted', attr_dict)
+        self.assertNotIn('failed', attr_dict)
+        self.assertEqual(0, obj.property_calls)
+
+    def test_render_self_slow_attribute(self):
+        obj = SlowObject()
+        renderer = SnapshotRenderer(max_value_time=0.01)
+
+        self.assertEqual(
+            [('slow', 'slow value'), ('slow_calls', '1')],
+            renderer.render_self(obj))
+        self.assertEqual(
+            [('slow', SLOW_ATTRIBUTE_VALUE), ('slow_calls', '1')],
+            renderer.render_self(obj))
+
+    def test_render_slow_type(self):
+        SlowStrObject.str_calls = 0
+        renderer = SnapshotRenderer(max_value_length=20, max_value_time=0.01)
+        obj = SnapshotObject()
+        obj.slow_str = SlowStrObject()
+
+        self.assertEqual(
+            [('a', 'xxxxxxxx...xxxxxxxxx')],
+            renderer.render_f_locals({'a': SlowStrObject()}))
+        self.assertEqual(
+            [('b', SLOW_TYPE_VALUE)],
+            renderer.render_f_locals({'b': SlowStrObject()}))
+        self.assertEqual(
+            SLOW_TYPE_VALUE, dict(renderer.render_self(obj))['slow_str'])
+        self.assertEqual(1, SlowStrObject.str_calls)
+
+        renderer.clear_cache()
+
+        self.assertEqual(
+            'xxxxxxxx...xxxxxxxxx', renderer.render_value(obj.slow_str))
+        self.assertEqual(2, SlowStrObject.str_calls)
+
+    def test_render_after_deadline(self):
+        renderer = SnapshotRenderer()
+        deadline = time.monotonic() - 1
+
+        self.assertEqual(
+            [('i', SNAPSHOT_TIME_EXCEEDED_VALUE)],
+            renderer.render_f_locals({'i': 1, 'self': self}, deadline))
+
+    @parameterized.expand([
+        [{'max_value_length': 0}],
+        [{'max_collection_items': -1}],
+        [{'max_snapshot_time': 0}]
+    ])
+    def test_invalid_params_negative(self, params: dict):
+        with self.assertRaises(ValueError):
+            SnapshotRenderer(**params)
+
+    @stdout_redirect
+    def test_stream_handler_snapshot_renderer(self):
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_level = LogLevelEnum.TRACE
+        sh.snapshot_renderer = SnapshotRenderer(max_collection_items=2)
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+
+        big_list = list(range(100))
+        self.assertTrue(big_list)
+        logger.snapshot()
+        logger.close_stream_handlers()
+
+        self.assertIn('big_list: [0, 1, ...]', r_stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from parameterized import parameterized
+
+from nrt_logging.async_stream_handler import AsyncStreamHandler
+from nrt_logging.log_level import LogLevelEnum
+from nrt_logging.logger import NrtLogger
+from nrt_logging.logger_manager import logger_manager
+from nrt_logging.logger_stream_handlers import \
+    ConsoleStreamHandler, FileStreamHandler, LogStyleEnum
+from nrt_logging.stream_handler_stats import \
+    NsHistogram, StatsPhaseEnum, StreamHandlerStats
+from tests.test_nrt_logging.test_base import \
+    TestBase, NAME_1, stdout_redirect, r_stdout
+
+
+class StreamHandlerStatsTests(TestBase):
+
+    def setUp(self):
+        self._close_loggers_and_delete_logs()
+
+    def tearDown(self):
+        logger_manager.is_stats = False
+        self._close_loggers_and_delete_logs()
+
+    @stdout_redirect
+    def test_stats(self):
+        sh = self.__create_console_stream_handler()
+        sh.is_stats = True
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+
+        logger.info('log 1')
+        logger.info('log 2')
+        sh.info('log 3')
+
+        stats = sh.stats
+
+        self.assertEqual(3, stats.records)
+        self.assertEqual(len(r_stdout.getvalue()), stats.bytes_written)
+        self.assertEqual(0, stats.rotations)
+        self.assertEqual(
+            1, stats.get_histogram(StatsPhaseEnum.CALL_SITE).count)
+
+        for phase in \
+                (StatsPhaseEnum.DEPTH,
+                 StatsPhaseEnum.FORMAT,
+                 StatsPhaseEnum.WRITE):
+            self.assertEqual(3, stats.get_histogram(phase).count)
+
+        self.assertTrue(
+            r_stdout.getvalue().startswith(
+                '- log: test_stats log 1\n'
+                '- log: test_stats log 2\n'))
+
+    def test_call_site_with_and_without_stats(self):
+        log_line_list = []
+
+        for is_stats in (False, True):
+            with redirect_stdout(StringIO()) as stdout:
+                sh = self.__create_console_stream_handler()
+                sh.is_stats = is_stats
+                self.__log_from_stream_handler(sh)
+
+            log_line_list.append(stdout.getvalue())
+
+        self.assertTrue(log_line_list[0].endswith(' log\n'))
+        self.assertEqual(log_line_list[0], log_line_list[1])
+
+    def test_stats_of_rotation_with_zip(self):
+        sh = FileStreamHandler(os.path.join(self.TEMP_PATH, 'log.txt'))
+        sh.is_stats = True
+        sh.is_limit_file_size = True
+        sh.max_file_size = 1000
+        sh.files_amount = 2
+        sh.is_zip = True
+
+        for _ in range(30):
+            sh.info(self.MSG_100_BYTES)
+
+        self.assertTrue(sh.flush_archives(timeout=10))
+
+        stats = sh.stats
+
+        self.assertEqual(30, stats.records)
+        self.assertGreater(stats.rotations, 0)
+        self.assertEqual(
+            stats.rotations,
+            stats.get_histogram(StatsPhaseEnum.ROTATION).count)
+        self.assertEqual(
+            stats.rotations,
+            stats.get_histogram(StatsPhaseEnum.COMPRESSION).count)
+
+    @stdout_redirect
+    def test_async_stream_handler_stats(self):
+        sh = AsyncStreamHandler(self.__create_console_stream_handler())
+        sh.is_stats = True
+        logger = NrtLogger()
+        logger.add_stream_handler(sh)
+
+        logger.info('log 1')
+        logger.info('log 2')
+        logger.flush()
+
+        self.assertTrue(sh.stream_handler.is_stats)
+        self.assertEqual(2, sh.stats.records)
+        self.assertEqual(len(r_stdout.getvalue()), sh.stats.bytes_written)
+
+    @stdout_redirect
+    def test_logger_manager_stats_and_dump(self):
+        logger = logger_manager.get_logger(NAME_1)
+        logger.add_stream_handler(self.__create_console_stream_handler())
+        named_sh = self.__create_console_stream_handler()
+        named_sh.name = 'named'
+        logger.add_stream_handler(named_sh)
+
+        logger_manager.is_stats = True
+        logger.info('log')
+
+        stats_dict = logger_manager.stats()
+
+        self.assertEqual(
+            {'ConsoleStreamHandler_0', 'named'}, set(stats_dict[NAME_1]))
+        self.assertEqual(1, stats_dict[NAME_1]['named']['records'])
+
+        file_path = os.path.join(self.TEMP_PATH, 'stats.json')
+        logger_manager.dump_stats(file_path)
+
+        with open(file_path) as f:
+            dump_dict = json.load(f)
+
+        self.assertEqual(
+            stats_dict[NAME_1]['named']['phases']['write']['count'],
+            dump_dict[NAME_1]['named']['phases']['write']['count'])
+
+        logger_manager.is_stats = False
+
+        self.assertEqual({}, logger_manager.stats())
+
+    def test_ns_histogram(self):
+        histogram = NsHistogram()
+
+        for ns in (0, 1, 3, 100, 100, 5000):
+            histogram.add(ns)
+
+        self.assertEqual(6, histogram.count)
+        self.assertEqual(5204, histogram.total_ns)
+        self.assertEqual(0, histogram.min_ns)
+        self.assertEqual(5000, histogram.max_ns)
+        self.assertEqual({1: 1, 2: 1, 4: 1, 128: 2, 8192: 1},
+                         histogram.bucket_dict)
+        self.assertEqual(4, histogram.get_percentile_ns(50))
+        self.assertEqual(128, histogram.get_percentile_ns(80))
+        self.assertEqual(5000, histogram.get_percentile_ns(100))
+
+    @parameterized.expand([[-1], [101]])
+    def test_ns_histogram_invalid_percentile_negative(self, percentile):
+        with self.assertRaises(ValueError):
+            NsHistogram().get_percentile_ns(percentile)
+
+    def test_lock_contention_and_reset(self):
+        stats = StreamHandlerStats()
+        stats.add_lock_contention(0)
+        stats.add_records(2, 10)
+
+        self.assertEqual(1, stats.lock_contentions)
+        self.assertEqual(
+            1, stats.get_histogram(StatsPhaseEnum.LOCK_WAIT).count)
+
+        stats.reset()
+
+        self.assertEqual(0, stats.lock_contentions)
+        self.assertEqual(0, stats.records)
+        self.assertEqual(0, stats.bytes_written)
+
+    @classmethod
+    def __log_from_stream_handler(cls, sh: ConsoleStreamHandler):
+        sh.info('log')
+
+    @classmethod
+    def __create_console_stream_handler(cls) -> ConsoleStreamHandler:
+        sh = ConsoleStreamHandler()
+        sh.style = LogStyleEnum.LINE
+        sh.log_line_template = '$method$ $message$'
+        sh.log_level = LogLevelEnum.TRACE
+        return sh
+
+
+if __name__ == '__main__':
+    unittest.main()